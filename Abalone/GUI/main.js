@@ -1,6 +1,8 @@
 $(document).ready(function() {
   var steps = [];
   var index = -1;
+  // Step currently drawn on the canvas, the next ones are patched from it.
+  var rendered = null;
   const logElement = document.getElementById("log");
   var play = false;
 
@@ -14,7 +16,7 @@ $(document).ready(function() {
           if (play) {
               if (index < steps.length - 1) {
                   index++;
-                  drawGrid(steps[index]);
+                  renderGrid(steps[index]);
               } else {
                   play = false;
                   clearInterval(loop);
@@ -32,7 +34,7 @@ $(document).ready(function() {
 
   $("#reset").click(function() {
       index = 0;
-      drawGrid(steps[index]);
+      renderGrid(steps[index]);
   });
 
   connect_handler = () => {
@@ -71,10 +73,34 @@ $(document).ready(function() {
               console.log(json);
               steps.push(convertedGrid);
               index = steps.length - 1;
-              drawGrid(convertedGrid);
+              renderGrid(convertedGrid);
           }
       });
 
+      // Between two snapshots, the master only sends the cells changed and the scores when they change.
+      socket.on("play_delta", (...args) => {
+          json = JSON.parse(args[0]);
+          // The changes apply to the last state received: a GUI connected during the game waits for the next snapshot.
+          if (steps.length == 0) return;
+          const last = steps[steps.length - 1];
+          const gridData = last["gridData"].map((line) => line.slice());
+          for (let key in json.changes) {
+              const [i, j] = key.substring(1, key.length - 1).split(", ").map(Number);
+              const [row, col] = gridPosition(i, j);
+              gridData[row][col] = pieceValue(json.changes[key]);
+          }
+          const step = {
+              "gridData": gridData,
+              "scores": json.scores ? realScores(json.scores, last["players"]) : last["scores"],
+              "next_player": json.next_player,
+              "players": last["players"],
+              "current_step": json.step + "/" + json.max_step
+          };
+          steps.push(step);
+          index = steps.length - 1;
+          renderGrid(step);
+      });
+
       socket.on("ActionNotPermitted", (...args) => {
           // TODO: Display message to user
           $("#error").css("opacity", "1");
@@ -250,76 +276,67 @@ $(document).ready(function() {
 
   function getLocation(ball) {
       id = ball.id.split("_");
-      current_location = [parseInt(id[1]), parseInt(id[2])];
-      conversion = {
-          "0_6": [0, 4],
-          "0_5": [1, 3],
-          "0_4": [2, 2],
-          "0_3": [3, 1],
-          "0_2": [4, 0],
-          "1_6": [1, 5],
-          "1_5": [2, 4],
-          "1_4": [3, 3],
-          "1_3": [4, 2],
-          "1_2": [5, 1],
-          "1_1": [6, 0],
-          "2_7": [2, 6],
-          "2_6": [3, 5],
-          "2_5": [4, 4],
-          "2_4": [5, 3],
-          "2_3": [6, 2],
-          "2_2": [7, 1],
-          "2_1": [8, 0],
-          "3_7": [3, 7],
-          "3_6": [4, 6],
-          "3_5": [5, 5],
-          "3_4": [6, 4],
-          "3_3": [7, 3],
-          "3_2": [8, 2],
-          "3_1": [9, 1],
-          "3_0": [10, 0],
-          "4_8": [4, 8],
-          "4_7": [5, 7],
-          "4_6": [6, 6],
-          "4_5": [7, 5],
-          "4_4": [8, 4],
-          "4_3": [9, 3],
-          "4_2": [10, 2],
-          "4_1": [11, 1],
-          "4_0": [12, 0],
-          "5_7": [6, 8],
-          "5_6": [7, 7],
-          "5_5": [8, 6],
-          "5_4": [9, 5],
-          "5_3": [10, 4],
-          "5_2": [11, 3],
-          "5_1": [12, 2],
-          "5_0": [13, 1],
-          "6_7": [8, 8],
-          "6_6": [9, 7],
-          "6_5": [10, 6],
-          "6_4": [11, 5],
-          "6_3": [12, 4],
-          "6_2": [13, 3],
-          "6_1": [14, 2],
-          "7_6": [10, 8],
-          "7_5": [11, 7],
-          "7_4": [12, 6],
-          "7_3": [13, 5],
-          "7_2": [14, 4],
-          "7_1": [15, 3],
-          "8_6": [12, 8],
-          "8_5": [13, 7],
-          "8_4": [14, 6],
-          "8_3": [15, 5],
-          "8_2": [16, 4]
+      return boardPosition(parseInt(id[1]), parseInt(id[2]));
+  }
+
+  // Row and column in the displayed grid of the cell (i, j) of the board, as grid_position in geometry_abalone.py
+  function gridPosition(i, j) {
+      const row = (i + j - 4) / 2;
+      return [row, j + Math.floor((4 - row) / 2)];
+  }
+
+  function boardPosition(row, col) {
+      const j = col - Math.floor((4 - row) / 2);
+      return [2 * row + 4 - j, j];
+  }
+
+  // 1 = black, 2 = white, 3 = empty
+  function pieceValue(piece_type) {
+      if (piece_type == "W") return 2;
+      if (piece_type == "B") return 1;
+      return 3;
+  }
+
+  function isPlayable(value, next_player) {
+      if (value !== 1 && value !== 2) return false;
+      return Boolean(next_player && next_player.player_type == "interactive" && next_player.piece_type == (value === 1 ? "B" : "W"));
+  }
+
+  function renderGrid(gridData) {
+      if (rendered == null || rendered["gridData"] == null) {
+          drawGrid(gridData);
+      } else {
+          patchGrid(gridData);
       }
+  }
 
-      return conversion[current_location[0] + "_" + current_location[1]];
+  // Update the drawn grid in place: only the cells whose ball changed are touched.
+  function patchGrid(gridData) {
+      const previous = rendered;
+      rendered = gridData;
+      const next_player = gridData["next_player"];
+      $("#steps").html(gridData["current_step"]);
+
+      for (let row = 0; row < gridData["gridData"].length; row++) {
+          for (let col = 0; col < gridData["gridData"][row].length; col++) {
+              const value = gridData["gridData"][row][col];
+              if (value === 0) continue;
+              if (value !== previous["gridData"][row][col]) {
+                  old_ball = document.getElementById("ball_" + row + "_" + col);
+                  if (old_ball) old_ball.remove();
+                  if (value !== 3) addBall(col, row, value === 1 ? "black" : "white");
+              }
+              document.getElementById("hexa_" + row + "_" + col).classList.toggle("playable", isPlayable(value, next_player));
+          }
+      }
+
+      if (gridData["scores"]["B"] !== previous["scores"]["B"]) score_balls("black", gridData["scores"]["B"] || 0);
+      if (gridData["scores"]["W"] !== previous["scores"]["W"]) score_balls("white", gridData["scores"]["W"] || 0);
   }
 
   function drawGrid(gridData) {
 
+      rendered = gridData;
       scores = gridData["scores"];
       next_player = gridData["next_player"];
       current_step = gridData["current_step"];
@@ -372,13 +389,7 @@ $(document).ready(function() {
               // Draw hexagon border for values different from 0
 
               if (value !== 0) {
-                  if (value === 1) {
-                      drawHexagon(x, y, col, row, next_player && next_player.player_type == "interactive" && next_player.piece_type == "B");
-                  } else if (value === 2) {
-                      drawHexagon(x, y, col, row, next_player && next_player.player_type == "interactive" && next_player.piece_type == "W");
-                  } else {
-                      drawHexagon(x, y, col, row);
-                  }
+                  drawHexagon(x, y, col, row, isPlayable(value, next_player));
 
                   // Draw circle inside the hexagon
                   if (value !== 3) {
@@ -402,14 +413,14 @@ $(document).ready(function() {
   $("#next").click(function() {
       if (index < steps.length - 1) {
           index++;
-          drawGrid(steps[index]);
+          renderGrid(steps[index]);
       }
   });
 
   $("#previous").click(function() {
       if (index > 0) {
           index--;
-          drawGrid(steps[index]);
+          renderGrid(steps[index]);
       }
   });
 
@@ -420,74 +431,6 @@ $(document).ready(function() {
       current_step = board["current_step"]
       board = board["board"]
 
-      conversion = {
-          '0_4': [0, 6],
-          '1_3': [0, 5],
-          '2_2': [0, 4],
-          '3_1': [0, 3],
-          '4_0': [0, 2],
-          '1_5': [1, 6],
-          '2_4': [1, 5],
-          '3_3': [1, 4],
-          '4_2': [1, 3],
-          '5_1': [1, 2],
-          '6_0': [1, 1],
-          '2_6': [2, 7],
-          '3_5': [2, 6],
-          '4_4': [2, 5],
-          '5_3': [2, 4],
-          '6_2': [2, 3],
-          '7_1': [2, 2],
-          '8_0': [2, 1],
-          '3_7': [3, 7],
-          '4_6': [3, 6],
-          '5_5': [3, 5],
-          '6_4': [3, 4],
-          '7_3': [3, 3],
-          '8_2': [3, 2],
-          '9_1': [3, 1],
-          '10_0': [3, 0],
-          '4_8': [4, 8],
-          '5_7': [4, 7],
-          '6_6': [4, 6],
-          '7_5': [4, 5],
-          '8_4': [4, 4],
-          '9_3': [4, 3],
-          '10_2': [4, 2],
-          '11_1': [4, 1],
-          '12_0': [4, 0],
-          '6_8': [5, 7],
-          '7_7': [5, 6],
-          '8_6': [5, 5],
-          '9_5': [5, 4],
-          '10_4': [5, 3],
-          '11_3': [5, 2],
-          '12_2': [5, 1],
-          '13_1': [5, 0],
-          '8_8': [6, 7],
-          '9_7': [6, 6],
-          '10_6': [6, 5],
-          '11_5': [6, 4],
-          '12_4': [6, 3],
-          '13_3': [6, 2],
-          '14_2': [6, 1],
-          '10_8': [7, 6],
-          '11_7': [7, 5],
-          '12_6': [7, 4],
-          '13_5': [7, 3],
-          '14_4': [7, 2],
-          '15_3': [7, 1],
-          '12_8': [8, 6],
-          '13_7': [8, 5],
-          '14_6': [8, 4],
-          '15_5': [8, 3],
-          '16_4': [8, 2]
-      }
-
-
-      score_w = 0;
-      score_b = 0;
-
       for (i = 0; i < players.length; i++) {
 
           if (typeof players[i] === 'string' || players[i] instanceof String) {
@@ -497,14 +440,8 @@ $(document).ready(function() {
               pt = Object.entries(board).filter(e => e[1]["owner_id"] == players[i].id)[0][1].piece_type
               players[i]["piece_type"] = pt
           }
-
-          if (players[i].piece_type == "W") score_w = -scores[players[i].id];
-          if (players[i].piece_type == "B") score_b = -scores[players[i].id];
-      }
-      real_scores = {
-          "W": score_w,
-          "B": score_b
       }
+      real_scores = realScores(scores, players);
 
       const gridData = [
           [0, 0, 3, 3, 3, 3, 3, 0, 0],
@@ -518,20 +455,9 @@ $(document).ready(function() {
           [0, 0, 3, 3, 3, 3, 3, 0, 0],
       ];
       for (let key in board) {
-          new_key = key.substring(1, key.length - 1).replace(/, /g, "_");
-          obj = board[key];
-          let new_coord = conversion[new_key];
-          gridData[new_coord[0]][new_coord[1]] = obj["piece_type"]
-      }
-
-      for (i = 0; i < 9; i++) {
-          for (j = 0; j < 9; j++) {
-              if (gridData[i][j] == "W") {
-                  gridData[i][j] = 2;
-              } else if (gridData[i][j] == "B") {
-                  gridData[i][j] = 1;
-              }
-          }
+          const [i, j] = key.substring(1, key.length - 1).split(", ").map(Number);
+          const [row, col] = gridPosition(i, j);
+          gridData[row][col] = pieceValue(board[key]["piece_type"]);
       }
       return {
           "gridData": gridData,
@@ -542,6 +468,18 @@ $(document).ready(function() {
       };
   }
 
+  function realScores(scores, players) {
+      real_scores = {
+          "W": 0,
+          "B": 0
+      };
+      for (let i = 0; i < players.length; i++) {
+          if (players[i].piece_type == "W") real_scores["W"] = -scores[players[i].id];
+          if (players[i].piece_type == "B") real_scores["B"] = -scores[players[i].id];
+      }
+      return real_scores;
+  }
+
   function resizeCanvas() {
 
       const defaultGridData = {
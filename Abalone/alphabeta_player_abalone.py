@@ -0,0 +1,150 @@
+import time
+from typing import Optional
+
+from loguru import logger
+from player_abalone import PlayerAbalone
+from seahorse.game.action import Action
+from endgame_abalone import DRAW, ENDGAME_PLIES, EndgameSolver
+from game_state_abalone import GameStateAbalone
+from opening_book_abalone import DEFAULT_BOOK_PATH, open_book
+from parallel_search_abalone import ParallelSearch
+from move_abalone import MoveAbalone
+from ponder_abalone import Ponderer
+from search_abalone import AlphaBetaSearch
+from search_state_abalone import SearchStateAbalone
+
+# Share of the budget kept as a margin for the conversion of the move into an action.
+SAFETY = 0.9
+# Never spend more than this share of the remaining time on a single move.
+MAX_SHARE = 0.5
+MIN_MOVE_TIME = 0.05
+
+
+class MyPlayer(PlayerAbalone):
+    """
+    Player class for Abalone game running an iterative-deepening alpha-beta search.
+
+    Attributes:
+        piece_type (str): piece type of the player
+    """
+
+    def __init__(self, piece_type: str, name: str = "bob", time_limit: float=60*15,*args, tt_size_mb: float = 64, max_depth: Optional[int] = None, n_workers: int = 1, book_path: Optional[str] = DEFAULT_BOOK_PATH, endgame_plies: int = ENDGAME_PLIES, ponder: bool = False) -> None:
+        """
+        Initialize the PlayerAbalone instance.
+
+        Args:
+            piece_type (str): Type of the player's game piece
+            name (str, optional): Name of the player (default is "bob")
+            time_limit (float, optional): the time limit in (s)
+            tt_size_mb (float, optional): memory cap of the transposition table in MB
+            max_depth (int, optional): depth at which the search stops, unlimited by default
+            n_workers (int, optional): number of processes searching in parallel, 1 to search in this process only
+            book_path (str, optional): path of the opening book, None to play without book
+            endgame_plies (int, optional): number of plies before max_step under which the game is solved exactly
+            ponder (bool, optional): search on the opponent's time, see enable_pondering
+        """
+        super().__init__(piece_type,name,time_limit,*args)
+        self._search = ParallelSearch(n_workers, tt_size_mb) if n_workers > 1 else AlphaBetaSearch(tt_size_mb)
+        self._max_depth = max_depth
+        self._book = open_book(book_path)
+        self._solver = EndgameSolver()
+        self._endgame_plies = endgame_plies
+        self._time_used = 0.0
+        self._ponderer = None
+        if ponder:
+            self.enable_pondering()
+
+    def enable_pondering(self) -> bool:
+        """
+        Search the position expected after the reply of the opponent while the opponent
+        thinks. The search runs in a thread of this process, which would slow an opponent
+        playing in the same process: use it when the opponent is remote or human.
+
+        Returns:
+            bool: True
+        """
+        if self._ponderer is None:
+            self._ponderer = Ponderer(self._search)
+        return True
+
+    def compute_time_budget(self, current_state: GameStateAbalone) -> float:
+        """
+        Share the remaining time between the moves left to play before max_step.
+
+        Args:
+            current_state (GameStateAbalone): Current game state representation
+
+        Returns:
+            float: time allowed for the move in (s)
+        """
+        remaining = self.get_time_credit(self._time_used)
+        moves_left = max(1, (current_state.max_step - current_state.step + 1) // 2)
+        return max(MIN_MOVE_TIME, SAFETY * min(remaining / moves_left, MAX_SHARE * remaining))
+
+    def compute_action(self, current_state: GameStateAbalone, **kwargs) -> Action:
+        """
+        Return the best move found by the search in the time budget.
+
+        Args:
+            current_state (GameState): Current game state representation
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Action: selected feasible action
+        """
+        start = time.perf_counter()
+        try:
+            move = self.compute_move(current_state)
+            if self._ponderer is not None:
+                state = SearchStateAbalone.from_game_state(current_state)
+                state.make_move(move)
+                self._ponderer.start(state, self.compute_time_budget(current_state), self._max_depth)
+            return current_state.get_action(move)
+        finally:
+            self._time_used += time.perf_counter() - start
+
+    def compute_move(self, current_state: GameStateAbalone) -> MoveAbalone:
+        """
+        Return the move of the book, the move of the ponder search on a ponder hit,
+        the move of the endgame solver when it proves a win or a draw, or else the
+        best move found by the search.
+
+        Args:
+            current_state (GameState): Current game state representation
+
+        Returns:
+            MoveAbalone: selected move
+        """
+        state = SearchStateAbalone.from_game_state(current_state)
+        budget = self.compute_time_budget(current_state)
+        pondered = self._ponderer.finish(state, budget) if self._ponderer is not None else None
+        if self._book is not None:
+            move = self._book.get_move(state)
+            if move is not None:
+                logger.info(f"{self.get_name()} - book move")
+                return move
+        # The endgame solver is preferred to the ponder search, whose entries stay in the table.
+        if pondered is not None and state.max_step - state.step > self._endgame_plies:
+            logger.info(
+                f"{self.get_name()} - ponder hit, depth {pondered.depth}, score {pondered.score}, "
+                f"{pondered.nodes} nodes in {pondered.elapsed:.2f}s ({self._ponderer.hits} hits, {self._ponderer.misses} misses)"
+            )
+            return pondered.move
+        if state.max_step - state.step <= self._endgame_plies:
+            start = time.perf_counter()
+            solved = self._solver.solve(state, budget / 2)
+            if solved is not None:
+                logger.info(f"{self.get_name()} - endgame solved, value {solved.value}, {solved.nodes} nodes in {solved.elapsed:.2f}s")
+                # A proven loss is left to the search, which plays the move most likely to make the opponent err.
+                if solved.value >= DRAW:
+                    return solved.move
+            budget -= time.perf_counter() - start
+        self._search.orderer.reset_stats()
+        result = self._search.search(state, max(budget, MIN_MOVE_TIME), self._max_depth)
+        ordering = self._search.orderer.get_stats()
+        logger.info(
+            f"{self.get_name()} - depth {result.depth}, score {result.score}, "
+            f"{result.nodes} nodes in {result.elapsed:.2f}s ({result.get_nps():.0f} nodes/s), "
+            f"first move cutoffs {ordering['first_move_cutoff_rate']:.0%}"
+        )
+        return result.move
@@ -0,0 +1,142 @@
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from board_abalone import BoardAbalone
+from evaluation_abalone import CENTRE_WEIGHT, COHESION_WEIGHT, MATERIAL_WEIGHT
+from geometry_abalone import CELLS, CENTRE_DISTANCE, DIRECTION_INDEX, DIRECTIONS, N_CELLS, NEIGHBOURS
+from search_state_abalone import SearchStateAbalone
+
+# A batch of boards is an (N, N_CELLS) int8 array: 1 for a marble of the
+# reference player, -1 for a marble of the other one, 0 for an empty cell.
+# Every feature and score is seen from the reference player.
+EDGE_DANGER_WEIGHT = 20
+FEATURES = ("material", "centre", "cohesion", "edge_danger")
+WEIGHTS = np.array([MATERIAL_WEIGHT, CENTRE_WEIGHT, COHESION_WEIGHT, EDGE_DANGER_WEIGHT], dtype=np.int64)
+
+_CENTRE_DISTANCE = np.array(CENTRE_DISTANCE, dtype=np.int32)
+_BITS = np.arange(N_CELLS, dtype=np.uint64)
+
+
+def _pairs() -> Tuple[np.ndarray, np.ndarray]:
+    firsts, seconds = [], []
+    for k in range(N_CELLS):
+        for q in NEIGHBOURS[k]:
+            if q > k:
+                firsts.append(k)
+                seconds.append(q)
+    return np.array(firsts), np.array(seconds)
+
+
+def _threats() -> Tuple[np.ndarray, np.ndarray]:
+    cells, behinds = [], []
+    for k in range(N_CELLS):
+        for d, (n_i, n_j) in enumerate(DIRECTIONS):
+            behind = NEIGHBOURS[k][DIRECTION_INDEX[(-n_i, -n_j)]]
+            if NEIGHBOURS[k][d] < 0 and behind >= 0:
+                cells.append(k)
+                behinds.append(behind)
+    return np.array(cells), np.array(behinds)
+
+
+# Pairs of neighbour cells, each pair once.
+PAIR_FIRST, PAIR_SECOND = _pairs()
+# (cell, behind) pairs: a marble on cell can be pushed off the board by a marble on behind.
+THREAT_CELL, THREAT_BEHIND = _threats()
+
+
+def encode_boards(boards: Sequence[BoardAbalone], owner_id: int) -> np.ndarray:
+    """
+    Args:
+        boards (Sequence[BoardAbalone]): boards to encode
+        owner_id (int): id of the reference player
+
+    Returns:
+        np.ndarray: the (N, N_CELLS) int8 array of the boards
+    """
+    batch = np.zeros((len(boards), N_CELLS), dtype=np.int8)
+    for n, board in enumerate(boards):
+        env = board.get_env()
+        batch[n] = [(1 if env[pos].get_owner_id() == owner_id else -1) if pos in env else 0 for pos in CELLS]
+    return batch
+
+
+def encode_masks(masks: Sequence[Tuple[int, int]]) -> np.ndarray:
+    """
+    Args:
+        masks (Sequence[Tuple[int, int]]): occupancy masks of the reference player and of the other one
+
+    Returns:
+        np.ndarray: the (N, N_CELLS) int8 array of the boards
+    """
+    masks = np.array(masks, dtype=np.uint64).reshape(-1, 2)
+    mine = (masks[:, 0:1] >> _BITS) & np.uint64(1)
+    theirs = (masks[:, 1:2] >> _BITS) & np.uint64(1)
+    return mine.astype(np.int8) - theirs.astype(np.int8)
+
+
+def encode_states(states: Sequence[SearchStateAbalone]) -> np.ndarray:
+    """
+    Args:
+        states (Sequence[SearchStateAbalone]): states to encode, the reference player being the player to move
+
+    Returns:
+        np.ndarray: the (N, N_CELLS) int8 array of the boards
+    """
+    return encode_masks([(s.masks[s.side], s.masks[1 - s.side]) for s in states])
+
+
+def compute_features(batch: np.ndarray) -> np.ndarray:
+    """
+    Compute the features of a batch of boards, in the order of FEATURES:
+    material difference, difference of the summed distances to the centre,
+    difference of the numbers of neighbour pairs and difference of the numbers
+    of marbles that can be pushed off the board.
+
+    Args:
+        batch (np.ndarray): (N, N_CELLS) int8 array of boards
+
+    Returns:
+        np.ndarray: (N, len(FEATURES)) int32 array of features, seen from the reference player
+    """
+    mine = (batch == 1).astype(np.int32)
+    theirs = (batch == -1).astype(np.int32)
+    features = np.empty((batch.shape[0], len(FEATURES)), dtype=np.int32)
+    features[:, 0] = mine.sum(axis=1) - theirs.sum(axis=1)
+    features[:, 1] = (theirs - mine) @ _CENTRE_DISTANCE
+    features[:, 2] = (mine[:, PAIR_FIRST] & mine[:, PAIR_SECOND]).sum(axis=1) - (
+        theirs[:, PAIR_FIRST] & theirs[:, PAIR_SECOND]
+    ).sum(axis=1)
+    features[:, 3] = (theirs[:, THREAT_CELL] & mine[:, THREAT_BEHIND]).sum(axis=1) - (
+        mine[:, THREAT_CELL] & theirs[:, THREAT_BEHIND]
+    ).sum(axis=1)
+    return features
+
+
+def evaluate_batch(batch: np.ndarray, weights: np.ndarray = WEIGHTS) -> np.ndarray:
+    """
+    Score a batch of boards. With the weights (MATERIAL_WEIGHT, CENTRE_WEIGHT, COHESION_WEIGHT, 0),
+    the scores are the ones of evaluation_abalone.evaluate without its edge ring term.
+
+    Args:
+        batch (np.ndarray): (N, N_CELLS) int8 array of boards
+        weights (np.ndarray, optional): weights of the features, in the order of FEATURES
+
+    Returns:
+        np.ndarray: (N,) int64 array of scores, seen from the reference player
+    """
+    return compute_features(batch).astype(np.int64) @ np.asarray(weights, dtype=np.int64)
+
+
+def evaluate_states(states: Sequence[SearchStateAbalone], weights: np.ndarray = WEIGHTS) -> List[int]:
+    """
+    Args:
+        states (Sequence[SearchStateAbalone]): states to score
+        weights (np.ndarray, optional): weights of the features, in the order of FEATURES
+
+    Returns:
+        List[int]: the score of each state for its player to move
+    """
+    if not states:
+        return []
+    return evaluate_batch(encode_states(states), weights).tolist()
@@ -0,0 +1,165 @@
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+from geometry_abalone import N_CELLS, RAYS
+
+# Boards are stacked as in batch_evaluation_abalone: an (N, N_CELLS) int8
+# array, 1 for a marble of the player to move, -1 for a marble of the other
+# player, 0 for an empty cell. OFF is the value of the padding cell standing
+# for the outside of the board.
+OFF = 2
+# A legal line is at most 3 marbles followed by 2 pushed ones and the cell
+# they are pushed to: 5 cells after the origin are enough.
+RAY_LENGTH = 5
+
+
+def _paths() -> np.ndarray:
+    paths = np.full((N_CELLS, 6, RAY_LENGTH + 1), N_CELLS, dtype=np.intp)
+    for k in range(N_CELLS):
+        for d, ray in enumerate(RAYS[k]):
+            paths[k, d, 0] = k
+            paths[k, d, 1 : len(ray[:RAY_LENGTH]) + 1] = ray[:RAY_LENGTH]
+    return paths
+
+
+# PATHS[k, d]: cell k followed by the cells of its ray in direction d,
+# padded with the index N_CELLS of the outside of the board.
+PATHS = _paths()
+
+
+class BatchMoves(NamedTuple):
+    """
+    The legal moves of a stack of boards, as parallel arrays sorted by board, origin and direction.
+
+    Attributes:
+        board (np.ndarray): index of the board of each move
+        origin (np.ndarray): cell of the rearmost moved marble
+        direction (np.ndarray): index of the direction in DIRECTIONS
+        n_moved (np.ndarray): number of marbles of the player moved
+        n_pushed (np.ndarray): number of marbles of the opponent pushed
+        ejection (np.ndarray): True when the foremost marble leaves the board
+    """
+
+    board: np.ndarray
+    origin: np.ndarray
+    direction: np.ndarray
+    n_moved: np.ndarray
+    n_pushed: np.ndarray
+    ejection: np.ndarray
+
+    def count_per_board(self, n_boards: int) -> np.ndarray:
+        """
+        Args:
+            n_boards (int): number of boards of the stack
+
+        Returns:
+            np.ndarray: number of legal moves of each board
+        """
+        return np.bincount(self.board, minlength=n_boards)
+
+    def select(self, indices: np.ndarray) -> "BatchMoves":
+        """
+        Args:
+            indices (np.ndarray): indices of the moves to keep
+
+        Returns:
+            BatchMoves: the selected moves
+        """
+        return BatchMoves(*(field[indices] for field in self))
+
+
+def pad(batch: np.ndarray) -> np.ndarray:
+    """
+    Args:
+        batch (np.ndarray): (N, N_CELLS) int8 array of boards
+
+    Returns:
+        np.ndarray: (N, N_CELLS + 1) copy of the boards followed by the outside cell
+    """
+    padded = np.full((batch.shape[0], N_CELLS + 1), OFF, dtype=np.int8)
+    padded[:, :N_CELLS] = batch
+    return padded
+
+
+def generate_batch_moves(batch: np.ndarray) -> BatchMoves:
+    """
+    Generate the legal moves of every board of a stack, with the rules of GameStateAbalone.detect_conflict.
+
+    Args:
+        batch (np.ndarray): (N, N_CELLS) int8 array of boards, 1 standing for the player to move
+
+    Returns:
+        BatchMoves: the legal moves of all boards
+    """
+    cells = pad(batch)[:, PATHS[:, :, 1:]]
+    own = cells == 1
+    # Own marbles in line, the origin included, and the three cells after them.
+    n_moved = 1 + own[..., 0] + (own[..., 0] & own[..., 1])
+    after = np.take_along_axis(cells, (n_moved - 1)[..., None] + np.arange(3), axis=-1)
+    first, second, third = after[..., 0], after[..., 1], after[..., 2]
+    n_pushed = (first == -1).astype(np.int8) + ((first == -1) & (second == -1)) + (
+        (first == -1) & (second == -1) & (third == -1)
+    )
+    # Cell met after the pushed marbles.
+    stop = np.take_along_axis(after, np.minimum(n_pushed, 2)[..., None].astype(np.intp), axis=-1)[..., 0]
+    stop = np.where(n_pushed == 3, -1, stop)
+    legal = (
+        (batch[:, :, None] == 1)
+        & ~(own[..., 0] & own[..., 1] & own[..., 2])
+        & (n_pushed < n_moved)
+        & (stop != 1)
+    )
+    board, origin, direction = np.nonzero(legal)
+    return BatchMoves(
+        board,
+        origin,
+        direction,
+        n_moved[board, origin, direction].astype(np.int8),
+        n_pushed[board, origin, direction],
+        stop[board, origin, direction] == OFF,
+    )
+
+
+def apply_batch_moves(batch: np.ndarray, moves: BatchMoves) -> np.ndarray:
+    """
+    Play at most one move per board.
+
+    Args:
+        batch (np.ndarray): (N, N_CELLS) int8 array of boards, 1 standing for the player to move
+        moves (BatchMoves): moves to play, at most one per board
+
+    Returns:
+        np.ndarray: the boards after the moves, seen from the player to move next
+            (the boards without a move are only seen from the other side)
+    """
+    padded = pad(batch)
+    paths = PATHS[moves.origin, moves.direction]
+    rows = moves.board[:, None]
+    line = padded[rows, paths]
+    shifted = np.zeros_like(line)
+    shifted[:, 1:] = line[:, :-1]
+    length = (moves.n_moved + moves.n_pushed)[:, None]
+    line = np.where(np.arange(RAY_LENGTH + 1) <= length, shifted, line)
+    padded[rows, paths] = line
+    return -padded[:, :N_CELLS]
+
+
+def sample_batch_moves(moves: BatchMoves, n_boards: int, rng: Optional[np.random.Generator] = None) -> BatchMoves:
+    """
+    Pick one legal move uniformly at random on every board that has one.
+
+    Args:
+        moves (BatchMoves): legal moves of the boards
+        n_boards (int): number of boards of the stack
+        rng (np.random.Generator, optional): random generator to use
+
+    Returns:
+        BatchMoves: one move per board having a legal move
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    counts = moves.count_per_board(n_boards)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    has_move = counts > 0
+    picks = starts[has_move] + (rng.random(int(has_move.sum())) * counts[has_move]).astype(np.intp)
+    return moves.select(picks)
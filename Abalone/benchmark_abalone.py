@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from loguru import logger
+from board_abalone import BoardAbalone
+from game_state_abalone import GameStateAbalone
+from layouts_abalone import LAYOUTS
+from perft_abalone import POSITIONS, build_position, perft, perft_search
+from search_state_abalone import SearchStateAbalone
+
+# Each benchmark is run for at least MIN_TIME, REPEAT times, and the fastest run is kept.
+MIN_TIME = 0.5
+REPEAT = 3
+# Depth of the perft benchmark, one more ply for the much faster search state.
+PERFT_DEPTH = 2
+
+
+def to_json_string(obj) -> str:
+    # As the master and the proxies of seahorse serialize the states.
+    return json.dumps(obj.to_json(), default=lambda x: x.to_json())
+
+
+def bench_generator(states: List[GameStateAbalone]) -> int:
+    return sum(sum(1 for _ in state.generator()) for state in states)
+
+
+def bench_possible_actions(states: List[GameStateAbalone]) -> int:
+    return sum(len(state.generate_possible_actions()) for state in states)
+
+
+def bench_successors(states: List[GameStateAbalone]) -> int:
+    n = 0
+    for state in states:
+        for move in state.generate_moves():
+            state.apply_move(move)
+            n += 1
+    return n
+
+
+def bench_board_json(states: List[GameStateAbalone]) -> int:
+    for state in states:
+        BoardAbalone.from_json(to_json_string(state.get_rep()))
+    return len(states)
+
+
+def bench_state_json(states: List[GameStateAbalone]) -> int:
+    for state in states:
+        GameStateAbalone.from_json(to_json_string(state), next_player=state.next_player)
+    return len(states)
+
+
+def bench_perft(states: List[GameStateAbalone]) -> int:
+    return sum(perft(state, PERFT_DEPTH) for state in states)
+
+
+def bench_perft_search(states: List[GameStateAbalone]) -> int:
+    return sum(perft_search(SearchStateAbalone.from_game_state(state), PERFT_DEPTH + 1) for state in states)
+
+
+# Unit counted and function of each benchmark. A function processes all the
+# positions once and returns the number of units processed.
+BENCHMARKS: Dict[str, Tuple[str, Callable[[List[GameStateAbalone]], int]]] = {
+    "generator": ("successors", bench_generator),
+    "generate_possible_actions": ("actions", bench_possible_actions),
+    "successors": ("states", bench_successors),
+    "board_json": ("round trips", bench_board_json),
+    "state_json": ("round trips", bench_state_json),
+    "perft": ("leaves", bench_perft),
+    "perft_search": ("leaves", bench_perft_search),
+}
+
+
+def time_benchmark(fn: Callable[[List[GameStateAbalone]], int], states: List[GameStateAbalone], min_time: float = MIN_TIME, repeat: int = REPEAT) -> dict:
+    """
+    Time a benchmark function on the positions.
+
+    Args:
+        fn (Callable[[List[GameStateAbalone]], int]): the benchmark, returning the number of units processed
+        states (List[GameStateAbalone]): the positions
+        min_time (float, optional): minimal duration of a run in (s), the positions being processed again until it is reached
+        repeat (int, optional): number of runs, the fastest one being kept
+
+    Returns:
+        dict: units processed, duration in (s) and units per second of the fastest run
+    """
+    best = None
+    for _ in range(repeat):
+        units = 0
+        start = time.perf_counter()
+        while True:
+            units += fn(states)
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_time:
+                break
+        if best is None or units / elapsed > best["rate"]:
+            best = {"units": units, "seconds": elapsed, "rate": units / elapsed}
+    return best
+
+
+def get_commit() -> Optional[str]:
+    """
+    Returns:
+        Optional[str]: the git commit of the code, with a "+" when the tree is modified, None outside of a git repository
+    """
+    folder = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=folder, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=folder, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ("+" if dirty else "")
+
+
+def run_benchmarks(names: List[str], positions: List[str], min_time: float = MIN_TIME, repeat: int = REPEAT) -> dict:
+    """
+    Run benchmarks on positions.
+
+    Args:
+        names (List[str]): names of benchmarks of BENCHMARKS
+        positions (List[str]): names of layouts or of positions of POSITIONS
+        min_time (float, optional): minimal duration of a run in (s)
+        repeat (int, optional): number of runs of each benchmark
+
+    Returns:
+        dict: the environment of the run and the result of each benchmark
+    """
+    states = [build_position(name) for name in positions]
+    results = {}
+    for name in names:
+        unit, fn = BENCHMARKS[name]
+        results[name] = {"unit": unit, **time_benchmark(fn, states, min_time, repeat)}
+        logger.info(f"{name}: {results[name]['rate']:.0f} {unit}/s")
+    return {
+        "commit": get_commit(),
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "positions": positions,
+        "results": results,
+    }
+
+
+def compare(before: dict, after: dict) -> Dict[str, float]:
+    """
+    Args:
+        before (dict): a run of run_benchmarks
+        after (dict): a later run
+
+    Returns:
+        Dict[str, float]: ratio of the speeds of the benchmarks of both runs, above 1 when after is faster
+    """
+    return {
+        name: result["rate"] / before["results"][name]["rate"]
+        for name, result in after["results"].items()
+        if name in before["results"]
+    }
+
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(prog="benchmark_abalone.py", description="Measures the speed of the rules engine on the starting layouts and on stored positions, and prints the results as json.")
+    parser.add_argument("-b","--benchmarks",required=False,nargs="+",choices=list(BENCHMARKS), default=list(BENCHMARKS), help="Benchmarks to run.")
+    parser.add_argument("-p","--positions",required=False,nargs="+",choices=list(LAYOUTS)+list(POSITIONS), default=list(LAYOUTS)+list(POSITIONS), help="Positions to run them on.")
+    parser.add_argument("-t","--min-time",required=False,type=float, default=MIN_TIME, help="Minimal duration of a run in (s).")
+    parser.add_argument("-n","--repeat",required=False,type=int, default=REPEAT, help="Number of runs of each benchmark, the fastest one being kept.")
+    parser.add_argument("-o","--output",required=False, default=None, help="Json file receiving the results.")
+    parser.add_argument("-c","--compare",required=False, default=None, help="Json file of a previous run, whose speeds are compared to this one.")
+    args=parser.parse_args()
+
+    run = run_benchmarks(args.benchmarks, args.positions, args.min_time, args.repeat)
+    if args.compare:
+        with open(args.compare) as f:
+            before = json.load(f)
+        run["compared_to"] = before.get("commit")
+        run["ratios"] = compare(before, run)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+    print(json.dumps(run, indent=2))
@@ -0,0 +1,63 @@
+import struct
+from typing import Tuple
+
+# Every binary message starts with a header: magic, version of the encoding and kind of the payload.
+MAGIC = b"AB"
+VERSION = 1
+KIND_BOARD = 1
+KIND_STATE = 2
+HEADER = struct.Struct("<2sBB")
+# Length of a string, then its utf-8 bytes.
+STRING_LENGTH = struct.Struct("<H")
+
+
+def pack_header(kind: int) -> bytes:
+    """
+    Args:
+        kind (int): kind of the payload, KIND_BOARD or KIND_STATE
+
+    Returns:
+        bytes: the header of a message of this kind
+    """
+    return HEADER.pack(MAGIC, VERSION, kind)
+
+
+def unpack_header(data: bytes, kind: int) -> int:
+    """
+    Check the header of a message.
+
+    Args:
+        data (bytes): the message
+        kind (int): kind of payload expected
+
+    Raises:
+        ValueError: if the message is not of the expected kind or version
+
+    Returns:
+        int: offset of the payload
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Truncated message")
+    magic, version, found = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not an Abalone binary message")
+    if version != VERSION:
+        raise ValueError(f"Unsupported encoding version {version}, expected {VERSION}")
+    if found != kind:
+        raise ValueError(f"Unexpected payload kind {found}, expected {kind}")
+    return HEADER.size
+
+
+def pack_string(value: str) -> bytes:
+    encoded = value.encode("utf-8")
+    return STRING_LENGTH.pack(len(encoded)) + encoded
+
+
+def unpack_string(data: bytes, offset: int) -> Tuple[str, int]:
+    """
+    Returns:
+        Tuple[str, int]: the string and the offset following it
+    """
+    (length,) = STRING_LENGTH.unpack_from(data, offset)
+    offset += STRING_LENGTH.size
+    return bytes(data[offset : offset + length]).decode("utf-8"), offset + length
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from typing import Iterator, List, Optional, Tuple
+
+from board_abalone import BoardAbalone
+from geometry_abalone import CELL_INDEX, CELLS, DIMENSIONS, N_CELLS
+from piece_abalone import get_piece
+from seahorse.player.player import Player
+
+FULL_MASK = (1 << N_CELLS) - 1
+
+
+def pos_to_index(i: int, j: int) -> int:
+    """
+    Return the cell index of the position (i, j).
+
+    Args:
+        i (int): line indice
+        j (int): column indice
+
+    Returns:
+        int: index of the cell, -1 if (i, j) is not a playable cell
+    """
+    return CELL_INDEX.get((i, j), -1)
+
+
+def index_to_pos(k: int) -> Tuple[int, int]:
+    """
+    Return the position (i, j) of a cell index.
+
+    Args:
+        k (int): index of the cell
+
+    Returns:
+        Tuple[int, int]: position of the cell on the doubled grid
+    """
+    return CELLS[k]
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """
+    Iterate over the indices of the bits set in a mask, lowest first.
+
+    Args:
+        mask (int): occupancy mask
+
+    Yields:
+        int: index of a set bit
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitBoardAbalone:
+    """
+    A compact representation of an Abalone board made of two occupancy masks.
+
+    Bit k of masks[p] is set when the cell CELLS[k] holds a marble of the p-th owner.
+
+    Attributes:
+        masks (list[int]): Occupancy masks, one per player.
+        owner_ids (tuple[int]): Ids of the players, in the order of the masks.
+        piece_types (tuple[str]): Piece types of the players, in the order of the masks.
+        dimensions (list[int]): The dimensions of the board.
+    """
+
+    __slots__ = ("masks", "owner_ids", "piece_types", "dimensions")
+
+    def __init__(self, masks: List[int], owner_ids: Tuple[int, int], piece_types: Tuple[str, str], dim: Optional[List[int]] = None) -> None:
+        self.masks = list(masks)
+        self.owner_ids = tuple(owner_ids)
+        self.piece_types = tuple(piece_types)
+        self.dimensions = dim if dim is not None else list(DIMENSIONS)
+
+    @classmethod
+    def from_board(cls, board: BoardAbalone, players: Optional[List[Player]] = None) -> BitBoardAbalone:
+        """
+        Build the bitboard of a BoardAbalone.
+
+        Args:
+            board (BoardAbalone): board to convert
+            players (List[Player], optional): players giving the order of the masks.
+                When omitted, the owners found on the board are sorted by id.
+
+        Returns:
+            BitBoardAbalone: the equivalent bitboard
+        """
+        env = board.get_env()
+        if players is not None:
+            owner_ids = [p.get_id() for p in players]
+            piece_types = [p.get_piece_type() if hasattr(p, "get_piece_type") else None for p in players]
+        else:
+            owner_ids = sorted({p.get_owner_id() for p in env.values()})
+            piece_types = [None] * len(owner_ids)
+        if len(owner_ids) > 2:
+            raise ValueError(f"A bitboard holds two players, got {len(owner_ids)}")
+        while len(owner_ids) < 2:
+            owner_ids.append(None)
+            piece_types.append(None)
+        masks = [0, 0]
+        for pos, piece in env.items():
+            k = CELL_INDEX.get(pos)
+            if k is None:
+                raise ValueError(f"{pos} is not a playable cell")
+            p = owner_ids.index(piece.get_owner_id())
+            masks[p] |= 1 << k
+            piece_types[p] = piece.get_type()
+        return cls(masks, tuple(owner_ids), tuple(piece_types), board.get_dimensions())
+
+    def to_board(self) -> BoardAbalone:
+        """
+        Build the BoardAbalone holding the same marbles.
+
+        Returns:
+            BoardAbalone: the equivalent board
+        """
+        env = {}
+        for p in range(2):
+            piece = get_piece(self.piece_types[p], self.owner_ids[p])
+            for k in iter_bits(self.masks[p]):
+                env[CELLS[k]] = piece
+        return BoardAbalone(env=env, dim=self.dimensions)
+
+    def get_occupied(self) -> int:
+        """
+        Returns:
+            int: mask of the cells holding a marble
+        """
+        return self.masks[0] | self.masks[1]
+
+    def get_empty(self) -> int:
+        """
+        Returns:
+            int: mask of the empty playable cells
+        """
+        return FULL_MASK & ~(self.masks[0] | self.masks[1])
+
+    def count(self, p: int) -> int:
+        """
+        Args:
+            p (int): index of the player
+
+        Returns:
+            int: number of marbles of the player on the board
+        """
+        return self.masks[p].bit_count()
+
+    def owner_at(self, k: int) -> int:
+        """
+        Args:
+            k (int): index of the cell
+
+        Returns:
+            int: index of the player owning the cell, -1 if it is empty
+        """
+        bit = 1 << k
+        if self.masks[0] & bit:
+            return 0
+        if self.masks[1] & bit:
+            return 1
+        return -1
+
+    def copy(self) -> BitBoardAbalone:
+        return BitBoardAbalone(self.masks, self.owner_ids, self.piece_types, self.dimensions)
+
+    def __hash__(self) -> int:
+        return hash((self.masks[0], self.masks[1], self.owner_ids))
+
+    def __eq__(self, __value: object) -> bool:
+        return isinstance(__value, BitBoardAbalone) and self.masks == __value.masks and self.owner_ids == __value.owner_ids
+
+    def __str__(self) -> str:
+        return self.to_board().__str__()
@@ -1,10 +1,24 @@
 from __future__ import annotations
-from typing import Any, List, Tuple
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
 
 import json
+import struct
 from typing import Dict
+from binary_abalone import KIND_BOARD, pack_header, pack_string, unpack_header, unpack_string
+from geometry_abalone import CELLS, FORBIDDEN_MASK, GRID_POSITIONS, GRID_SIZE, NEIGHBOUR_TABLE, neighbour_entries
+from piece_abalone import get_piece
 from seahorse.game.game_layout.board import Board, Piece
+from seahorse.player.player import Player
 from seahorse.utils.serializer import Serializable
+from zobrist_abalone import board_key
+
+if TYPE_CHECKING:
+    from bitboard_abalone import BitBoardAbalone
+
+# Binary payload of a board: dimensions, then for each owner a presence flag,
+# its id and its occupancy mask, followed by its piece type.
+BOARD_DIM = struct.Struct("<BB")
+BOARD_OWNER = struct.Struct("<BqQ")
 
 
 class BoardAbalone(Board):
@@ -19,28 +33,30 @@ class BoardAbalone(Board):
     EMPTY_POS=3
     FORBIDDEN_POS=0
 
-    FORBIDDEN_MASK = [
-     [True,  True,  True,  True,  False, True,  True,  True,  True],
-     [True,  True,  True,  False, True,  False, True,  True,  True],
-     [True,  True,  False, True,  False, True,  False, True,  True],
-     [True,  False, True,  False, True,  False, True,  False, True],
-     [False, True,  False, True,  False, True,  False, True,  False],
-     [True,  False, True,  False, True,  False, True,  False, True],
-     [False, True,  False, True,  False, True,  False, True,  False],
-     [True,  False, True,  False, True,  False, True,  False, True],
-     [False, True,  False, True,  False, True,  False, True,  False],
-     [True,  False, True,  False, True,  False, True,  False, True],
-     [False, True,  False, True,  False, True,  False, True,  False],
-     [True,  False, True,  False, True,  False, True,  False, True],
-     [False, True,  False, True,  False, True,  False, True,  False],
-     [True,  False, True,  False, True,  False, True,  False, True],
-     [True,  True,  False, True,  False, True,  False, True,  True],
-     [True,  True,  True,  False, True,  False, True,  True,  True],
-     [True,  True,  True,  True,  False, True,  True,  True,  True],
-    ]
-
-    def __init__(self, env: dict[tuple[int], Piece], dim: list[int]) -> None:
+    FORBIDDEN_MASK = FORBIDDEN_MASK
+
+    def __init__(self, env: dict[tuple[int], Piece], dim: list[int], zobrist_key: Optional[int] = None) -> None:
         super().__init__(env, dim)
+        self._zobrist_key = zobrist_key
+
+    def get_zobrist_key(self) -> int:
+        """
+        Return the 64 bits Zobrist key of the marbles on the board.
+
+        The key is computed on first use unless it was given, updated incrementally, at construction.
+
+        Returns:
+            int: The Zobrist key of the board.
+        """
+        if self._zobrist_key is None:
+            self._zobrist_key = board_key(self.env)
+        return self._zobrist_key
+
+    def __hash__(self) -> int:
+        return self.get_zobrist_key()
+
+    def __eq__(self, __value: object) -> bool:
+        return isinstance(__value, BoardAbalone) and self.get_zobrist_key() == __value.get_zobrist_key()
 
     def __str__(self) -> str:
         """
@@ -77,18 +93,18 @@ class BoardAbalone(Board):
         Returns:
             Dict[str,Tuple[str,Tuple[int,int]]]: dictionnary of the neighbours of the cell (i,j)
         """
-        neighbours = {"top_left":(i-1,j-1), "top_right":(i-2,j), "left":(i+1,j-1), "right":(i-1,j+1), "bottom_left":(i+2,j), "bottom_right":(i+1,j+1)}
-        for k,v in neighbours.items():
-            if v not in self.env.keys():
-                if v[0] < 0 or v[1] < 0 or v[0] >= self.dimensions[0] or v[1] >= self.dimensions[1]:
-                    neighbours[k] = ("OUTSIDE",neighbours[k])
-                else:
-                    if BoardAbalone.FORBIDDEN_MASK[v[0]][v[1]]:
-                        neighbours[k] = ("OUTSIDE",neighbours[k])
-                    else:
-                        neighbours[k] = ("EMPTY",neighbours[k])
+        entries = NEIGHBOUR_TABLE.get((i, j))
+        if entries is None:
+            entries = neighbour_entries(i, j)
+        neighbours = {}
+        for name, pos, inside in entries:
+            piece = self.env.get(pos)
+            if piece is not None:
+                neighbours[name] = (piece.get_type(), pos)
+            elif inside:
+                neighbours[name] = ("EMPTY", pos)
             else:
-                neighbours[k] = (self.env[neighbours[k]].get_type(),neighbours[k])
+                neighbours[name] = ("OUTSIDE", pos)
         return neighbours
 
     def get_grid(self) -> List[List[int]]:
@@ -98,46 +114,104 @@ class BoardAbalone(Board):
         Returns:
             str: The nice representation of the board.
         """
-        grid_data = [
-            [0, 0, 2, 2, 2, 2, 2, 0, 0],
-            [0, 2, 2, 2, 2, 2, 2, 0, 0],
-            [0, 3, 3, 2, 2, 2, 3, 3, 0],
-            [3, 3, 3, 3, 3, 3, 3, 3, 0],
-            [3, 3, 3, 3, 3, 3, 3, 3, 3],
-            [3, 3, 3, 3, 3, 3, 3, 3, 0],
-            [0, 3, 3, 1, 1, 1, 3, 3, 0],
-            [0, 1, 1, 1, 1, 1, 1, 0, 0],
-            [0, 0, 1, 1, 1, 1, 1, 0, 0],
-        ]
-        positions = [
-            ((0, 6), (0, 4)), ((0, 5), (1, 3)), ((0, 4), (2, 2)),
-            ((0, 3), (3, 1)), ((0, 2), (4, 0)), ((1, 6), (1, 5)),
-            ((1, 5), (2, 4)), ((1, 4), (3, 3)), ((1, 3), (4, 2)),
-            ((1, 2), (5, 1)), ((1, 1), (6, 0)), ((2, 7), (2, 6)),
-            ((2, 6), (3, 5)), ((2, 5), (4, 4)), ((2, 4), (5, 3)),
-            ((2, 3), (6, 2)), ((2, 2), (7, 1)), ((2, 1), (8, 0)),
-            ((3, 7), (3, 7)), ((3, 6), (4, 6)), ((3, 5), (5, 5)),
-            ((3, 4), (6, 4)), ((3, 3), (7, 3)), ((3, 2), (8, 2)),
-            ((3, 1), (9, 1)), ((4, 8), (4, 8)), ((4, 7), (5, 7)),
-            ((4, 6), (6, 6)), ((4, 5), (7, 5)), ((4, 4), (8, 4)),
-            ((4, 3), (9, 3)), ((5, 7), (6, 8)), ((5, 6), (7, 7)),
-            ((5, 5), (8, 6)), ((5, 4), (9, 5)), ((6, 7), (8, 8)),
-            ((6, 6), (9, 7)), ((5, 3), (10, 4)), ((5, 2), (11, 3)),
-            ((5, 1), (12, 2)), ((5, 0), (13, 1)), ((4, 2), (10, 2)),
-            ((4, 1), (11, 1)), ((4, 0), (12, 0)), ((6, 5), (10, 6)),
-            ((6, 4), (11, 5)), ((6, 3), (12, 4)), ((6, 2), (13, 3)),
-            ((6, 1), (14, 2)), ((7, 6), (10, 8)), ((7, 5), (11, 7)),
-            ((7, 4), (12, 6)), ((7, 3), (13, 5)), ((7, 2), (14, 4)),
-            ((7, 1), (15, 3)), ((8, 6), (12, 8)), ((8, 5), (13, 7)),
-            ((8, 4), (14, 6)), ((8, 3), (15, 5)), ((8, 2), (16, 4)),
-            ((3, 0), (10, 0))
-        ]
-
-        for x,y in positions:
-            grid_data[x[0]][x[1]] = self.get_env().get(y).get_type() if  self.get_env().get(y) else BoardAbalone.EMPTY_POS
+        grid_data = [[BoardAbalone.FORBIDDEN_POS] * GRID_SIZE for _ in range(GRID_SIZE)]
+        env = self.get_env()
+        for pos, (row, col) in zip(CELLS, GRID_POSITIONS):
+            piece = env.get(pos)
+            grid_data[row][col] = piece.get_type() if piece else BoardAbalone.EMPTY_POS
 
         return grid_data
 
+    def get_changes(self, previous: BoardAbalone) -> Dict[Tuple[int, int], Optional[str]]:
+        """
+        Compute the cells which changed since a previous board.
+
+        Args:
+            previous (BoardAbalone): the previous board
+
+        Returns:
+            Dict[Tuple[int, int], Optional[str]]: the new piece type of each changed cell, None for a cell emptied
+        """
+        env, old = self.get_env(), previous.get_env()
+        changes = {}
+        for pos in env.keys() | old.keys():
+            piece, old_piece = env.get(pos), old.get(pos)
+            piece_type = piece.get_type() if piece else None
+            if piece_type != (old_piece.get_type() if old_piece else None):
+                changes[pos] = piece_type
+        return changes
+
+    def to_bitboard(self, players: Optional[List[Player]] = None) -> BitBoardAbalone:
+        """
+        Convert the board to its bitboard representation.
+
+        Args:
+            players (List[Player], optional): players giving the order of the occupancy masks
+
+        Returns:
+            BitBoardAbalone: the equivalent bitboard
+        """
+        from bitboard_abalone import BitBoardAbalone
+        return BitBoardAbalone.from_board(self, players)
+
+    @classmethod
+    def from_bitboard(cls, bitboard: BitBoardAbalone) -> BoardAbalone:
+        """
+        Build a board from its bitboard representation.
+
+        Args:
+            bitboard (BitBoardAbalone): the bitboard to convert
+
+        Returns:
+            BoardAbalone: the equivalent board
+        """
+        return bitboard.to_board()
+
+    def to_bytes(self, players: Optional[List[Player]] = None) -> bytes:
+        """
+        Encode the board in the compact binary format: two occupancy masks and their owners.
+
+        Args:
+            players (List[Player], optional): players giving the order of the masks
+
+        Returns:
+            bytes: the encoded board
+        """
+        bitboard = self.to_bitboard(players)
+        parts = [pack_header(KIND_BOARD), BOARD_DIM.pack(*bitboard.dimensions)]
+        for p in range(2):
+            owner_id = bitboard.owner_ids[p]
+            parts.append(BOARD_OWNER.pack(owner_id is not None, owner_id or 0, bitboard.masks[p]))
+            parts.append(pack_string(bitboard.piece_types[p] or ""))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> BoardAbalone:
+        """
+        Decode a board encoded by to_bytes.
+
+        Args:
+            data (bytes): the encoded board
+
+        Raises:
+            ValueError: if data is not an encoded board of a supported version
+
+        Returns:
+            BoardAbalone: the decoded board
+        """
+        from bitboard_abalone import BitBoardAbalone
+        offset = unpack_header(data, KIND_BOARD)
+        dim = list(BOARD_DIM.unpack_from(data, offset))
+        offset += BOARD_DIM.size
+        owner_ids, masks, piece_types = [], [], []
+        for _ in range(2):
+            present, owner_id, mask = BOARD_OWNER.unpack_from(data, offset)
+            piece_type, offset = unpack_string(data, offset + BOARD_OWNER.size)
+            owner_ids.append(owner_id if present else None)
+            masks.append(mask)
+            piece_types.append(piece_type or None)
+        return BitBoardAbalone(masks, tuple(owner_ids), tuple(piece_types), dim).to_board()
+
     def to_json(self) -> dict:
         """
         Converts the board to a JSON object.
@@ -159,5 +233,5 @@ class BoardAbalone(Board):
         for x,y in d["env"].items():
             # TODO eval is unsafe
             del dd["env"][x]
-            dd["env"][eval(x)] = Piece.from_json(json.dumps(y))
+            dd["env"][eval(x)] = get_piece(y["piece_type"], y["owner_id"])
         return cls(**dd)
@@ -0,0 +1,153 @@
+import time
+from typing import NamedTuple, Optional
+
+from evaluation_abalone import final_score
+from move_abalone import MoveAbalone
+from move_ordering_abalone import MoveOrderer
+from search_abalone import CHECK_EVERY, SearchTimeoutError
+from search_state_abalone import SearchStateAbalone
+from transposition_table_abalone import BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, TranspositionTable
+
+# Game values, seen from the player to move.
+WIN = 1
+DRAW = 0
+LOSS = -1
+# Number of plies before max_step under which the engine player solves the game.
+ENDGAME_PLIES = 6
+
+
+class SolverResult(NamedTuple):
+    """
+    A proven game value.
+
+    Attributes:
+        move (MoveAbalone): a move reaching the value
+        value (int): WIN, DRAW or LOSS for the player to move
+        nodes (int): number of nodes visited
+        elapsed (float): duration of the solve in (s)
+    """
+
+    move: MoveAbalone
+    value: int
+    nodes: int
+    elapsed: float
+
+
+class EndgameSolver:
+    """
+    Exact solver of the end of a game: searches to the real end of the game
+    with the winning criterion of GameStateAbalone.compute_winners, on the
+    win/draw/loss values only, which makes the alpha-beta window tiny.
+
+    A position is also proven without search when the score difference is
+    larger than the number of plies left, each ply changing it by one at most.
+
+    Attributes:
+        tt (TranspositionTable): Table of the proven values, the depth of an entry being the number of plies left.
+        orderer (MoveOrderer): The move orderer.
+        nodes (int): Number of nodes visited by the current solve.
+    """
+
+    def __init__(self, tt_size_mb: float = 16) -> None:
+        self.tt = TranspositionTable(tt_size_mb)
+        self.orderer = MoveOrderer()
+        self.nodes = 0
+        self.deadline = float("inf")
+
+    def solve(self, state: SearchStateAbalone, time_budget: float) -> Optional[SolverResult]:
+        """
+        Solve a position.
+
+        Args:
+            state (SearchStateAbalone): position to solve, left untouched
+            time_budget (float): time allowed in (s)
+
+        Returns:
+            Optional[SolverResult]: the proven value and a move reaching it, None if the time ran out
+        """
+        start = time.perf_counter()
+        self.deadline = start + time_budget
+        self.nodes = 0
+        root = state.copy()
+        best_move = None
+        best_value = LOSS - 1
+        alpha = LOSS
+        try:
+            for move in root.generate_moves(self.orderer):
+                root.make_move(move)
+                value = -self.negamax(root, -WIN, -alpha, 1)
+                root.unmake_move(move)
+                if value > best_value:
+                    best_value = value
+                    best_move = move
+                    alpha = max(alpha, value)
+                    if value == WIN:
+                        break
+        except SearchTimeoutError:
+            return None
+        return SolverResult(best_move, best_value, self.nodes, time.perf_counter() - start)
+
+    def negamax(self, state: SearchStateAbalone, alpha: int, beta: int, ply: int) -> int:
+        """
+        Args:
+            state (SearchStateAbalone): position to solve, restored on return
+            alpha (int): lower bound of the window
+            beta (int): upper bound of the window
+            ply (int): distance to the root
+
+        Returns:
+            int: the value of the position for the player to move, exact inside the window
+        """
+        self.nodes += 1
+        if not self.nodes & CHECK_EVERY and time.perf_counter() > self.deadline:
+            raise SearchTimeoutError()
+        if state.is_done():
+            score = final_score(state)
+            return WIN if score > 0 else LOSS if score < 0 else DRAW
+        left = state.max_step - state.step
+        diff = state.scores[state.side] - state.scores[1 - state.side]
+        if diff > left:
+            return WIN
+        if diff < -left:
+            return LOSS
+
+        key = state.key
+        tt_move = -1
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_left, bound, value, tt_move, _ = entry
+            # The key does not hold the step: an entry only holds for the same number of plies left.
+            if tt_left == left:
+                if bound == BOUND_EXACT:
+                    return value
+                if bound == BOUND_LOWER and value >= beta:
+                    return value
+                if bound == BOUND_UPPER and value <= alpha:
+                    return value
+            else:
+                tt_move = -1
+
+        alpha_orig = alpha
+        best_value = LOSS - 1
+        best_move = None
+        for index, move in enumerate(state.generate_moves(self.orderer, ply, tt_move)):
+            state.make_move(move)
+            value = -self.negamax(state, -beta, -alpha, ply + 1)
+            state.unmake_move(move)
+            if value > best_value:
+                best_value = value
+                best_move = move
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        self.orderer.record_cutoff(move, state.side, ply, left, index)
+                        break
+
+        if best_value <= alpha_orig:
+            bound = BOUND_UPPER
+        elif best_value >= beta:
+            bound = BOUND_LOWER
+        else:
+            bound = BOUND_EXACT
+        self.tt.store(key, left, bound, best_value, best_move.encode(), True)
+        return best_value
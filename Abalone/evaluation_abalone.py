@@ -0,0 +1,69 @@
+from geometry_abalone import CENTRE_DISTANCE
+from search_state_abalone import SearchStateAbalone
+
+# Scores are integers seen from the player to move.
+WIN_SCORE = 1_000_000
+MATERIAL_WEIGHT = 1000
+CENTRE_WEIGHT = 10
+# Per pair of neighbour marbles, and per marble on the edge ring, where it can be pushed off.
+COHESION_WEIGHT = 3
+EDGE_WEIGHT = 8
+
+
+def centre_distance(mask: int) -> int:
+    """
+    Sum the distances to the centre of the marbles of a mask, as MasterAbalone.compute_winner does.
+
+    Args:
+        mask (int): occupancy mask of one player
+
+    Returns:
+        int: summed distance to the centre
+    """
+    dist = 0
+    while mask:
+        low = mask & -mask
+        dist += CENTRE_DISTANCE[low.bit_length() - 1]
+        mask ^= low
+    return dist
+
+
+def final_score(state: SearchStateAbalone) -> int:
+    """
+    Score a finished game with the criterion of MasterAbalone.compute_winner:
+    the higher score wins, then the smaller summed distance to the centre.
+
+    Args:
+        state (SearchStateAbalone): a finished game
+
+    Returns:
+        int: WIN_SCORE if the player to move won, -WIN_SCORE if they lost, 0 for a draw
+    """
+    me = state.side
+    diff = state.scores[me] - state.scores[1 - me]
+    if diff == 0:
+        diff = state.centre[1 - me] - state.centre[me]
+    if diff > 0:
+        return WIN_SCORE
+    if diff < 0:
+        return -WIN_SCORE
+    return 0
+
+
+def evaluate(state: SearchStateAbalone) -> int:
+    """
+    Heuristic value of a position: material first, then distance to the centre,
+    cohesion and marbles on the edge ring. It only reads the accumulators of the state.
+
+    Args:
+        state (SearchStateAbalone): the position to evaluate
+
+    Returns:
+        int: the value of the position for the player to move
+    """
+    me = state.side
+    material = state.counts[me] - state.counts[1 - me]
+    centre = state.centre[1 - me] - state.centre[me]
+    cohesion = state.pairs[me] - state.pairs[1 - me]
+    edges = state.edges[1 - me] - state.edges[me]
+    return MATERIAL_WEIGHT * material + CENTRE_WEIGHT * centre + COHESION_WEIGHT * cohesion + EDGE_WEIGHT * edges
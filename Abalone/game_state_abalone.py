@@ -1,14 +1,27 @@
 import copy
 import json
-from typing import Dict, List, Optional, Set, Tuple
-
-from board_abalone import BoardAbalone
+import struct
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from binary_abalone import KIND_STATE, pack_header, pack_string, unpack_header, unpack_string
+from board_abalone import BOARD_DIM, BoardAbalone
+from geometry_abalone import CELL_INDEX, CELLS, DIRECTIONS, RAY_POS, RAYS, STEP, manhattan_dist
+from move_abalone import MoveAbalone
+from move_ordering_abalone import MoveOrderer
 from player_abalone import PlayerAbalone
 from seahorse.game.action import Action
-from seahorse.game.game_layout.board import Piece
 from seahorse.game.game_state import GameState
 from seahorse.player.player import Player
 from seahorse.utils.serializer import Serializable
+from zobrist_abalone import get_keys
+
+
+# Binary payload of a state: step, max_step, max_score and index of the next
+# player, then for each player its id and score followed by its piece type and
+# name, then the dimensions and the occupancy masks of the board, in the order of the players.
+STATE_HEADER = struct.Struct("<HHbB")
+STATE_PLAYER = struct.Struct("<qd")
+STATE_MASKS = struct.Struct("<QQ")
 
 
 class GameStateAbalone(GameState):
@@ -22,11 +35,14 @@ class GameStateAbalone(GameState):
         rep (Representation): Representation of the game.
     """
 
-    def __init__(self, scores: Dict, next_player: Player, players: List[Player], rep: BoardAbalone, step: int, *args, **kwargs) -> None:
+    def __init__(self, scores: Dict, next_player: Player, players: List[Player], rep: BoardAbalone, step: int, *args, player_index: Optional[Dict[int, int]] = None, **kwargs) -> None:
         super().__init__(scores, next_player, players, rep)
         self.max_score = -6
         self.max_step = 50
         self.step = step
+        self._position_key = None
+        # Index of each player in players by id, shared by the successor states.
+        self._player_index = player_index if player_index is not None else {p.get_id(): k for k, p in enumerate(players)}
 
     def get_step(self) -> int:
         """
@@ -49,6 +65,36 @@ class GameStateAbalone(GameState):
         else:
             return False
 
+    def compute_winners(self, scores: Optional[Dict[int, float]] = None) -> List[Player]:
+        """
+        Compute the winners of the game: the players with the highest score,
+        then the smaller summed distance of their marbles to the centre.
+
+        Args:
+            scores (Dict[int, float], optional): scores to use, the ones of the state by default
+
+        Returns:
+            List[Player]: List of the players who won the game
+        """
+        scores = self.scores if scores is None else scores
+        max_val = max(scores.values())
+        players_id = list(filter(lambda key: scores[key] == max_val, scores))
+        itera = list(filter(lambda x: x.get_id() in players_id, self.players))
+        if len(itera) > 1: #égalité
+            final_rep = self.get_rep()
+            env = final_rep.get_env()
+            dim = final_rep.get_dimensions()
+            dist = dict.fromkeys(players_id, 0)
+            center = (dim[0]//2, dim[1]//2)
+            for i, j in list(env.keys()):
+                p = env.get((i, j), None)
+                if p.get_owner_id():
+                    dist[p.get_owner_id()] += manhattan_dist(center, (i, j))
+            min_dist = min(dist.values())
+            players_id = list(filter(lambda key: dist[key] == min_dist, dist))
+            itera = list(filter(lambda x: x.get_id() in players_id, self.players))
+        return itera
+
     def get_neighbours(self, i: int, j: int) -> Dict[str,Tuple[str,Tuple[int,int]]]:
         return self.get_rep().get_neighbours(i, j)
 
@@ -65,32 +111,33 @@ class GameStateAbalone(GameState):
         Returns:
             List[Piece]: List of pieces involved in the conflict.
         """
-        result = []
-        current_rep = self.get_rep()
-        b = current_rep.get_env()
-        tmp_n_i = n_i
-        tmp_n_j = n_j
+        rays = RAY_POS.get((i, j))
+        ray = rays.get((n_i, n_j)) if rays is not None else None
+        if ray is None:
+            return None
+        b = self.get_rep().get_env()
+        player_id = self.next_player.get_id()
         my_count = 1
         other_count = 0
         switch = False
         max_deplacement = 3
-        result.append((i, j))
-        while b.get((i + tmp_n_i, j + tmp_n_j), False):
-            p = b[(i + tmp_n_i, j + tmp_n_j)]
-            if p.get_owner_id() == self.next_player.get_id() and switch is False:
+        result = [(i, j)]
+        for pos in ray:
+            p = b.get(pos)
+            if p is None:
+                break
+            if p.get_owner_id() == player_id and switch is False:
                 my_count += 1
                 if my_count > max_deplacement:
                     return None
-            elif p.get_owner_id() == self.next_player.get_id() and switch is True:
+            elif p.get_owner_id() == player_id and switch is True:
                 return None
             else:
                 other_count += 1
                 switch = True
             if other_count >= my_count:
                 return None
-            result.append((i + tmp_n_i, j + tmp_n_j))
-            tmp_n_i += n_i
-            tmp_n_j += n_j
+            result.append(pos)
         return result
 
     def in_hexa(self, index) -> bool:
@@ -103,7 +150,7 @@ class GameStateAbalone(GameState):
         Returns:
             bool: True if the index is within the hexagonal game board, False otherwise.
         """
-        return not BoardAbalone.FORBIDDEN_MASK[index[0]][index[1]]
+        return (index[0], index[1]) in CELL_INDEX
 
     def get_player_id(self, pid) -> PlayerAbalone:
         """
@@ -115,9 +162,46 @@ class GameStateAbalone(GameState):
         Returns:
             Player: The player with the given ID.
         """
-        for player in self.players:
-            if player.get_id() == pid:
-                return player
+        k = self._player_index.get(pid)
+        return self.players[k] if k is not None else None
+
+    def compute_next_player(self) -> Player:
+        """
+        Computes the next player.
+
+        Returns:
+            Player: The next player.
+        """
+        return self.players[(self._player_index[self.next_player.get_id()] + 1) % len(self.players)]
+
+    def move_pieces(self, to_move_pieces: List[Tuple[int, int]], n_i: int, n_j: int) -> Tuple[BoardAbalone, Optional[int]]:
+        """
+        Build the board obtained by moving a line of pieces found by detect_conflict.
+
+        Args:
+            to_move_pieces (List[Tuple[int, int]]): positions of the pieces to move
+            n_i (int): Row direction of movement.
+            n_j (int): Column direction of movement.
+
+        Returns:
+            Tuple[BoardAbalone, Optional[int]]: the next board and the ID of the owner of the ejected piece, if any
+        """
+        current_rep = self.get_rep()
+        copy_b = copy.copy(current_rep.get_env())
+        zobrist_key = current_rep.get_zobrist_key()
+        id_add = None
+        # The pieces are immutable: the line is lifted, then put down one cell further.
+        pieces = [copy_b.pop(pos) for pos in to_move_pieces]
+        for pos, piece in zip(to_move_pieces, pieces):
+            cell_keys = get_keys(piece.get_type()).cells
+            zobrist_key ^= cell_keys[CELL_INDEX[pos]]
+            dest = STEP[pos][(n_i, n_j)]
+            if dest is not None:
+                zobrist_key ^= cell_keys[CELL_INDEX[dest]]
+                copy_b[dest] = piece
+            else:
+                id_add = piece.get_owner_id()
+        return BoardAbalone(env=copy_b, dim=current_rep.get_dimensions(), zobrist_key=zobrist_key), id_add
 
     def generator(self):
         """
@@ -126,45 +210,114 @@ class GameStateAbalone(GameState):
         Returns:
             Set[Action]: List of possible future representations.
         """
-        current_rep = self.get_rep()
-        b = current_rep.get_env()
-        d = current_rep.get_dimensions()
+        b = self.get_rep().get_env()
         for i, j in list(b.keys()):
             p = b.get((i, j), None)
             if p.get_owner_id() == self.next_player.get_id():
-                list_index = [(-1, -1), (1, -1), (-1, 1), (1, 1), (2, 0), (-2, 0)]
-                for n_i, n_j in list_index:
+                for n_i, n_j in DIRECTIONS:
                     to_move_pieces = self.detect_conflict(i, j, n_i, n_j)
                     if to_move_pieces is not None:
-                        copy_b = copy.copy(b)
-                        id_add = None
-                        pop_piece = None
-                        for k in range(len(to_move_pieces)):
-                            n_index = to_move_pieces[k]
-                            if (
-                                n_index[0] + n_i >= 0
-                                and n_index[0] + n_i < d[0]
-                                and n_index[1] + n_j >= 0
-                                and n_index[1] + n_j < d[1]
-                                and self.in_hexa((n_index[0] + n_i, n_index[1] + n_j))
-                            ):
-                                copy_b[(n_index[0] + n_i, n_index[1] + n_j, 1)] = Piece(
-                                    piece_type=copy_b[(n_index[0], n_index[1])].get_type(),
-                                    owner=self.get_player_id(copy_b[(n_index[0], n_index[1])].get_owner_id()),
-                                )
-                                copy_b.pop((n_index[0], n_index[1]))
-                            else:
-                                id_add = copy_b[(n_index[0], n_index[1])].get_owner_id()
-                                pop_piece = (n_index[0], n_index[1])
-                                copy_b.pop((n_index[0], n_index[1]))
-                        for k in range(len(to_move_pieces)):
-                            n_index = to_move_pieces[k]
-                            if pop_piece != (n_index[0], n_index[1]):
-                                copy_b[(n_index[0] + n_i, n_index[1] + n_j)] = copy.copy(
-                                    copy_b[(n_index[0] + n_i, n_index[1] + n_j, 1)]
-                                )
-                                copy_b.pop((n_index[0] + n_i, n_index[1] + n_j, 1))
-                        yield BoardAbalone(env=copy_b, dim=d), id_add
+                        yield self.move_pieces(to_move_pieces, n_i, n_j)
+
+    def generate_moves(self) -> Iterator[MoveAbalone]:
+        """
+        Generate the possible moves as lightweight records, without building the successor states.
+
+        Returns:
+            Iterator[MoveAbalone]: the possible moves, in the same order as generator
+        """
+        b = self.get_rep().get_env()
+        player_id = self.next_player.get_id()
+        for (i, j), p in list(b.items()):
+            if p.get_owner_id() == player_id:
+                for direction, (n_i, n_j) in enumerate(DIRECTIONS):
+                    to_move_pieces = self.detect_conflict(i, j, n_i, n_j)
+                    if to_move_pieces is not None:
+                        n_moved = sum(1 for x in to_move_pieces if b[x].get_owner_id() == player_id)
+                        yield MoveAbalone(
+                            CELL_INDEX[(i, j)],
+                            direction,
+                            n_moved,
+                            len(to_move_pieces) - n_moved,
+                            STEP[to_move_pieces[-1]][(n_i, n_j)] is None,
+                        )
+
+    def generate_ordered_moves(self, orderer: Optional[MoveOrderer] = None) -> List[MoveAbalone]:
+        """
+        Generate the possible moves, best expected first: ejections, pushes, then quiet moves.
+
+        Args:
+            orderer (MoveOrderer, optional): orderer holding the killer and history tables to use
+
+        Returns:
+            List[MoveAbalone]: the possible moves
+        """
+        orderer = orderer if orderer is not None else MoveOrderer()
+        side = [p.get_id() for p in self.players].index(self.next_player.get_id())
+        return orderer.order(list(self.generate_moves()), side, 0)
+
+    def apply_move(self, move: MoveAbalone) -> "GameStateAbalone":
+        """
+        Build the successor state of a move generated by generate_moves.
+
+        Args:
+            move (MoveAbalone): the move to play
+
+        Returns:
+            GameStateAbalone: the next game state
+        """
+        origin = move.origin
+        n_i, n_j = DIRECTIONS[move.direction]
+        line = RAYS[origin][move.direction][: move.n_moved + move.n_pushed - 1]
+        to_move_pieces = [CELLS[origin]] + [CELLS[k] for k in line]
+        return self.get_successor(*self.move_pieces(to_move_pieces, n_i, n_j))
+
+    def get_successor(self, next_rep: BoardAbalone, id_add: Optional[int]) -> "GameStateAbalone":
+        """
+        Build the next game state from a board built by move_pieces.
+
+        Args:
+            next_rep (BoardAbalone): the next board
+            id_add (int, optional): the ID of the owner of the ejected piece, if any
+
+        Returns:
+            GameStateAbalone: the next game state, sharing the players and their index with this one
+        """
+        return GameStateAbalone(
+            self.compute_scores(id_add=id_add),
+            self.compute_next_player(),
+            self.players,
+            next_rep,
+            step=self.step + 1,
+            player_index=self._player_index,
+        )
+
+    def get_action(self, move: MoveAbalone) -> Action:
+        """
+        Build the action of a move generated by generate_moves.
+
+        Args:
+            move (MoveAbalone): the chosen move
+
+        Returns:
+            Action: the action to return from compute_action
+        """
+        return Action(self, self.apply_move(move))
+
+    def get_scores_after(self, move: MoveAbalone) -> Dict[int, float]:
+        """
+        Compute the scores after a move without building the successor state.
+
+        Args:
+            move (MoveAbalone): the move to evaluate
+
+        Returns:
+            dict[int, float]: A dictionary with player ID as the key and score as the value.
+        """
+        id_add = None
+        if move.ejection:
+            id_add = self.compute_next_player().get_id() if move.n_pushed else self.next_player.get_id()
+        return self.compute_scores(id_add=id_add)
 
     def generate_possible_actions(self) -> Set[Action]:
         """
@@ -174,66 +327,17 @@ class GameStateAbalone(GameState):
             List[Action]: List of possible actions.
         """
         poss_actions = {
-            Action(
-                self,
-                GameStateAbalone(
-                    self.compute_scores(id_add=id_add),
-                    self.compute_next_player(),
-                    self.players,
-                    valid_next_rep,
-                    step=self.step + 1,
-                ),
-            )
+            Action(self, self.get_successor(valid_next_rep, id_add))
             for valid_next_rep, id_add in self.generator()
         }
         return poss_actions
 
     def convert_light_action_to_action(self,data) ->  Action :
         src,dst=data["from"],data["to"]
-        current_game_state = self
-        b = current_game_state.get_rep().get_env()
-        d = current_game_state.get_rep().get_dimensions()
         n_i, n_j = dst[0]-src[0],dst[1]-src[1]
-        to_move_pieces = current_game_state.detect_conflict(src[0],src[1],n_i,n_j)
+        to_move_pieces = self.detect_conflict(src[0],src[1],n_i,n_j)
         if to_move_pieces is not None:
-            copy_b = copy.copy(b)
-            id_add = None
-            pop_piece = None
-            for k in range(len(to_move_pieces)):
-                n_index = to_move_pieces[k]
-                if (
-                    n_index[0] + n_i >= 0
-                    and n_index[0] + n_i < d[0]
-                    and n_index[1] + n_j >= 0
-                    and n_index[1] + n_j < d[1]
-                    and current_game_state.in_hexa((n_index[0] + n_i, n_index[1] + n_j))
-                ):
-                    copy_b[(n_index[0] + n_i, n_index[1] + n_j, 1)] = Piece(
-                        piece_type=copy_b[(n_index[0], n_index[1])].get_type(),
-                        owner=current_game_state.get_player_id(copy_b[(n_index[0], n_index[1])].get_owner_id()),
-                    )
-                    copy_b.pop((n_index[0], n_index[1]))
-                else:
-                    id_add = copy_b[(n_index[0], n_index[1])].get_owner_id()
-                    pop_piece = (n_index[0], n_index[1])
-                    copy_b.pop((n_index[0], n_index[1]))
-            for k in range(len(to_move_pieces)):
-                n_index = to_move_pieces[k]
-                if pop_piece != (n_index[0], n_index[1]):
-                    copy_b[(n_index[0] + n_i, n_index[1] + n_j)] = copy.copy(
-                        copy_b[(n_index[0] + n_i, n_index[1] + n_j, 1)]
-                    )
-                    copy_b.pop((n_index[0] + n_i, n_index[1] + n_j, 1))
-            return Action(
-                    current_game_state,
-                    GameStateAbalone(
-                        current_game_state.compute_scores(id_add=id_add),
-                        current_game_state.compute_next_player(),
-                        current_game_state.players,
-                        BoardAbalone(env=copy_b, dim=d),
-                        step=current_game_state.step + 1,
-                        ),
-                    )
+            return Action(self, self.get_successor(*self.move_pieces(to_move_pieces, n_i, n_j)))
         return None
 
     def compute_scores(self, id_add: int) -> Dict[int, float]:
@@ -253,13 +357,121 @@ class GameStateAbalone(GameState):
         # TODO print(scores)
         return scores
 
+    def get_position_key(self) -> int:
+        """
+        Return the Zobrist key of the board and of the scores.
+
+        Returns:
+            int: The Zobrist key of the position, without the side to move.
+        """
+        if self._position_key is None:
+            key = self.get_rep().get_zobrist_key()
+            for player in self.players:
+                key ^= get_keys(player.get_piece_type()).score_key(self.scores[player.get_id()])
+            self._position_key = key
+        return self._position_key
+
+    def get_zobrist_key(self) -> int:
+        """
+        Return the 64 bits Zobrist key of the state: marbles, scores and side to move.
+
+        Returns:
+            int: The Zobrist key of the state.
+        """
+        return self.get_position_key() ^ get_keys(self.next_player.get_piece_type()).to_move
+
+    def __hash__(self) -> int:
+        # Like GameState.__hash__, the side to move is left out: the states rebuilt
+        # from JSON without their next player must match the ones of the master.
+        return self.get_position_key()
+
     def __str__(self) -> str:
         if not self.is_done():
             return super().__str__()
         return "The game is finished!"
 
     def to_json(self) -> str:
-        return { i:j for i,j in self.__dict__.items() if i!="_possible_actions"}
+        return { i:j for i,j in self.__dict__.items() if not i.startswith("_")}
+
+    def to_delta_json(self, previous: "GameStateAbalone") -> dict:
+        """
+        Describe the state by its differences with a previous one: the cells changed,
+        the scores when they changed, the step and the next player.
+
+        Args:
+            previous (GameStateAbalone): the previous state sent
+
+        Returns:
+            dict: the JSON object of the differences, keyed by str(position) as in to_json
+        """
+        delta = {
+            "step": self.step,
+            "max_step": self.max_step,
+            "next_player": self.next_player,
+            "changes": {str(pos): piece_type for pos, piece_type in self.get_rep().get_changes(previous.get_rep()).items()},
+        }
+        if self.scores != previous.scores:
+            delta["scores"] = self.scores
+        return delta
+
+    def to_bytes(self) -> bytes:
+        """
+        Encode the state in the compact binary format: step, player table, scores and occupancy masks.
+
+        Returns:
+            bytes: the encoded state
+        """
+        bitboard = self.get_rep().to_bitboard(self.players)
+        ids = [p.get_id() for p in self.players]
+        parts = [
+            pack_header(KIND_STATE),
+            STATE_HEADER.pack(self.step, self.max_step, self.max_score, ids.index(self.next_player.get_id())),
+        ]
+        for player in self.players:
+            parts.append(STATE_PLAYER.pack(player.get_id(), self.scores[player.get_id()]))
+            parts.append(pack_string(player.get_piece_type()))
+            parts.append(pack_string(player.get_name()))
+        parts.append(BOARD_DIM.pack(*bitboard.dimensions))
+        parts.append(STATE_MASKS.pack(*bitboard.masks))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, *, next_player: Optional[PlayerAbalone] = None) -> "GameStateAbalone":
+        """
+        Decode a state encoded by to_bytes.
+
+        Args:
+            data (bytes): the encoded state
+            next_player (PlayerAbalone, optional): player to use in place of the decoded player with the same id
+
+        Raises:
+            ValueError: if data is not an encoded state of a supported version
+
+        Returns:
+            GameStateAbalone: the decoded state
+        """
+        from bitboard_abalone import BitBoardAbalone
+        offset = unpack_header(data, KIND_STATE)
+        step, max_step, max_score, next_index = STATE_HEADER.unpack_from(data, offset)
+        offset += STATE_HEADER.size
+        players, scores = [], {}
+        for _ in range(2):
+            player_id, score = STATE_PLAYER.unpack_from(data, offset)
+            piece_type, offset = unpack_string(data, offset + STATE_PLAYER.size)
+            name, offset = unpack_string(data, offset)
+            if next_player is not None and next_player.get_id() == player_id:
+                players.append(next_player)
+            else:
+                players.append(PlayerAbalone(piece_type, name, id=player_id))
+            scores[player_id] = int(score) if score.is_integer() else score
+        dim = list(BOARD_DIM.unpack_from(data, offset))
+        masks = STATE_MASKS.unpack_from(data, offset + BOARD_DIM.size)
+        ids = tuple(p.get_id() for p in players)
+        bitboard = BitBoardAbalone(masks, ids, tuple(p.get_piece_type() for p in players), dim)
+        state = cls(scores, players[next_index], players, bitboard.to_board(), step)
+        state.max_step = max_step
+        state.max_score = max_score
+        return state
 
     @classmethod
     def from_json(cls,data:str,*,next_player:Optional[PlayerAbalone]=None) -> Serializable:
@@ -0,0 +1,158 @@
+from typing import Dict, List, Optional, Tuple
+
+# Geometry of the Abalone board, computed once at import.
+# The hexagonal board is laid on a 17x9 doubled grid where only 61 cells are playable.
+
+DIMENSIONS = [17, 9]
+
+FORBIDDEN_MASK = [
+ [True,  True,  True,  True,  False, True,  True,  True,  True],
+ [True,  True,  True,  False, True,  False, True,  True,  True],
+ [True,  True,  False, True,  False, True,  False, True,  True],
+ [True,  False, True,  False, True,  False, True,  False, True],
+ [False, True,  False, True,  False, True,  False, True,  False],
+ [True,  False, True,  False, True,  False, True,  False, True],
+ [False, True,  False, True,  False, True,  False, True,  False],
+ [True,  False, True,  False, True,  False, True,  False, True],
+ [False, True,  False, True,  False, True,  False, True,  False],
+ [True,  False, True,  False, True,  False, True,  False, True],
+ [False, True,  False, True,  False, True,  False, True,  False],
+ [True,  False, True,  False, True,  False, True,  False, True],
+ [False, True,  False, True,  False, True,  False, True,  False],
+ [True,  False, True,  False, True,  False, True,  False, True],
+ [True,  True,  False, True,  False, True,  False, True,  True],
+ [True,  True,  True,  False, True,  False, True,  True,  True],
+ [True,  True,  True,  True,  False, True,  True,  True,  True],
+]
+
+# The 61 playable cells, in row-major order.
+CELLS: List[Tuple[int, int]] = [
+    (i, j) for i in range(DIMENSIONS[0]) for j in range(DIMENSIONS[1]) if not FORBIDDEN_MASK[i][j]
+]
+CELL_INDEX: Dict[Tuple[int, int], int] = {pos: k for k, pos in enumerate(CELLS)}
+N_CELLS = len(CELLS)
+
+# Moving directions, in the order used by the move generator.
+DIRECTIONS: List[Tuple[int, int]] = [(-1, -1), (1, -1), (-1, 1), (1, 1), (2, 0), (-2, 0)]
+DIRECTION_INDEX: Dict[Tuple[int, int], int] = {d: k for k, d in enumerate(DIRECTIONS)}
+NEIGHBOUR_NAMES: Dict[str, Tuple[int, int]] = {
+    "top_left": (-1, -1),
+    "top_right": (-2, 0),
+    "left": (1, -1),
+    "right": (-1, 1),
+    "bottom_left": (2, 0),
+    "bottom_right": (1, 1),
+}
+
+
+def is_playable(i: int, j: int) -> bool:
+    """
+    Check if (i, j) is one of the 61 playable cells.
+
+    Args:
+        i (int): line indice
+        j (int): column indice
+
+    Returns:
+        bool: True if the cell belongs to the hexagon, False otherwise.
+    """
+    return (i, j) in CELL_INDEX
+
+
+def neighbour_entries(i: int, j: int) -> Tuple[Tuple[str, Tuple[int, int], bool], ...]:
+    """
+    Compute the neighbours of (i, j) as (name, position, is_playable) entries.
+
+    Args:
+        i (int): line indice
+        j (int): column indice
+
+    Returns:
+        Tuple[Tuple[str, Tuple[int, int], bool], ...]: one entry per direction name
+    """
+    return tuple(
+        (name, (i + n_i, j + n_j), (i + n_i, j + n_j) in CELL_INDEX) for name, (n_i, n_j) in NEIGHBOUR_NAMES.items()
+    )
+
+
+def _ray(k: int, n_i: int, n_j: int) -> Tuple[int, ...]:
+    i, j = CELLS[k]
+    ray = []
+    while (i + n_i, j + n_j) in CELL_INDEX:
+        i, j = i + n_i, j + n_j
+        ray.append(CELL_INDEX[(i, j)])
+    return tuple(ray)
+
+
+# RAYS[k][d]: cells met from cell k in direction d up to the edge of the board.
+RAYS: List[Tuple[Tuple[int, ...], ...]] = [tuple(_ray(k, n_i, n_j) for n_i, n_j in DIRECTIONS) for k in range(N_CELLS)]
+# NEIGHBOURS[k][d]: neighbour of cell k in direction d, -1 when it is outside the board.
+NEIGHBOURS: List[Tuple[int, ...]] = [tuple(ray[0] if ray else -1 for ray in RAYS[k]) for k in range(N_CELLS)]
+# IS_EDGE[k]: True when a marble on cell k can be pushed off the board.
+IS_EDGE: List[bool] = [-1 in NEIGHBOURS[k] for k in range(N_CELLS)]
+EDGE_MASK = sum(1 << k for k in range(N_CELLS) if IS_EDGE[k])
+# NEIGHBOUR_MASK[k]: mask of the neighbours of cell k.
+NEIGHBOUR_MASK: List[int] = [sum(1 << q for q in NEIGHBOURS[k] if q >= 0) for k in range(N_CELLS)]
+
+# Position keyed views of the tables, for the code working on BoardAbalone.env.
+# STEP[(i, j)][(n_i, n_j)]: destination of a marble, None when it leaves the board.
+STEP: Dict[Tuple[int, int], Dict[Tuple[int, int], Optional[Tuple[int, int]]]] = {
+    CELLS[k]: {d: (CELLS[NEIGHBOURS[k][n]] if NEIGHBOURS[k][n] >= 0 else None) for n, d in enumerate(DIRECTIONS)}
+    for k in range(N_CELLS)
+}
+# RAY_POS[(i, j)][(n_i, n_j)]: positions met from (i, j) in direction (n_i, n_j) up to the edge.
+RAY_POS: Dict[Tuple[int, int], Dict[Tuple[int, int], Tuple[Tuple[int, int], ...]]] = {
+    CELLS[k]: {d: tuple(CELLS[c] for c in RAYS[k][n]) for n, d in enumerate(DIRECTIONS)} for k in range(N_CELLS)
+}
+# NEIGHBOUR_TABLE[(i, j)]: neighbour entries of every position of the grid.
+NEIGHBOUR_TABLE: Dict[Tuple[int, int], Tuple[Tuple[str, Tuple[int, int], bool], ...]] = {
+    (i, j): neighbour_entries(i, j) for i in range(DIMENSIONS[0]) for j in range(DIMENSIONS[1])
+}
+
+CENTRE = (DIMENSIONS[0] // 2, DIMENSIONS[1] // 2)
+
+# The board is displayed (BoardAbalone.__str__, GUI/main.js) as 9 rows of 9 columns, odd rows shifted by half a cell.
+GRID_SIZE = 9
+
+
+def grid_position(i: int, j: int) -> Tuple[int, int]:
+    """
+    Args:
+        i (int): line indice
+        j (int): column indice
+
+    Returns:
+        Tuple[int, int]: the row and column of the cell in the displayed grid
+    """
+    row = (i + j - 4) // 2
+    return row, j + (4 - row) // 2
+
+
+# GRID_POSITIONS[k]: row and column of cell k in the displayed grid.
+GRID_POSITIONS: List[Tuple[int, int]] = [grid_position(i, j) for i, j in CELLS]
+
+
+def manhattan_dist(A: Tuple[int, int], B: Tuple[int, int]) -> float:
+    """
+    Distance between two cells, counted in moves. Only valid for a distance to the centre.
+
+    Args:
+        A (Tuple[int, int]): first cell
+        B (Tuple[int, int]): second cell
+
+    Returns:
+        float: the distance between the cells
+    """
+    mask1 = [(0,2),(1,3),(2,4)]
+    mask2 = [(0,4)]
+    diff = (abs(B[0] - A[0]),abs(B[1] - A[1]))
+    dist = (abs(B[0] - A[0]) + abs(B[1] - A[1]))/2
+    if diff in mask1:
+        dist += 1
+    if diff in mask2:
+        dist += 2
+    return dist
+
+
+# CENTRE_DISTANCE[k]: distance of cell k to the centre, as used to break ties at the end of a game.
+CENTRE_DISTANCE: List[int] = [int(manhattan_dist(CENTRE, CELLS[k])) for k in range(N_CELLS)]
@@ -35,14 +35,14 @@ class MyPlayer(PlayerAbalone):
         Returns:
             Action: selected feasible action
         """
-        possible_actions = list(current_state.get_possible_actions())
-        other_id = possible_actions[0].get_next_game_state().next_player.get_id()
-        best_action = None
+        other_id = current_state.compute_next_player().get_id()
+        best_move = None
         best_score = -7
-        for a in possible_actions:
-            score = a.get_next_game_state().scores[self.id] - a.get_next_game_state().scores[other_id]
+        for move in current_state.generate_moves():
+            scores = current_state.get_scores_after(move)
+            score = scores[self.id] - scores[other_id]
             if score > best_score:
-                best_action = a
+                best_move = move
                 best_score = score
 
-        return best_action
+        return current_state.get_action(best_move)
@@ -0,0 +1,83 @@
+from typing import Dict, List
+
+from board_abalone import BoardAbalone
+from game_state_abalone import GameStateAbalone
+from geometry_abalone import DIMENSIONS
+from piece_abalone import get_piece
+from seahorse.player.player import Player
+
+# 0 case non accessible
+# 1 case player 1
+# 2 case player 2
+# 3 case vide accessible
+CLASSIC = [ # CLASSIQUE
+    [0, 0, 0, 0, 1, 0, 0, 0, 0],
+    [0, 0, 0, 1, 0, 1, 0, 0, 0],
+    [0, 0, 1, 0, 1, 0, 3, 0, 0],
+    [0, 1, 0, 1, 0, 3, 0, 3, 0],
+    [1, 0, 1, 0, 1, 0, 3, 0, 3],
+    [0, 1, 0, 1, 0, 3, 0, 3, 0],
+    [1, 0, 1, 0, 3, 0, 3, 0, 3],
+    [0, 3, 0, 3, 0, 3, 0, 3, 0],
+    [3, 0, 3, 0, 3, 0, 3, 0, 3],
+    [0, 3, 0, 3, 0, 3, 0, 3, 0],
+    [3, 0, 3, 0, 3, 0, 2, 0, 2],
+    [0, 3, 0, 3, 0, 2, 0, 2, 0],
+    [3, 0, 3, 0, 2, 0, 2, 0, 2],
+    [0, 3, 0, 3, 0, 2, 0, 2, 0],
+    [0, 0, 3, 0, 2, 0, 2, 0, 0],
+    [0, 0, 0, 2, 0, 2, 0, 0, 0],
+    [0, 0, 0, 0, 2, 0, 0, 0, 0],
+]
+ALIEN = [ # ALIEN
+    [0, 0, 0, 0, 2, 0, 0, 0, 0],
+    [0, 0, 0, 3, 0, 3, 0, 0, 0],
+    [0, 0, 2, 0, 2, 0, 3, 0, 0],
+    [0, 3, 0, 1, 0, 2, 0, 3, 0],
+    [2, 0, 1, 0, 1, 0, 3, 0, 3],
+    [0, 2, 0, 2, 0, 3, 0, 3, 0],
+    [3, 0, 1, 0, 2, 0, 3, 0, 3],
+    [0, 2, 0, 2, 0, 3, 0, 3, 0],
+    [3, 0, 3, 0, 3, 0, 3, 0, 3],
+    [0, 3, 0, 3, 0, 1, 0, 1, 0],
+    [3, 0, 3, 0, 1, 0, 2, 0, 3],
+    [0, 3, 0, 3, 0, 1, 0, 1, 0],
+    [3, 0, 3, 0, 2, 0, 2, 0, 1],
+    [0, 3, 0, 1, 0, 2, 0, 3, 0],
+    [0, 0, 3, 0, 1, 0, 1, 0, 0],
+    [0, 0, 0, 3, 0, 3, 0, 0, 0],
+    [0, 0, 0, 0, 1, 0, 0, 0, 0],
+]
+LAYOUTS: Dict[str, List[List[int]]] = {"classic": CLASSIC, "alien": ALIEN}
+
+
+def build_initial_state(player1: Player, player2: Player, config: str = "classic") -> GameStateAbalone:
+    """
+    Build the initial state of a game, player1 playing first.
+
+    Args:
+        player1 (Player): first player, placed on the cells marked 1
+        player2 (Player): second player, placed on the cells marked 2
+        config (str, optional): name of the layout in LAYOUTS. Defaults to "classic".
+
+    Returns:
+        GameStateAbalone: the initial state
+    """
+    list_players = [player1, player2]
+    init_scores = {player1.get_id(): 0, player2.get_id(): 0}
+    dim = list(DIMENSIONS)
+    env = {}
+    initial_board = LAYOUTS[config]
+    W = 1
+    B = 2
+    white = get_piece(player1.get_piece_type(), player1.get_id())
+    black = get_piece(player2.get_piece_type(), player2.get_id())
+    for i in range(dim[0]):
+        for j in range(dim[1]):
+            if initial_board[i][j] == W:
+                env[(i, j)] = white
+            elif initial_board[i][j] == B:
+                env[(i, j)] = black
+
+    init_rep = BoardAbalone(env=env, dim=dim)
+    return GameStateAbalone(scores=init_scores, next_player=player1, players=list_players, rep=init_rep, step=0)
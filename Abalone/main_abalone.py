@@ -6,90 +6,45 @@ import platform
 import sys
 
 from loguru import logger
-from board_abalone import BoardAbalone
 from player_abalone import PlayerAbalone
 from master_abalone import MasterAbalone
 from game_state_abalone import GameStateAbalone
+from layouts_abalone import build_initial_state
+from profiling_abalone import Profiler
+from protocol_abalone import MoveLocalPlayerProxy, MoveRemotePlayerProxy
+from record_abalone import DEFAULT_RECORD_PATH, GameRecorder
 from seahorse.player.proxies import InteractivePlayerProxy, LocalPlayerProxy, RemotePlayerProxy
 from seahorse.utils.gui_client import GUIClient
-from seahorse.utils.recorders import StateRecorder
-from seahorse.game.game_layout.board import Piece
 from seahorse.utils.custom_exceptions import PlayerDuplicateError
 from argparse import RawTextHelpFormatter
 
-def play(player1, player2, log_level, port, address, gui, record, gui_path, config) :
+def play(player1, player2, log_level, port, address, gui, record, gui_path, config, record_path=DEFAULT_RECORD_PATH, profile=None) :
     list_players = [player1, player2]
-    init_scores = {player1.get_id(): 0, player2.get_id(): 0}
-    dim = [17, 9]
-    env = {}
-    # 0 case non accessible
-    # 1 case player 1
-    # 2 case player 2
-    # 3 case vide accessible
-    classic = [ # CLASSIQUE
-        [0, 0, 0, 0, 1, 0, 0, 0, 0],
-        [0, 0, 0, 1, 0, 1, 0, 0, 0],
-        [0, 0, 1, 0, 1, 0, 3, 0, 0],
-        [0, 1, 0, 1, 0, 3, 0, 3, 0],
-        [1, 0, 1, 0, 1, 0, 3, 0, 3],
-        [0, 1, 0, 1, 0, 3, 0, 3, 0],
-        [1, 0, 1, 0, 3, 0, 3, 0, 3],
-        [0, 3, 0, 3, 0, 3, 0, 3, 0],
-        [3, 0, 3, 0, 3, 0, 3, 0, 3],
-        [0, 3, 0, 3, 0, 3, 0, 3, 0],
-        [3, 0, 3, 0, 3, 0, 2, 0, 2],
-        [0, 3, 0, 3, 0, 2, 0, 2, 0],
-        [3, 0, 3, 0, 2, 0, 2, 0, 2],
-        [0, 3, 0, 3, 0, 2, 0, 2, 0],
-        [0, 0, 3, 0, 2, 0, 2, 0, 0],
-        [0, 0, 0, 2, 0, 2, 0, 0, 0],
-        [0, 0, 0, 0, 2, 0, 0, 0, 0],
-    ]
-    alien = [ # ALIEN
-            [0, 0, 0, 0, 2, 0, 0, 0, 0],
-            [0, 0, 0, 3, 0, 3, 0, 0, 0],
-            [0, 0, 2, 0, 2, 0, 3, 0, 0],
-            [0, 3, 0, 1, 0, 2, 0, 3, 0],
-            [2, 0, 1, 0, 1, 0, 3, 0, 3],
-            [0, 2, 0, 2, 0, 3, 0, 3, 0],
-            [3, 0, 1, 0, 2, 0, 3, 0, 3],
-            [0, 2, 0, 2, 0, 3, 0, 3, 0],
-            [3, 0, 3, 0, 3, 0, 3, 0, 3],
-            [0, 3, 0, 3, 0, 1, 0, 1, 0],
-            [3, 0, 3, 0, 1, 0, 2, 0, 3],
-            [0, 3, 0, 3, 0, 1, 0, 1, 0],
-            [3, 0, 3, 0, 2, 0, 2, 0, 1],
-            [0, 3, 0, 1, 0, 2, 0, 3, 0],
-            [0, 0, 3, 0, 1, 0, 1, 0, 0],
-            [0, 0, 0, 3, 0, 3, 0, 0, 0],
-            [0, 0, 0, 0, 1, 0, 0, 0, 0],
-        ]
-    
-    initial_board = classic if config=='classic' else alien
-    W = 1
-    B = 2
-    for i in range(dim[0]):
-        for j in range(dim[1]):
-            if initial_board[i][j] == W:
-                env[(i, j)] = Piece(piece_type=player1.get_piece_type(), owner=player1)
-            elif initial_board[i][j] == B:
-                env[(i, j)] = Piece(piece_type=player2.get_piece_type(), owner=player2)
-
-    init_rep = BoardAbalone(env=env, dim=dim)
-    initial_game_state = GameStateAbalone(
-        scores=init_scores, next_player=player1, players=list_players, rep=init_rep, step=0)
+    initial_game_state = build_initial_state(player1, player2, config)
+    profiler = None
+    if profile :
+        profiler = Profiler()
+        profiler.install(list_players)
     try:
         master = MasterAbalone(
             name="Abalone", initial_game_state=initial_game_state, players_iterator=list_players, log_level=log_level, port=port,
-            hostname=address
+            hostname=address, profiler=profiler
         )
     except PlayerDuplicateError:
         return
 
     listeners = [GUIClient(path=gui_path)]*gui
     if record :
-        listeners.append(StateRecorder())
+        listeners.append(GameRecorder(record_path, config))
     master.record_game(listeners=listeners)
+    if profiler is not None :
+        profiler.uninstall()
+        profiler.dump(profile)
+        logger.info(f"Profile written to {profile}")
+
+def enable_pondering(player) :
+    if not player.enable_pondering() :
+        logger.warning(f"{player.get_name()} cannot ponder, it plays as usual")
 
 if __name__=="__main__":
 
@@ -119,7 +74,10 @@ if __name__=="__main__":
     parser.add_argument("-a","--address",required=False, default="localhost",help="\nThe external ip of the machine that hosts the GameMaster.\n\n")
     parser.add_argument("-p","--port",required=False,type=int, default=16001, help="The port of the machine that hosts the GameMaster.\n\n")
     parser.add_argument("-g","--no-gui",action='store_false',default=True, help="Headless mode\n\n")
-    parser.add_argument("-r","--record",action="store_true",default=False, help="Stores the succesive game states in a json file.\n\n")
+    parser.add_argument("-r","--record",action="store_true",default=False, help=f"Appends the game to the record file {DEFAULT_RECORD_PATH} (see record_abalone.py).\n\n")
+    parser.add_argument("-m","--move-only",action="store_true",default=False, help="In host_game and connect modes, only sends the moves and a hash of the position instead of the full state.\n\tBoth sides must use it.\n\n")
+    parser.add_argument("--profile",required=False,default=None, help="Times move generation and compute_action, and writes the timings to this file at the end of the game:\n\tJSON if it ends with .json, collapsed stacks for flame graph tools otherwise.\n\n")
+    parser.add_argument("--ponder",action="store_true",default=False, help="In host_game, connect and human_vs_computer modes, lets the local player search while the opponent thinks.\n\n")
     parser.add_argument("-l","--log",required=False,choices=["DEBUG","INFO"], default="DEBUG",help="\nSets the logging level.")
     parser.add_argument("players_list",nargs="*", help='The players')
     args=parser.parse_args()
@@ -132,9 +90,17 @@ if __name__=="__main__":
     log_level = vars(args).get("log")
     list_players = vars(args).get("players_list")
     base_config = vars(args).get("config")
+    move_only = vars(args).get("move_only")
+    profile = vars(args).get("profile")
+    ponder = vars(args).get("ponder")
+    local_proxy = MoveLocalPlayerProxy if move_only else LocalPlayerProxy
+    remote_proxy = MoveRemotePlayerProxy if move_only else RemotePlayerProxy
     time_limit = 15*60
 
     gui_path = os.path.join(dirname(os.path.abspath(__file__)),'GUI','index.html')
+    if ponder and type in ("local", "human_vs_human") :
+        # Both players share the process: a player pondering would slow the other one.
+        logger.warning(f"--ponder is ignored in {type} mode")
 
     if type == "local" :
         folder = dirname(list_players[0])
@@ -145,36 +111,49 @@ if __name__=="__main__":
         player2_class = __import__(splitext(basename(list_players[1]))[0], fromlist=[None])
         player1 = player1_class.MyPlayer("W", name=splitext(basename(list_players[0]))[0]+"_1", time_limit=time_limit)
         player2 = player2_class.MyPlayer("B", name=splitext(basename(list_players[1]))[0]+"_2", time_limit=time_limit)
-        play(player1=player1, player2=player2, log_level=log_level, port=port, address=address, gui=gui, record=record, gui_path=gui_path, config=base_config)
+        play(player1=player1, player2=player2, log_level=log_level, port=port, address=address, gui=gui, record=record, gui_path=gui_path, config=base_config, profile=profile)
     elif type == "host_game" :
         folder = dirname(list_players[0])
         sys.path.append(folder)
         player1_class = __import__(splitext(basename(list_players[0]))[0], fromlist=[None])
         player1 = LocalPlayerProxy(player1_class.MyPlayer("W", name=splitext(basename(list_players[0]))[0]+"_local", time_limit=time_limit),gs=GameStateAbalone)
-        player2 = RemotePlayerProxy(mimics=PlayerAbalone,piece_type="B",name="_remote", time_limit=time_limit)
+        player2 = remote_proxy(mimics=PlayerAbalone,piece_type="B",name="_remote", time_limit=time_limit)
+        if ponder :
+            enable_pondering(player1)
         if address=='localhost':
             logger.warning('Using `localhost` with `host_game` mode, if both players are on different machines')
             logger.warning('use ipconfig/ifconfig to get your external ip and specity the ip with -a')
-        play(player1=player1, player2=player2, log_level=log_level, port=port, address=address, gui=int(gui), record=record, gui_path=gui_path, config=base_config)
+        play(player1=player1, player2=player2, log_level=log_level, port=port, address=address, gui=int(gui), record=record, gui_path=gui_path, config=base_config, profile=profile)
     elif type == "connect" :
         folder = dirname(list_players[0])
         sys.path.append(folder)
         player2_class = __import__(splitext(basename(list_players[0]))[0], fromlist=[None])
-        player2 = LocalPlayerProxy(player2_class.MyPlayer("B", name="_remote", time_limit=time_limit),gs=GameStateAbalone)
+        player2 = local_proxy(player2_class.MyPlayer("B", name="_remote", time_limit=time_limit),gs=GameStateAbalone)
+        if ponder :
+            enable_pondering(player2)
         if address=='localhost':
             logger.warning('Using `localhost` with `connect` mode, if both players are on different machines')
             logger.warning('use ipconfig/ifconfig to get your external ip and specity the ip with -a')
+        if profile :
+            # No master here: each compute_action is a move.
+            profiler = Profiler(auto_moves=True)
+            profiler.install([player2])
         asyncio.new_event_loop().run_until_complete(player2.listen(keep_alive=True,master_address=f"http://{address}:{port}"))
+        if profile :
+            profiler.uninstall()
+            profiler.dump(profile)
     elif type == "human_vs_computer" :
         folder = dirname(list_players[0])
         sys.path.append(folder)
         player1_class = __import__(splitext(basename(list_players[0]))[0], fromlist=[None])
         player1 = InteractivePlayerProxy(PlayerAbalone("W", name="bob", time_limit=time_limit),gui_path=gui_path,gs=GameStateAbalone)
         player2 = LocalPlayerProxy(player1_class.MyPlayer("B", name=splitext(basename(list_players[0]))[0], time_limit=time_limit),gs=GameStateAbalone)
-        play(player1=player1, player2=player2, log_level=log_level, port=port, address=address, gui=False, record=record, gui_path=gui_path, config=base_config)
+        if ponder :
+            enable_pondering(player2)
+        play(player1=player1, player2=player2, log_level=log_level, port=port, address=address, gui=False, record=record, gui_path=gui_path, config=base_config, profile=profile)
     elif type == "human_vs_human" :
         player1 = InteractivePlayerProxy(PlayerAbalone("W", name="bob", time_limit=time_limit),gui_path=gui_path,gs=GameStateAbalone)
         player2 = InteractivePlayerProxy(PlayerAbalone("B", name="alice", time_limit=time_limit))
         player2.share_sid(player1)
-        play(player1=player1, player2=player2, log_level=log_level, port=port, address=address, gui=False, record=record, gui_path=gui_path, config=base_config)
+        play(player1=player1, player2=player2, log_level=log_level, port=port, address=address, gui=False, record=record, gui_path=gui_path, config=base_config, profile=profile)
         
@@ -1,12 +1,22 @@
-from typing import Dict, Iterable, List
+import copy
+import json
+import sys
+from typing import Dict, Iterable, List, Optional
 from collections import Counter
 
+from loguru import logger
 from seahorse.game.game_state import GameState
 from seahorse.game.master import GameMaster
 from seahorse.player.player import Player
+from seahorse.utils.custom_exceptions import ActionNotPermittedError, SeahorseTimeoutError, StopAndStartError
 
 from game_state_abalone import GameStateAbalone
 from player_abalone import PlayerAbalone
+from profiling_abalone import Profiler
+
+# The listeners (GUI, recorder) receive the full state ("play") at the start of the game and
+# every SNAPSHOT_EVERY steps, so that they can resync, and only the changes ("play_delta") otherwise.
+SNAPSHOT_EVERY = 10
 
 
 class MasterAbalone(GameMaster):
@@ -20,11 +30,83 @@ class MasterAbalone(GameMaster):
         players_iterator (Iterable): An iterable for the players_iterator, ordered according to the playing order.
             If a list is provided, a cyclic iterator is automatically built
         log_level (str): Name of the log file
+        snapshot_every (int): Number of steps between two full states sent to the listeners
+        profiler (Profiler, optional): If given, the profiler whose moves are closed after each step
     """
 
-    def __init__(self, name: str, initial_game_state: GameStateAbalone, players_iterator: Iterable[PlayerAbalone], log_level: str, port: int = 8080, hostname: str = "localhost") -> None:
+    def __init__(self, name: str, initial_game_state: GameStateAbalone, players_iterator: Iterable[PlayerAbalone], log_level: str, port: int = 8080, hostname: str = "localhost", snapshot_every: int = SNAPSHOT_EVERY, profiler: Optional[Profiler] = None) -> None:
         super().__init__(name, initial_game_state, players_iterator, log_level, port, hostname)
-        
+        self.snapshot_every = snapshot_every
+        self.profiler = profiler
+        self._sent_state: Optional[GameStateAbalone] = None
+
+    async def broadcast_state(self) -> None:
+        """
+        Send the current state to the listeners, as a full snapshot or as its differences with the last state sent.
+        """
+        state = self.current_game_state
+        previous = self._sent_state
+        self._sent_state = state
+        if previous is None or self.snapshot_every <= 1 or state.get_step() % self.snapshot_every == 0:
+            await self.emitter.sio.emit("play", json.dumps(state.to_json(), default=lambda x: x.to_json()))
+        else:
+            await self.emitter.sio.emit("play_delta", json.dumps(state.to_delta_json(previous), default=lambda x: x.to_json()))
+
+    async def play_game(self) -> List[Player]:
+        """
+        Play the game, as GameMaster.play_game, the states being sent by broadcast_state.
+
+        Returns:
+            Iterable[Player]: The winner(s) of the game.
+        """
+        await self.broadcast_state()
+        for player in self.get_game_state().get_players() :
+            logger.info(f"Player : {player.get_name()} - {player.get_id()}")
+        while not self.current_game_state.is_done():
+            try:
+                logger.info(f"Player now playing : {self.get_game_state().get_next_player().get_name()} - {self.get_game_state().get_next_player().get_id()}")
+                step, player_name = self.current_game_state.get_step(), self.get_game_state().get_next_player().get_name()
+                self.current_game_state = await self.step()
+                if self.profiler is not None:
+                    self.profiler.end_move(step, player_name)
+            except (ActionNotPermittedError,SeahorseTimeoutError,StopAndStartError) as e:
+                if isinstance(e,SeahorseTimeoutError):
+                    logger.error(f"Time credit expired for player {self.current_game_state.get_next_player()}")
+                elif isinstance(e,ActionNotPermittedError) :
+                    logger.error(f"Action not permitted for player {self.current_game_state.get_next_player()}")
+                else:
+                    logger.error(f"Player {self.current_game_state.get_next_player()} might have tried tampering with the timer.\n The timedelta difference exceeded the allowed tolerancy in GameMaster.timetol ")
+
+                temp_score = copy.copy(self.current_game_state.get_scores())
+                id_player_error = self.current_game_state.get_next_player().get_id()
+                temp_score.pop(id_player_error)
+                self.winner = self.compute_winner(temp_score)
+                self.current_game_state.get_scores()[id_player_error] = float(sys.maxsize)
+                scores = self.get_scores()
+                for key in scores.keys() :
+                    logger.info(f"{key} - {scores[key]}")
+                for player in self.get_winner() :
+                    logger.info(f"Winner - {player.get_name()}")
+
+                await self.emitter.sio.emit("done",json.dumps(self.get_scores()))
+
+                return self.winner
+
+            logger.info(f"Current game state: \n{self.current_game_state.get_rep()}")
+
+            await self.broadcast_state()
+
+        self.winner = self.compute_winner(self.current_game_state.get_scores())
+        scores = self.get_scores()
+        for key in scores.keys() :
+            logger.info(f"{key} - {scores[key]}")
+        for player in self.get_winner() :
+            logger.info(f"Winner - {player.get_name()}")
+
+        await self.emitter.sio.emit("done",json.dumps(self.get_scores()))
+
+        return self.winner
+
     def compute_winner(self, scores: Dict[int, float]) -> List[PlayerAbalone]:
         """
         Computes the winners of the game based on the scores.
@@ -35,32 +117,4 @@ class MasterAbalone(GameMaster):
         Returns:
             Iterable[Player]: List of the players who won the game
         """
-        def manhattanDist(A, B):
-            # Note : la fonctionne pour une distance au centre ( A ou B = (8; 4))
-            mask1 = [(0,2),(1,3),(2,4)]
-            mask2 = [(0,4)]
-            diff = (abs(B[0] - A[0]),abs(B[1] - A[1]))
-            dist = (abs(B[0] - A[0]) + abs(B[1] - A[1]))/2
-            if diff in mask1:
-                dist += 1
-            if diff in mask2:
-                dist += 2
-            return dist
-        
-        max_val = max(scores.values())
-        players_id = list(filter(lambda key: scores[key] == max_val, scores))
-        itera = list(filter(lambda x: x.get_id() in players_id, self.players))
-        if len(itera) > 1: #égalité
-            final_rep = self.current_game_state.get_rep()
-            env = final_rep.get_env()
-            dim = final_rep.get_dimensions()
-            dist = dict.fromkeys(players_id, 0)
-            center = (dim[0]//2, dim[1]//2)
-            for i, j in list(env.keys()):
-                p = env.get((i, j), None)
-                if p.get_owner_id():
-                    dist[p.get_owner_id()] += manhattanDist(center, (i, j))
-            min_dist = min(dist.values())
-            players_id = list(filter(lambda key: dist[key] == min_dist, dist))
-            itera = list(filter(lambda x: x.get_id() in players_id, self.players))
-        return itera
+        return self.current_game_state.compute_winners(scores)
@@ -0,0 +1,298 @@
+import math
+import random
+import time
+from array import array
+from typing import List, NamedTuple, Optional
+
+from evaluation_abalone import evaluate, final_score
+from move_abalone import MoveAbalone
+from search_state_abalone import SearchStateAbalone
+
+EXPLORATION = 1.4
+# Playouts are cut after PLAYOUT_DEPTH moves and scored by the evaluation,
+# turned into a winning probability with a logistic of scale EVAL_SCALE.
+PLAYOUT_DEPTH = 8
+EVAL_SCALE = 1000
+# The clock is read once every CHECK_EVERY + 1 iterations.
+CHECK_EVERY = 15
+
+
+class MCTSResult(NamedTuple):
+    """
+    The outcome of a Monte Carlo tree search.
+
+    Attributes:
+        move (MoveAbalone): most visited move of the root
+        visits (int): number of visits of the move
+        value (float): mean value of the move for the player to move, in [0, 1]
+        playouts (int): number of playouts of the search
+        tree_size (int): number of nodes of the tree
+        reused (int): number of visits of the root kept from the previous turns
+        elapsed (float): duration of the search in (s)
+    """
+
+    move: MoveAbalone
+    visits: int
+    value: float
+    playouts: int
+    tree_size: int
+    reused: int
+    elapsed: float
+
+
+class MCTS:
+    """
+    UCT search whose tree is stored in preallocated parallel arrays.
+
+    The children of a node are stored next to each other: a node is described
+    by its visits, the sum of the values of its playouts for the player who
+    played its move, the index of its first child, its number of children
+    (-1 while it is not expanded) and the code of its move.
+
+    The tree is kept from one turn to the next: the subtree of the position
+    reached after the move played and the opponent's answer becomes the new tree.
+
+    Attributes:
+        capacity (int): Maximum number of nodes.
+        size (int): Number of nodes in use.
+        exploration (float): Exploration constant of UCT.
+        time_used (float): Total duration of the searches, in (s).
+    """
+
+    def __init__(self, capacity: int = 500_000, exploration: float = EXPLORATION, seed: Optional[int] = None) -> None:
+        self.capacity = capacity
+        self.exploration = exploration
+        self.time_used = 0.0
+        self.rng = random.Random(seed)
+        self.visits = array("l", [0]) * capacity
+        self.values = array("d", [0.0]) * capacity
+        self.first_child = array("l", [0]) * capacity
+        self.n_children = array("l", [-1]) * capacity
+        self.moves = array("l", [-1]) * capacity
+        self.size = 0
+        self._root_state: Optional[SearchStateAbalone] = None
+        self._played = -1
+
+    def set_root(self, state: SearchStateAbalone) -> int:
+        """
+        Make a position the root of the tree, keeping its subtree when it is
+        one of the answers to the move played at the previous search.
+
+        Args:
+            state (SearchStateAbalone): the new root
+
+        Returns:
+            int: number of visits of the subtree kept, 0 if the tree is rebuilt
+        """
+        node = self._find(state)
+        self._root_state = state.copy()
+        self._played = -1
+        if node < 0:
+            self.size = 1
+            self._reset(0, -1)
+            return 0
+        self._compact(node)
+        return self.visits[0]
+
+    def _find(self, state: SearchStateAbalone) -> int:
+        if self._root_state is None or self._played < 0 or self.n_children[self._played] < 0:
+            return -1
+        if self._root_state.key == state.key:
+            return 0
+        prev = self._root_state
+        prev.make_move(MoveAbalone.decode(self.moves[self._played]))
+        found = -1
+        first = self.first_child[self._played]
+        for child in range(first, first + self.n_children[self._played]):
+            move = prev.make_move(MoveAbalone.decode(self.moves[child]))
+            if prev.key == state.key:
+                found = child
+            prev.unmake_move(move)
+            if found >= 0:
+                break
+        return found
+
+    def _reset(self, node: int, move_code: int) -> None:
+        self.visits[node] = 0
+        self.values[node] = 0.0
+        self.first_child[node] = 0
+        self.n_children[node] = -1
+        self.moves[node] = move_code
+
+    def _compact(self, root: int) -> None:
+        # Copy the subtree in breadth first order at the start of new arrays:
+        # the children of a node stay contiguous.
+        visits = array("l", [0]) * self.capacity
+        values = array("d", [0.0]) * self.capacity
+        first_child = array("l", [0]) * self.capacity
+        n_children = array("l", [-1]) * self.capacity
+        moves = array("l", [-1]) * self.capacity
+        old = [root]
+        size = 1
+        new = 0
+        while new < size:
+            node = old[new]
+            visits[new] = self.visits[node]
+            values[new] = self.values[node]
+            moves[new] = self.moves[node]
+            n = self.n_children[node]
+            n_children[new] = n
+            if n > 0:
+                first_child[new] = size
+                first = self.first_child[node]
+                old.extend(range(first, first + n))
+                size += n
+            new += 1
+        self.visits, self.values, self.first_child, self.n_children, self.moves = visits, values, first_child, n_children, moves
+        self.size = size
+
+    def search(self, state: SearchStateAbalone, time_budget: float, max_playouts: Optional[int] = None) -> MCTSResult:
+        """
+        Run playouts from a position until the time budget is spent.
+
+        Args:
+            state (SearchStateAbalone): position to search, left untouched
+            time_budget (float): time allowed in (s)
+            max_playouts (int, optional): number of playouts at which to stop
+
+        Returns:
+            MCTSResult: the most visited move of the root
+        """
+        start = time.perf_counter()
+        deadline = start + time_budget
+        reused = self.set_root(state)
+        root = self._root_state
+        playouts = 0
+        while max_playouts is None or playouts < max_playouts:
+            if not playouts & CHECK_EVERY and time.perf_counter() > deadline and self.n_children[0] > 0:
+                break
+            self._iterate(root)
+            playouts += 1
+
+        best = self.best_child(0)
+        self._played = best
+        elapsed = time.perf_counter() - start
+        self.time_used += elapsed
+        visits = self.visits[best]
+        return MCTSResult(
+            MoveAbalone.decode(self.moves[best]),
+            visits,
+            self.values[best] / visits if visits else 0.0,
+            playouts,
+            self.size,
+            reused,
+            elapsed,
+        )
+
+    def _iterate(self, state: SearchStateAbalone) -> None:
+        # Selection, expansion, playout and backpropagation of one playout.
+        path = [0]
+        played: List[MoveAbalone] = []
+        node = 0
+        while self.n_children[node] > 0:
+            node = self.select_child(node)
+            path.append(node)
+            played.append(state.make_move(MoveAbalone.decode(self.moves[node])))
+        if state.is_done():
+            value = self._final_value(state)
+        else:
+            if self.n_children[node] < 0 and self.visits[node] > 0 or node == 0:
+                if self._expand(node, state):
+                    node = self.first_child[node] + self.rng.randrange(self.n_children[node])
+                    path.append(node)
+                    played.append(state.make_move(MoveAbalone.decode(self.moves[node])))
+            value = self.playout(state)
+        # value is seen from the player to move at the leaf, the value of a node
+        # from the player who played its move.
+        for node in reversed(path):
+            value = 1.0 - value
+            self.visits[node] += 1
+            self.values[node] += value
+        for move in reversed(played):
+            state.unmake_move(move)
+
+    def _expand(self, node: int, state: SearchStateAbalone) -> bool:
+        if self.n_children[node] >= 0:
+            return self.n_children[node] > 0
+        moves = state.generate_moves()
+        if not moves or self.size + len(moves) > self.capacity:
+            return False
+        first = self.size
+        for k, move in enumerate(moves):
+            self._reset(first + k, move.encode())
+        self.first_child[node] = first
+        self.n_children[node] = len(moves)
+        self.size += len(moves)
+        return True
+
+    def select_child(self, node: int) -> int:
+        """
+        Args:
+            node (int): an expanded node
+
+        Returns:
+            int: the child maximising the UCT score, an unvisited child first
+        """
+        first = self.first_child[node]
+        end = first + self.n_children[node]
+        visits = self.visits
+        values = self.values
+        log_n = math.log(visits[node] + 1)
+        c = self.exploration
+        best = first
+        best_score = -1.0
+        for child in range(first, end):
+            n = visits[child]
+            if n == 0:
+                return child
+            score = values[child] / n + c * math.sqrt(log_n / n)
+            if score > best_score:
+                best_score = score
+                best = child
+        return best
+
+    def best_child(self, node: int) -> int:
+        """
+        Args:
+            node (int): an expanded node
+
+        Returns:
+            int: the most visited child
+        """
+        first = self.first_child[node]
+        return max(range(first, first + self.n_children[node]), key=lambda child: self.visits[child])
+
+    def playout(self, state: SearchStateAbalone) -> float:
+        """
+        Play a fast playout: ejections of the opponent's marbles first, random moves otherwise.
+
+        Args:
+            state (SearchStateAbalone): position to start from, restored on return
+
+        Returns:
+            float: value of the end of the playout for the player to move at its start, in [0, 1]
+        """
+        played = []
+        side = state.side
+        rng = self.rng
+        while len(played) < PLAYOUT_DEPTH and not state.is_done():
+            moves = state.generate_moves()
+            if not moves:
+                break
+            ejections = [m for m in moves if m.ejection and m.n_pushed]
+            move = rng.choice(ejections) if ejections else rng.choice(moves)
+            played.append(state.make_move(move))
+        if state.is_done():
+            value = self._final_value(state)
+        else:
+            value = 1.0 / (1.0 + math.exp(-evaluate(state) / EVAL_SCALE))
+        if state.side != side:
+            value = 1.0 - value
+        for move in reversed(played):
+            state.unmake_move(move)
+        return value
+
+    @staticmethod
+    def _final_value(state: SearchStateAbalone) -> float:
+        score = final_score(state)
+        return 1.0 if score > 0 else 0.0 if score < 0 else 0.5
@@ -0,0 +1,63 @@
+from loguru import logger
+from player_abalone import PlayerAbalone
+from seahorse.game.action import Action
+from alphabeta_player_abalone import MAX_SHARE, MIN_MOVE_TIME, SAFETY
+from game_state_abalone import GameStateAbalone
+from mcts_abalone import MCTS
+from search_state_abalone import SearchStateAbalone
+
+
+class MyPlayer(PlayerAbalone):
+    """
+    Player class for Abalone game running a Monte Carlo tree search.
+
+    Attributes:
+        piece_type (str): piece type of the player
+    """
+
+    def __init__(self, piece_type: str, name: str = "bob", time_limit: float=60*15,*args, capacity: int = 500_000) -> None:
+        """
+        Initialize the PlayerAbalone instance.
+
+        Args:
+            piece_type (str): Type of the player's game piece
+            name (str, optional): Name of the player (default is "bob")
+            time_limit (float, optional): the time limit in (s)
+            capacity (int, optional): maximum number of nodes of the tree
+        """
+        super().__init__(piece_type,name,time_limit,*args)
+        self._mcts = MCTS(capacity)
+
+    def compute_time_budget(self, current_state: GameStateAbalone) -> float:
+        """
+        Share the remaining time between the moves left to play before max_step.
+
+        Args:
+            current_state (GameStateAbalone): Current game state representation
+
+        Returns:
+            float: time allowed for the move in (s)
+        """
+        remaining = self.get_time_credit(self._mcts.time_used)
+        moves_left = max(1, (current_state.max_step - current_state.step + 1) // 2)
+        return max(MIN_MOVE_TIME, SAFETY * min(remaining / moves_left, MAX_SHARE * remaining))
+
+    def compute_action(self, current_state: GameStateAbalone, **kwargs) -> Action:
+        """
+        Return the most visited move of the search in the time budget.
+
+        Args:
+            current_state (GameState): Current game state representation
+            **kwargs: Additional keyword arguments
+
+        Returns:
+            Action: selected feasible action
+        """
+        state = SearchStateAbalone.from_game_state(current_state)
+        result = self._mcts.search(state, self.compute_time_budget(current_state))
+        logger.info(
+            f"{self.get_name()} - {result.playouts} playouts in {result.elapsed:.2f}s "
+            f"({result.playouts / max(result.elapsed, 1e-9):.0f} playouts/s), value {result.value:.2f}, "
+            f"{result.tree_size} nodes, {result.reused} visits reused"
+        )
+        return current_state.get_action(result.move)
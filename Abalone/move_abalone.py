@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Dict, NamedTuple, Tuple
+
+from geometry_abalone import CELLS, DIRECTIONS
+
+
+class MoveAbalone(NamedTuple):
+    """
+    A lightweight and immutable description of an inline move.
+
+    The successor state is not built: it is obtained from the game state that
+    generated the move when the move is actually chosen or expanded.
+
+    Attributes:
+        origin (int): index of the cell holding the rearmost marble of the moved line
+        direction (int): index of the moving direction in DIRECTIONS
+        n_moved (int): number of marbles of the player moved
+        n_pushed (int): number of marbles of the opponent pushed
+        ejection (bool): True if the front marble is pushed off the board
+    """
+
+    origin: int
+    direction: int
+    n_moved: int
+    n_pushed: int
+    ejection: bool
+
+    def is_push(self) -> bool:
+        """
+        Returns:
+            bool: True if the move pushes marbles of the opponent
+        """
+        return self.n_pushed > 0
+
+    def get_src(self) -> Tuple[int, int]:
+        """
+        Returns:
+            Tuple[int, int]: position of the rearmost moved marble
+        """
+        return CELLS[self.origin]
+
+    def get_dst(self) -> Tuple[int, int]:
+        """
+        Returns:
+            Tuple[int, int]: position reached by the rearmost moved marble
+        """
+        i, j = CELLS[self.origin]
+        n_i, n_j = DIRECTIONS[self.direction]
+        return (i + n_i, j + n_j)
+
+    def to_light_action(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Convert the move to the light action format of convert_light_action_to_action.
+
+        Returns:
+            Dict[str, Tuple[int, int]]: {"from": source position, "to": destination position}
+        """
+        return {"from": self.get_src(), "to": self.get_dst()}
+
+    def encode(self) -> int:
+        """
+        Pack the move in a 14 bits integer.
+
+        Returns:
+            int: the code of the move
+        """
+        return self.origin | self.direction << 6 | self.n_moved << 9 | self.n_pushed << 11 | self.ejection << 13
+
+    @classmethod
+    def decode(cls, code: int) -> MoveAbalone:
+        """
+        Unpack a move packed by encode.
+
+        Args:
+            code (int): the code of the move
+
+        Returns:
+            MoveAbalone: the move
+        """
+        return cls(code & 63, code >> 6 & 7, code >> 9 & 3, code >> 11 & 3, bool(code >> 13 & 1))
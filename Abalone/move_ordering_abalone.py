@@ -0,0 +1,138 @@
+from typing import Dict, List
+
+from geometry_abalone import N_CELLS
+from move_abalone import MoveAbalone
+
+# Sort keys of the move categories, best first. Quiet moves are sorted by
+# their history score, kept below KILLER_KEY.
+EJECTION_KEY = 3 << 40
+PUSH_KEY = 2 << 40
+KILLER_KEY = 1 << 40
+SUICIDE_KEY = -1
+HISTORY_MAX = 1 << 30
+N_KILLERS = 2
+MAX_PLY = 64
+
+
+class MoveOrderer:
+    """
+    Orders the moves for alpha-beta: transposition table move, ejections, pushes,
+    then quiet moves by killer and history heuristics.
+
+    The killer and history tables are kept across calls and searches.
+
+    Attributes:
+        killers (list[list[int]]): Slots of the last quiet moves that caused a cutoff, per ply.
+        history (list[list[int]]): History score of each slot, per side.
+        ordered_nodes (int): Number of move lists ordered.
+        cutoffs (int): Number of beta cutoffs recorded.
+        first_move_cutoffs (int): Number of cutoffs caused by the first move.
+        cutoff_index_sum (int): Sum of the indices of the moves causing a cutoff.
+        tt_move_hits (int): Number of lists in which the table move was found.
+    """
+
+    def __init__(self) -> None:
+        self.killers = [[-1] * N_KILLERS for _ in range(MAX_PLY)]
+        self.history = [[0] * (N_CELLS * 6) for _ in range(2)]
+        self.reset_stats()
+
+    def order(self, moves: List[MoveAbalone], side: int, ply: int, tt_move: int = -1) -> List[MoveAbalone]:
+        """
+        Sort a list of moves in place, best expected first.
+
+        Args:
+            moves (List[MoveAbalone]): moves to sort
+            side (int): index of the player to move
+            ply (int): distance to the root of the search
+            tt_move (int, optional): code of the best move stored in the transposition table
+
+        Returns:
+            List[MoveAbalone]: the sorted list
+        """
+        self.ordered_nodes += 1
+        killers = self.killers[ply] if ply < MAX_PLY else ()
+        history = self.history[side]
+
+        def key(m: MoveAbalone) -> int:
+            if m.ejection:
+                return EJECTION_KEY if m.n_pushed else SUICIDE_KEY
+            if m.n_pushed:
+                return PUSH_KEY + m.n_pushed
+            slot = m.origin * 6 + m.direction
+            if slot in killers:
+                return KILLER_KEY
+            return history[slot]
+
+        moves.sort(key=key, reverse=True)
+        if tt_move >= 0:
+            move = MoveAbalone.decode(tt_move)
+            if move in moves:
+                self.tt_move_hits += 1
+                moves.remove(move)
+                moves.insert(0, move)
+        return moves
+
+    def record_cutoff(self, move: MoveAbalone, side: int, ply: int, depth: int, index: int) -> None:
+        """
+        Record a move that caused a beta cutoff.
+
+        Args:
+            move (MoveAbalone): the move
+            side (int): index of the player to move
+            ply (int): distance to the root of the search
+            depth (int): remaining depth of the search
+            index (int): position of the move in the ordered list
+        """
+        self.cutoffs += 1
+        self.cutoff_index_sum += index
+        if index == 0:
+            self.first_move_cutoffs += 1
+        if move.n_pushed:
+            return
+        slot = move.origin * 6 + move.direction
+        if ply < MAX_PLY:
+            killers = self.killers[ply]
+            if killers[0] != slot:
+                killers[1] = killers[0]
+                killers[0] = slot
+        history = self.history[side]
+        history[slot] += depth * depth
+        if history[slot] > HISTORY_MAX:
+            self.age_history()
+
+    def age_history(self) -> None:
+        """
+        Halve the history scores so that recent cutoffs weigh more.
+        """
+        for history in self.history:
+            for slot in range(len(history)):
+                history[slot] >>= 1
+
+    def new_search(self) -> None:
+        """
+        Prepare a new search: the killers of the previous one no longer apply to the same plies.
+        """
+        for killers in self.killers:
+            killers[:] = [-1] * N_KILLERS
+        self.age_history()
+
+    def reset_stats(self) -> None:
+        self.ordered_nodes = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.cutoff_index_sum = 0
+        self.tt_move_hits = 0
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: counters measuring the quality of the ordering
+        """
+        return {
+            "ordered_nodes": self.ordered_nodes,
+            "cutoffs": self.cutoffs,
+            "cutoff_rate": self.cutoffs / self.ordered_nodes if self.ordered_nodes else 0.0,
+            "first_move_cutoff_rate": self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+            "mean_cutoff_index": self.cutoff_index_sum / self.cutoffs if self.cutoffs else 0.0,
+            "tt_move_hits": self.tt_move_hits,
+        }
@@ -0,0 +1,263 @@
+import argparse
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+from evaluation_abalone import evaluate
+from layouts_abalone import LAYOUTS, build_initial_state
+from move_abalone import MoveAbalone
+from player_abalone import PlayerAbalone
+from search_abalone import AlphaBetaSearch
+from search_state_abalone import SearchStateAbalone
+
+# A book file is a header followed by fixed-size records sorted by key.
+MAGIC = b"ABOK"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")
+# key, move code, depth of the search, score
+RECORD = struct.Struct("<QHhi")
+DEFAULT_BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+
+
+class BookEntry(NamedTuple):
+    """
+    A move of the book.
+
+    Attributes:
+        move (MoveAbalone): move to play
+        depth (int): depth of the search that chose it, 0 for a move taken from a game
+        score (int): score of the move for the player to move
+    """
+
+    move: MoveAbalone
+    depth: int
+    score: int
+
+
+class OpeningBook:
+    """
+    Read-only opening book, memory mapped: opening it reads nothing but the header.
+
+    Attributes:
+        path (str): Path of the book file.
+        n_entries (int): Number of positions of the book.
+    """
+
+    def __init__(self, path: str = DEFAULT_BOOK_PATH) -> None:
+        self.path = path
+        self._file = open(path, "rb")
+        size = os.fstat(self._file.fileno()).st_size
+        if size < HEADER.size:
+            self._file.close()
+            raise ValueError(f"{path} is not an opening book")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, record_size, n_entries = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size or size != HEADER.size + n_entries * RECORD.size:
+            self.close()
+            raise ValueError(f"{path} is not an opening book of version {VERSION}")
+        self.n_entries = n_entries
+
+    def _key_at(self, index: int) -> int:
+        return struct.unpack_from("<Q", self._map, HEADER.size + index * RECORD.size)[0]
+
+    def lookup(self, key: int) -> Optional[BookEntry]:
+        """
+        Look a position up by binary search.
+
+        Args:
+            key (int): Zobrist key of the position, as SearchStateAbalone.key
+
+        Returns:
+            Optional[BookEntry]: the entry of the position, None if it is not in the book
+        """
+        low, high = 0, self.n_entries
+        while low < high:
+            mid = (low + high) // 2
+            if self._key_at(mid) < key:
+                low = mid + 1
+            else:
+                high = mid
+        if low == self.n_entries or self._key_at(low) != key:
+            return None
+        _, move_code, depth, score = RECORD.unpack_from(self._map, HEADER.size + low * RECORD.size)
+        return BookEntry(MoveAbalone.decode(move_code), depth, score)
+
+    def get_move(self, state: SearchStateAbalone) -> Optional[MoveAbalone]:
+        """
+        Args:
+            state (SearchStateAbalone): a position
+
+        Returns:
+            Optional[MoveAbalone]: the move of the book, None if the position is not in the book
+        """
+        entry = self.lookup(state.key)
+        if entry is None or entry.move not in state.generate_moves():
+            return None
+        return entry.move
+
+    def __len__(self) -> int:
+        return self.n_entries
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+def open_book(path: Optional[str] = DEFAULT_BOOK_PATH) -> Optional[OpeningBook]:
+    """
+    Args:
+        path (str, optional): path of the book file
+
+    Returns:
+        Optional[OpeningBook]: the book, None if there is no valid book at this path
+    """
+    if path is None or not os.path.exists(path):
+        return None
+    try:
+        return OpeningBook(path)
+    except ValueError as e:
+        logger.warning(f"Opening book ignored: {e}")
+        return None
+
+
+class BookBuilder:
+    """
+    Collects the moves of a book, from searches or from games, and writes the book file.
+
+    Attributes:
+        entries (Dict[int, Tuple[int, int, int]]): (move code, depth, score) of each position key
+        search (AlphaBetaSearch): The search used to choose the moves.
+        search_time (float): Time of the search of each position, in (s).
+    """
+
+    def __init__(self, search_time: float = 5.0, tt_size_mb: float = 64) -> None:
+        self.entries: Dict[int, Tuple[int, int, int]] = {}
+        self.search = AlphaBetaSearch(tt_size_mb)
+        self.search_time = search_time
+
+    def add(self, key: int, move: MoveAbalone, depth: int, score: int) -> None:
+        """
+        Add a move, unless the position already has a move from a deeper search.
+        """
+        old = self.entries.get(key)
+        if old is None or old[1] <= depth:
+            self.entries[key] = (move.encode(), depth, score)
+
+    def add_position(self, state: SearchStateAbalone) -> MoveAbalone:
+        """
+        Search a position and add its best move.
+
+        Args:
+            state (SearchStateAbalone): the position
+
+        Returns:
+            MoveAbalone: the best move
+        """
+        result = self.search.search(state, self.search_time)
+        self.add(state.key, result.move, result.depth, result.score)
+        return result.move
+
+    def add_tree(self, state: SearchStateAbalone, plies: int, width: int = 3) -> None:
+        """
+        Add the positions of a tree of openings: from each position, the best move
+        and the width - 1 best other moves at one ply are followed.
+
+        Args:
+            state (SearchStateAbalone): root of the tree, restored on return
+            plies (int): depth of the tree
+            width (int, optional): number of moves followed from each position
+        """
+        if state.is_done():
+            return
+        best = self.add_position(state)
+        if plies <= 1:
+            return
+        followed = [best] + self.rank_moves(state, best)[: width - 1]
+        for move in followed:
+            state.make_move(move)
+            self.add_tree(state, plies - 1, width)
+            state.unmake_move(move)
+
+    @staticmethod
+    def rank_moves(state: SearchStateAbalone, excluded: MoveAbalone) -> List[MoveAbalone]:
+        scored = []
+        for move in state.generate_moves():
+            if move != excluded:
+                state.make_move(move)
+                scored.append((-evaluate(state), move))
+                state.unmake_move(move)
+        scored.sort(key=lambda x: x[0], reverse=True)
+        return [move for _, move in scored]
+
+    def add_line(self, state: SearchStateAbalone, moves: Iterable[MoveAbalone], plies: Optional[int] = None) -> None:
+        """
+        Add the moves of a game, e.g. a self-play game won by the side of the moves.
+        They are stored with depth 0, so searched moves are preferred.
+
+        Args:
+            state (SearchStateAbalone): initial position of the game, restored on return
+            moves (Iterable[MoveAbalone]): moves of the game
+            plies (int, optional): number of moves to add, all by default
+        """
+        played = []
+        for move in moves:
+            if plies is not None and len(played) >= plies:
+                break
+            self.add(state.key, move, 0, 0)
+            played.append(state.make_move(move))
+        for move in reversed(played):
+            state.unmake_move(move)
+
+    def write(self, path: str) -> int:
+        """
+        Write the book file, records sorted by key.
+
+        Args:
+            path (str): path of the file
+
+        Returns:
+            int: number of entries written
+        """
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, len(self.entries)))
+            for key in sorted(self.entries):
+                move_code, depth, score = self.entries[key]
+                f.write(RECORD.pack(key, move_code, depth, max(-2**31, min(2**31 - 1, score))))
+        os.replace(tmp, path)
+        return len(self.entries)
+
+
+def build_book(path: str, plies: int, width: int, search_time: float, configs: Iterable[str] = tuple(LAYOUTS)) -> int:
+    """
+    Build the book of the starting layouts, the player "W" playing first as in main_abalone.py.
+
+    Args:
+        path (str): path of the book file
+        plies (int): depth of the trees of openings
+        width (int): number of moves followed from each position
+        search_time (float): time of the search of each position in (s)
+        configs (Iterable[str], optional): starting layouts
+
+    Returns:
+        int: number of entries of the book
+    """
+    builder = BookBuilder(search_time)
+    for config in configs:
+        state = build_initial_state(PlayerAbalone("W", name="W"), PlayerAbalone("B", name="B"), config)
+        builder.add_tree(SearchStateAbalone.from_game_state(state), plies, width)
+        logger.info(f"{config}: {len(builder.entries)} positions")
+    return builder.write(path)
+
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(prog="opening_book_abalone.py", description="Builds the opening book of the starting layouts.")
+    parser.add_argument("-o","--output",required=False, default=DEFAULT_BOOK_PATH, help="Path of the book file.")
+    parser.add_argument("-p","--plies",required=False,type=int, default=4, help="Depth of the trees of openings.")
+    parser.add_argument("-w","--width",required=False,type=int, default=3, help="Number of moves followed from each position.")
+    parser.add_argument("-t","--time",required=False,type=float, default=5.0, help="Search time per position in (s).")
+    args=parser.parse_args()
+    n = build_book(args.output, args.plies, args.width, args.time)
+    logger.info(f"{n} positions written to {args.output}")
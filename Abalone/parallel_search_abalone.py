@@ -0,0 +1,158 @@
+import multiprocessing
+import os
+import queue
+import time
+import weakref
+from multiprocessing import shared_memory
+from typing import List, Optional
+
+from loguru import logger
+from search_abalone import AlphaBetaSearch, SearchResult
+from search_state_abalone import SearchStateAbalone
+from transposition_table_abalone import TranspositionTable
+
+# Time kept at the end of the budget to stop the helpers and read their results, in (s).
+JOIN_TIME = 0.05
+
+
+def _helper_main(shm_name: str, tt_size_mb: float, index: int, commands, results, stop_event) -> None:
+    """
+    Loop of a helper process: search every position received until None is received.
+    """
+    shm = shared_memory.SharedMemory(name=shm_name)
+    tt = TranspositionTable(tt_size_mb, buffer=shm.buf)
+    search = AlphaBetaSearch(tt=tt)
+    search.stop_event = stop_event
+    try:
+        while True:
+            command = commands.get()
+            if command is None:
+                break
+            search_id, state, time_budget, max_depth, generation = command
+            tt.generation = generation
+            # Odd helpers start one depth further, so that the helpers do not all search the same tree.
+            result = search.search(state, time_budget, max_depth, start_depth=1 + index % 2)
+            results.put((search_id, result))
+    finally:
+        tt.release()
+        shm.close()
+
+
+def _shutdown(processes: List[multiprocessing.Process], commands: list, tt: TranspositionTable, shm: shared_memory.SharedMemory) -> None:
+    for q in commands:
+        q.put(None)
+    for p in processes:
+        p.join(1)
+        if p.is_alive():
+            p.terminate()
+    tt.release()
+    shm.close()
+    shm.unlink()
+
+
+class ParallelSearch(AlphaBetaSearch):
+    """
+    Lazy SMP search: helper processes search the same position as the main
+    search, sharing its transposition table in a shared memory block, so that
+    each of them benefits from the subtrees already searched by the others.
+
+    The table is lock-free: a torn entry fails the key check of TranspositionTable.probe.
+    When the helpers cannot be started, the search runs alone, as AlphaBetaSearch.
+
+    Attributes:
+        n_workers (int): Number of processes searching, the main one included.
+    """
+
+    def __init__(self, n_workers: Optional[int] = None, tt_size_mb: float = 64) -> None:
+        """
+        Args:
+            n_workers (int, optional): number of processes searching, the number of cores by default
+            tt_size_mb (float, optional): memory cap of the shared transposition table in MB
+        """
+        n_workers = n_workers if n_workers is not None else os.cpu_count() or 1
+        self._processes: List[multiprocessing.Process] = []
+        self._commands = []
+        self._search_id = 0
+        if n_workers <= 1:
+            super().__init__(tt_size_mb)
+            self.n_workers = 1
+            return
+        shm = shared_memory.SharedMemory(create=True, size=TranspositionTable.buffer_size(tt_size_mb))
+        tt = TranspositionTable(tt_size_mb, buffer=shm.buf)
+        super().__init__(tt=tt)
+        self._stop_event = multiprocessing.Event()
+        self._results = multiprocessing.Queue()
+        self._finalizer = weakref.finalize(self, _shutdown, self._processes, self._commands, tt, shm)
+        try:
+            for index in range(n_workers - 1):
+                commands = multiprocessing.Queue()
+                process = multiprocessing.Process(
+                    target=_helper_main,
+                    args=(shm.name, tt_size_mb, index, commands, self._results, self._stop_event),
+                    daemon=True,
+                )
+                process.start()
+                self._commands.append(commands)
+                self._processes.append(process)
+        except Exception as e:
+            logger.warning(f"Parallel search disabled, the helper processes could not be started: {e!r}")
+            self._finalizer()
+            self._processes.clear()
+            self._commands.clear()
+            self.tt = TranspositionTable(tt_size_mb)
+        self.n_workers = 1 + len(self._processes)
+
+    def search(self, state: SearchStateAbalone, time_budget: float, max_depth: Optional[int] = None, start_depth: int = 1) -> SearchResult:
+        """
+        Search the best move with the helpers, until the time budget is spent or the end of the game is reached.
+
+        Args:
+            state (SearchStateAbalone): position to search, left untouched
+            time_budget (float): time allowed in (s)
+            max_depth (int, optional): depth at which to stop. Defaults to the end of the game.
+            start_depth (int, optional): first depth of the iterative deepening of the main search
+
+        Returns:
+            SearchResult: the result of the deepest search completed
+        """
+        if not self._processes:
+            return super().search(state, time_budget, max_depth, start_depth)
+        start = time.perf_counter()
+        self._search_id += 1
+        self._stop_event.clear()
+        # The helpers start from the generation of the main table, and increment it as super().search does.
+        generation = self.tt.generation
+        for commands in self._commands:
+            commands.put((self._search_id, state, time_budget - JOIN_TIME, max_depth, generation))
+        best = super().search(state, max(time_budget - JOIN_TIME, 0.0), max_depth, start_depth)
+        self._stop_event.set()
+        main_elapsed = best.elapsed
+
+        deadline = start + time_budget
+        pending = len(self._processes)
+        while pending:
+            try:
+                search_id, result = self._results.get(timeout=max(deadline - time.perf_counter(), 0.001))
+            except queue.Empty:
+                break
+            if search_id != self._search_id:
+                continue
+            pending -= 1
+            self.nodes += result.nodes
+            if result.depth > best.depth:
+                best = result
+        if pending:
+            logger.warning(f"{pending} search helpers did not stop in time")
+        elapsed = time.perf_counter() - start
+        self.time_used += elapsed - main_elapsed
+        best = best._replace(nodes=self.nodes, elapsed=elapsed)
+        self.history[-1] = best
+        return best
+
+    def close(self) -> None:
+        """
+        Stop the helpers and free the shared memory block. The search can no longer be used.
+        """
+        if self._processes:
+            self._finalizer()
+            self._processes.clear()
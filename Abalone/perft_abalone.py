@@ -0,0 +1,184 @@
+import argparse
+import json
+import sys
+import time
+from typing import Dict, List, Tuple
+
+from game_state_abalone import GameStateAbalone
+from layouts_abalone import LAYOUTS, build_initial_state
+from move_abalone import MoveAbalone
+from player_abalone import PlayerAbalone
+from search_state_abalone import SearchStateAbalone
+
+# Mid-game positions, as a starting layout and the codes (MoveAbalone.encode) of the moves played from it.
+POSITIONS: Dict[str, Tuple[str, Tuple[int, ...]]] = {
+    # Step 21, scores -4/-2, pushes and an ejection available.
+    "classic-midgame": ("classic", (
+        9223, 1915, 716, 1084, 784, 880, 651, 9513, 1743, 1123, 1748,
+        3243, 8723, 3441, 9024, 3432, 3289, 8823, 9220, 3423, 771,
+    )),
+    # Step 34, the opponent at -5: an ejection ends the game.
+    "classic-ejection": ("classic", (
+        1217, 556, 9026, 1398, 1286, 626, 9034, 560, 1792, 9020, 840, 1081,
+        724, 890, 851, 635, 536, 760, 652, 10020, 1282, 1396, 5895, 885,
+        5904, 3116, 9547, 3111, 3157, 9517, 3343, 8955, 3352, 8828,
+    )),
+    # Step 18, scores -4/-1, two ejections available.
+    "alien-midgame": ("alien", (
+        8882, 3417, 8828, 3267, 3363, 3093, 657, 11608, 11508,
+        644, 3303, 1286, 3129, 11600, 3125, 728, 3120, 3274,
+    )),
+    # Step 47: the game ends by the step limit three plies later.
+    "alien-endgame": ("alien", (
+        3363, 3093, 3129, 3331, 679, 3328, 12067, 3275, 9019, 3417, 646, 3280,
+        669, 11276, 3125, 11272, 876, 3441, 3120, 3432, 3115, 3343, 626, 3352,
+        601, 3290, 3446, 3292, 3437, 778, 3428, 3423, 11611, 3297, 617, 3302,
+        669, 3307, 3452, 641, 3448, 11606, 560, 3349, 1289, 3358, 633,
+    )),
+}
+# Leaf counts of the starting layouts and of POSITIONS, from depth 1.
+EXPECTED: Dict[str, List[int]] = {
+    "classic": [74, 5476, 399896, 29202374],
+    "alien": [54, 2952, 161078, 8885756],
+    "classic-midgame": [64, 3353, 208835, 10698150],
+    "classic-ejection": [60, 2789, 131389, 6170468],
+    "alien-midgame": [49, 3301, 162868, 10781388],
+    "alien-endgame": [62, 3111, 190936, 190936],
+}
+
+
+def build_position(name: str) -> GameStateAbalone:
+    """
+    Build a starting layout or a position of POSITIONS, the player "W" playing first as in main_abalone.py.
+
+    Args:
+        name (str): name of a layout of LAYOUTS or of a position of POSITIONS
+
+    Raises:
+        ValueError: if a stored move is not possible, the rules having changed
+
+    Returns:
+        GameStateAbalone: the position
+    """
+    config, codes = POSITIONS[name] if name in POSITIONS else (name, ())
+    state = SearchStateAbalone.from_game_state(build_initial_state(PlayerAbalone("W", name="W"), PlayerAbalone("B", name="B"), config))
+    for code in codes:
+        if code not in {move.encode() for move in state.generate_moves()}:
+            raise ValueError(f"{MoveAbalone.decode(code)} is not possible at step {state.step} of {name}")
+        state.make_move(MoveAbalone.decode(code))
+    return state.to_game_state()
+
+
+def perft(state: GameStateAbalone, depth: int) -> int:
+    """
+    Count the leaves of the tree of the possible moves with the rules engine:
+    GameStateAbalone.generator and get_successor.
+
+    A finished game has no successor: it counts as one leaf, whatever the depth left.
+
+    Args:
+        state (GameStateAbalone): root of the tree
+        depth (int): depth of the tree in plies
+
+    Returns:
+        int: number of leaves
+    """
+    if depth == 0 or state.is_done():
+        return 1
+    if depth == 1:
+        return sum(1 for _ in state.generator())
+    nodes = 0
+    for next_rep, id_add in state.generator():
+        nodes += perft(state.get_successor(next_rep, id_add), depth - 1)
+    return nodes
+
+
+def perft_search(state: SearchStateAbalone, depth: int) -> int:
+    """
+    Count the leaves as perft does, with the moves made and unmade on a SearchStateAbalone.
+
+    Args:
+        state (SearchStateAbalone): root of the tree, restored on return
+        depth (int): depth of the tree in plies
+
+    Returns:
+        int: number of leaves
+    """
+    if depth == 0 or state.is_done():
+        return 1
+    moves = state.generate_moves()
+    if depth == 1:
+        return len(moves)
+    nodes = 0
+    for move in moves:
+        state.make_move(move)
+        nodes += perft_search(state, depth - 1)
+        state.unmake_move(move)
+    return nodes
+
+
+def divide(state: SearchStateAbalone, depth: int) -> Dict[int, int]:
+    """
+    Split the perft count between the moves of the root, to find the move whose subtree differs.
+
+    Args:
+        state (SearchStateAbalone): root of the tree, restored on return
+        depth (int): depth of the tree in plies, at least 1
+
+    Returns:
+        Dict[int, int]: number of leaves under each move of the root, keyed by the code of the move
+    """
+    counts = {}
+    for move in state.generate_moves():
+        state.make_move(move)
+        counts[move.encode()] = perft_search(state, depth - 1)
+        state.unmake_move(move)
+    return counts
+
+
+def run_perft(name: str, depth: int, rules: bool = True) -> dict:
+    """
+    Count the leaves of a position with both engines and check them against EXPECTED.
+
+    Args:
+        name (str): name of a layout or of a position of POSITIONS
+        depth (int): depth of the tree in plies
+        rules (bool, optional): also count with the rules engine, much slower than the search state
+
+    Returns:
+        dict: the counts, their durations in (s), their speeds in leaves per second and whether they match
+    """
+    state = build_position(name)
+    result = {"position": name, "depth": depth}
+    engines = [("search", lambda: perft_search(SearchStateAbalone.from_game_state(state), depth))]
+    if rules:
+        engines.append(("rules", lambda: perft(state, depth)))
+    counts = []
+    for engine, count in engines:
+        start = time.perf_counter()
+        nodes = count()
+        elapsed = time.perf_counter() - start
+        counts.append(nodes)
+        result[engine] = {"nodes": nodes, "seconds": elapsed, "nps": nodes / elapsed if elapsed else None}
+    expected = EXPECTED.get(name, [])
+    result["expected"] = expected[depth - 1] if 0 < depth <= len(expected) else None
+    result["ok"] = len(set(counts)) == 1 and result["expected"] in (None, counts[0])
+    return result
+
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(prog="perft_abalone.py", description="Counts the leaves of the move tree of the starting layouts and of stored positions, and prints a json line per position.")
+    parser.add_argument("-d","--depth",required=False,type=int, default=3, help="Depth of the trees in plies.")
+    parser.add_argument("-p","--positions",required=False,nargs="+",choices=list(LAYOUTS)+list(POSITIONS), default=list(LAYOUTS)+list(POSITIONS), help="Positions to count.")
+    parser.add_argument("-s","--search-only",action="store_true",default=False, help="Only counts with the search state, not with the slower rules engine.")
+    parser.add_argument("--divide",action="store_true",default=False, help="Also prints the count under each move of the root.")
+    args=parser.parse_args()
+
+    failed = False
+    for name in args.positions:
+        result = run_perft(name, args.depth, rules=not args.search_only)
+        if args.divide:
+            result["divide"] = {f"{MoveAbalone.decode(code).get_src()}->{MoveAbalone.decode(code).get_dst()}": n for code, n in divide(SearchStateAbalone.from_game_state(build_position(name)), args.depth).items()}
+        failed |= not result["ok"]
+        print(json.dumps(result))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Dict, Tuple
+
+from seahorse.game.game_layout.board import Piece
+
+
+class PieceAbalone(Piece):
+    """
+    An immutable piece. All the marbles of a player share the same instance,
+    given by get_piece, so moving a marble only moves a reference.
+
+    Attributes:
+        piece_type (str): The type of the piece.
+        owner_id (int): The ID of the player who possesses the piece.
+    """
+
+    __slots__ = ("piece_type", "owner_id", "_hash")
+
+    def __init__(self, piece_type: str, owner_id: int = -1) -> None:
+        object.__setattr__(self, "piece_type", piece_type)
+        object.__setattr__(self, "owner_id", owner_id)
+        object.__setattr__(self, "_hash", hash((hash(piece_type), hash(owner_id))))
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError("PieceAbalone is immutable")
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, __value: object) -> bool:
+        return self is __value or hash(self) == hash(__value)
+
+    def __copy__(self) -> PieceAbalone:
+        return self
+
+    def __deepcopy__(self, memo: dict) -> PieceAbalone:
+        return self
+
+    def __reduce__(self):
+        # Unpickled pieces are the shared instances of their process.
+        return (get_piece, (self.piece_type, self.owner_id))
+
+    def to_json(self) -> dict:
+        return {"piece_type": self.piece_type, "owner_id": self.owner_id}
+
+
+_PIECES: Dict[Tuple[str, int], PieceAbalone] = {}
+
+
+def get_piece(piece_type: str, owner_id: int) -> PieceAbalone:
+    """
+    Return the shared piece of a piece type and an owner, creating it on first use.
+
+    Args:
+        piece_type (str): type of the piece
+        owner_id (int): ID of the player who possesses the piece
+
+    Returns:
+        PieceAbalone: the piece
+    """
+    piece = _PIECES.get((piece_type, owner_id))
+    if piece is None:
+        piece = _PIECES[(piece_type, owner_id)] = PieceAbalone(piece_type, owner_id)
+    return piece
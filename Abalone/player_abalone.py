@@ -8,6 +8,7 @@ from board_abalone import BoardAbalone
 from seahorse.game.action import Action
 from seahorse.game.game_layout.board import Piece
 from seahorse.player.player import Player
+from seahorse.utils.custom_exceptions import TimerNotInitializedError
 from seahorse.utils.serializer import Serializable
 
 if TYPE_CHECKING:
@@ -32,6 +33,7 @@ class PlayerAbalone(Player):
         """
         super().__init__(name,*args,**kwargs)
         self.piece_type = piece_type
+        self._time_limit = self.get_time_limit()
 
     def get_piece_type(self) -> str:
         """
@@ -42,8 +44,35 @@ class PlayerAbalone(Player):
         """
         return self.piece_type
 
+    def get_time_credit(self, time_used: float) -> float:
+        """
+        Gets the time left to the player. The timer only runs when the master is in the same
+        process, and a remote master gives the player a new id, under which it has no timer:
+        the time counted by the player is used then.
+
+        Args:
+            time_used (float): time spent by the player in compute_action, counted by itself, in (s)
+
+        Returns:
+            float: the remaining time in (s)
+        """
+        try:
+            return min(self.get_remaining_time(), self._time_limit - time_used)
+        except TimerNotInitializedError:
+            return self._time_limit - time_used
+
+    def enable_pondering(self) -> bool:
+        """
+        Let the player search on the opponent's time, between its moves.
+        Only for the modes where the opponent does not share the process.
+
+        Returns:
+            bool: True if the player can ponder, False otherwise
+        """
+        return False
+
     def to_json(self) -> str:
-        return {i:j for i,j in self.__dict__.items() if i!="timer"}
+        return {i:j for i,j in self.__dict__.items() if i!="timer" and not i.startswith("_")}
 
     @classmethod
     def from_json(cls, data) -> Serializable:
@@ -0,0 +1,150 @@
+import threading
+import time
+from typing import Optional
+
+from move_abalone import MoveAbalone
+from search_abalone import AlphaBetaSearch, SearchResult
+from search_state_abalone import SearchStateAbalone
+
+# Time allowed to a ponder search, in budgets of a move: it stops by itself
+# when no move of the player comes to end it, as after the last move of a game.
+PONDER_FACTOR = 2.0
+
+
+class Ponderer:
+    """
+    Search on the opponent's time: after a move of the player, the position
+    reached by the reply expected from the opponent is searched in a background
+    thread, with the search and the transposition table of the player.
+
+    When the opponent plays the expected reply (a ponder hit), the search goes on
+    until it has run for the budget of the move, counting the time it ran while the
+    opponent was thinking, so its move is usually ready at once. Otherwise (a ponder
+    miss), the search is cancelled and its entries stay in the table.
+
+    Only one search runs at a time: finish must be called before the search is used again.
+
+    Attributes:
+        search (AlphaBetaSearch): The search of the player. The ponder search runs in this process only.
+        hits (int): Number of ponder hits.
+        misses (int): Number of ponder misses.
+    """
+
+    def __init__(self, search: AlphaBetaSearch) -> None:
+        self.search = search
+        self.hits = 0
+        self.misses = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._position: Optional[SearchStateAbalone] = None
+        self._start = 0.0
+        self._result: Optional[SearchResult] = None
+
+    def is_pondering(self) -> bool:
+        """
+        Returns:
+            bool: True while a ponder search runs or waits for finish
+        """
+        return self._thread is not None
+
+    def predict(self, state: SearchStateAbalone) -> Optional[MoveAbalone]:
+        """
+        Args:
+            state (SearchStateAbalone): position after a move of the player
+
+        Returns:
+            Optional[MoveAbalone]: the best move of the opponent stored in the transposition table, None if there is none
+        """
+        entry = self.search.tt.probe(state.key)
+        if entry is None or entry[3] < 0:
+            return None
+        for move in state.generate_moves():
+            if move.encode() == entry[3]:
+                return move
+        return None
+
+    def start(self, state: SearchStateAbalone, time_budget: float, max_depth: Optional[int] = None) -> bool:
+        """
+        Start searching the position expected after the reply of the opponent.
+
+        Args:
+            state (SearchStateAbalone): position after the move of the player, left untouched
+            time_budget (float): time allowed to the search of the next move in (s)
+            max_depth (int, optional): depth at which the search stops
+
+        Returns:
+            bool: True if a search was started, False when the game ends or no reply is expected
+        """
+        self.cancel()
+        if state.is_done():
+            return False
+        reply = self.predict(state)
+        if reply is None:
+            return False
+        position = state.copy()
+        position.make_move(reply)
+        if position.is_done():
+            return False
+        self._position = position
+        self._result = None
+        self._stop_event.clear()
+        self.search.stop_event = self._stop_event
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(position.copy(), PONDER_FACTOR * time_budget, max_depth),
+            name="ponder",
+            daemon=True,
+        )
+        self._thread.start()
+        return True
+
+    def _run(self, position: SearchStateAbalone, time_budget: float, max_depth: Optional[int]) -> None:
+        # AlphaBetaSearch.search explicitly: the helpers of a ParallelSearch
+        # could not be stopped early on a ponder hit.
+        self._result = AlphaBetaSearch.search(self.search, position, time_budget, max_depth)
+
+    def finish(self, state: SearchStateAbalone, time_budget: float) -> Optional[SearchResult]:
+        """
+        End the ponder search once the opponent has played.
+
+        Args:
+            state (SearchStateAbalone): the current position, the player to move
+            time_budget (float): time allowed to the move in (s), the time pondered included
+
+        Returns:
+            Optional[SearchResult]: the result of the ponder search on a ponder hit, None on a miss or when not pondering
+        """
+        if self._thread is None:
+            return None
+        position = self._position
+        if state.key != position.key or state.step != position.step:
+            self.cancel()
+            self.misses += 1
+            return None
+        deadline = self._start + time_budget
+        while self._thread.is_alive():
+            # The search sets its deadline when it starts: it is lowered until the thread ends.
+            self.search.deadline = min(self.search.deadline, deadline)
+            self._thread.join(0.01)
+        self._stop()
+        if self._result is None or self._result.depth == 0:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._result
+
+    def cancel(self) -> None:
+        """
+        Stop the ponder search, if any, and wait for its thread.
+        """
+        if self._thread is None:
+            return
+        self._stop_event.set()
+        self._thread.join()
+        self._stop()
+
+    def _stop(self) -> None:
+        self._thread = None
+        self._position = None
+        self.search.stop_event = None
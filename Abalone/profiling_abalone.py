@@ -0,0 +1,236 @@
+import functools
+import inspect
+import json
+import time
+from typing import Callable, Dict, List, Optional
+
+from game_state_abalone import GameStateAbalone
+from seahorse.player.player import Player
+
+# Methods of GameStateAbalone timed by Profiler.install.
+GAME_STATE_METHODS = (
+    "generator",
+    "detect_conflict",
+    "generate_possible_actions",
+    "convert_light_action_to_action",
+    "compute_scores",
+)
+
+
+class FunctionStats:
+    """
+    Counters of an instrumented function.
+
+    Attributes:
+        calls (int): Number of calls.
+        total_ns (int): Time spent in the function and in the functions it called, in (ns).
+        self_ns (int): Time spent in the function itself, in (ns).
+    """
+
+    __slots__ = ("calls", "total_ns", "self_ns")
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.total_ns = 0
+        self.self_ns = 0
+
+    def to_json(self) -> dict:
+        return {"calls": self.calls, "total": self.total_ns / 1e9, "self": self.self_ns / 1e9}
+
+
+class Profiler:
+    """
+    Opt-in instrumentation of the hot paths of a game: the methods of
+    GAME_STATE_METHODS and the compute_action of the players.
+
+    Nothing is instrumented until install is called: the methods are then
+    replaced by timed wrappers, and restored by uninstall, so a game played
+    without the profiler runs the original methods.
+
+    The counters are kept for the whole game, and for each move between two
+    calls to end_move. The time of each chain of instrumented calls is also
+    kept, for the collapsed stack format of flame graph tools.
+
+    Attributes:
+        functions (Dict[str, FunctionStats]): Counters of the game, by function.
+        moves (List[dict]): Counters of each finished move.
+        stacks (Dict[str, int]): Self time of each chain of calls, as "outer;inner", in (ns).
+        auto_moves (bool): If True, a move ends with each compute_action, when no master calls end_move.
+    """
+
+    def __init__(self, auto_moves: bool = False) -> None:
+        self.functions: Dict[str, FunctionStats] = {}
+        self.moves: List[dict] = []
+        self.stacks: Dict[str, int] = {}
+        self.auto_moves = auto_moves
+        self._move: Dict[str, FunctionStats] = {}
+        self._move_start = time.perf_counter_ns()
+        # Active frames: [name, start, time of the children]
+        self._frames: List[list] = []
+        self._patched: List[tuple] = []
+
+    def _enter(self, name: str, first: bool = True) -> None:
+        if first:
+            for table in (self.functions, self._move):
+                stats = table.get(name)
+                if stats is None:
+                    stats = table[name] = FunctionStats()
+                stats.calls += 1
+        self._frames.append([name, time.perf_counter_ns(), 0])
+
+    def _exit(self) -> None:
+        name, start, children = self._frames.pop()
+        elapsed = time.perf_counter_ns() - start
+        own = elapsed - children
+        for table in (self.functions, self._move):
+            stats = table.get(name)
+            if stats is None:
+                stats = table[name] = FunctionStats()
+            stats.total_ns += elapsed
+            stats.self_ns += own
+        if self._frames:
+            self._frames[-1][2] += elapsed
+        stack = ";".join([frame[0] for frame in self._frames] + [name])
+        self.stacks[stack] = self.stacks.get(stack, 0) + own
+
+    def wrap(self, fn: Callable, label: Callable[[object], str]) -> Callable:
+        """
+        Build the timed wrapper of a function. A generator function is timed at each resume.
+
+        Args:
+            fn (Callable): the function to wrap, whose first argument is self
+            label (Callable[[object], str]): gives the name of a call from self
+
+        Returns:
+            Callable: the wrapper
+        """
+        profiler = self
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def generator_wrapper(obj, *args, **kwargs):
+                name = label(obj)
+                it = fn(obj, *args, **kwargs)
+                first = True
+                while True:
+                    profiler._enter(name, first)
+                    first = False
+                    try:
+                        item = next(it)
+                    except StopIteration:
+                        return
+                    finally:
+                        profiler._exit()
+                    yield item
+            return generator_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(obj, *args, **kwargs):
+            profiler._enter(label(obj))
+            try:
+                return fn(obj, *args, **kwargs)
+            finally:
+                profiler._exit()
+        return wrapper
+
+    def _patch(self, cls: type, attr: str, label: Callable[[object], str]) -> None:
+        original = cls.__dict__.get(attr)
+        if original is None or getattr(original, "__profiler__", None) is self:
+            return
+        wrapper = self.wrap(original, label)
+        wrapper.__profiler__ = self
+        setattr(cls, attr, wrapper)
+        self._patched.append((cls, attr, original))
+
+    def install(self, players: Optional[List[Player]] = None) -> None:
+        """
+        Instrument the methods of GAME_STATE_METHODS and the compute_action of the players.
+
+        Args:
+            players (List[Player], optional): players, or proxies of players, whose compute_action is timed
+        """
+        for attr in GAME_STATE_METHODS:
+            self._patch(GameStateAbalone, attr, lambda _, attr=attr: attr)
+        for player in players or []:
+            # The proxies forward compute_action to the player they wrap.
+            target = getattr(player, "wrapped_player", player)
+            cls = next((c for c in type(target).__mro__ if "compute_action" in c.__dict__), None)
+            if cls is not None:
+                self._patch(cls, "compute_action", self._compute_action_label)
+        if self.auto_moves:
+            for cls, attr, _ in self._patched:
+                if attr == "compute_action":
+                    setattr(cls, attr, self._ending_move(getattr(cls, attr)))
+
+    @staticmethod
+    def _compute_action_label(player: Player) -> str:
+        return f"compute_action[{player.get_name()}]"
+
+    def _ending_move(self, wrapper: Callable) -> Callable:
+        profiler = self
+
+        @functools.wraps(wrapper)
+        def ending_wrapper(player, *args, **kwargs):
+            try:
+                return wrapper(player, *args, **kwargs)
+            finally:
+                profiler.end_move(player=player.get_name())
+        ending_wrapper.__profiler__ = self
+        return ending_wrapper
+
+    def uninstall(self) -> None:
+        """
+        Restore the original methods.
+        """
+        for cls, attr, original in reversed(self._patched):
+            setattr(cls, attr, original)
+        self._patched.clear()
+
+    def end_move(self, step: Optional[int] = None, player: Optional[str] = None) -> None:
+        """
+        Close the counters of the current move.
+
+        Args:
+            step (int, optional): step of the state the move was played from
+            player (str, optional): name of the player who played it
+        """
+        now = time.perf_counter_ns()
+        self.moves.append({
+            "step": step,
+            "player": player,
+            "duration": (now - self._move_start) / 1e9,
+            "functions": {name: stats.to_json() for name, stats in self._move.items()},
+        })
+        self._move = {}
+        self._move_start = now
+
+    def to_json(self) -> dict:
+        return {
+            "functions": {name: stats.to_json() for name, stats in self.functions.items()},
+            "moves": self.moves,
+        }
+
+    def to_collapsed(self) -> str:
+        """
+        Returns:
+            str: the self time of each chain of calls in (us), one "outer;inner time" line each, as read by flamegraph.pl or speedscope
+        """
+        return "".join(f"{stack} {ns // 1000}\n" for stack, ns in sorted(self.stacks.items()) if ns >= 1000)
+
+    def dump(self, path: str) -> None:
+        """
+        Write the counters: as JSON if path ends with ".json", as collapsed stacks otherwise.
+
+        Args:
+            path (str): path of the file
+        """
+        with open(path, "w") as f:
+            if path.endswith(".json"):
+                json.dump(self.to_json(), f, indent=2)
+            else:
+                f.write(self.to_collapsed())
+
+    def __enter__(self) -> "Profiler":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.uninstall()
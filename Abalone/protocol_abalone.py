@@ -0,0 +1,163 @@
+import json
+from typing import Dict, Optional
+
+from loguru import logger
+from game_state_abalone import GameStateAbalone
+from move_abalone import MoveAbalone
+from search_state_abalone import SearchStateAbalone
+from seahorse.game.action import Action
+from seahorse.game.io_stream import EventMaster
+from seahorse.player.player import Player
+from seahorse.player.proxies import LocalPlayerProxy, RemotePlayerProxy
+
+# Events of the move-only protocol. The master sends the full state (binary
+# encoding of GameStateAbalone.to_bytes) on the first turn and after a desync,
+# only the last move of the opponent otherwise; the remote player answers with its move.
+STATE_EVENT = "turn_state"
+MOVE_EVENT = "turn_move"
+ANSWER_EVENT = "move"
+
+
+def find_move(before: GameStateAbalone, after: GameStateAbalone) -> Optional[MoveAbalone]:
+    """
+    Find the move leading from a state to the next one.
+
+    Args:
+        before (GameStateAbalone): a state
+        after (GameStateAbalone): a state following it
+
+    Returns:
+        Optional[MoveAbalone]: the move played, None if after does not follow before
+    """
+    if after.step != before.step + 1:
+        return None
+    return SearchStateAbalone.from_game_state(before).find_move(after.get_rep().to_bitboard(before.players).masks)
+
+
+def encode_turn(move: Optional[MoveAbalone], state: GameStateAbalone) -> str:
+    """
+    Args:
+        move (MoveAbalone, optional): move leading to the state, None if there is none
+        state (GameStateAbalone): state reached by the move
+
+    Returns:
+        str: the message of the move, with the key and step of the state for the sync check
+    """
+    return json.dumps({
+        "move": move.to_light_action() if move is not None else None,
+        "key": state.get_zobrist_key(),
+        "step": state.step,
+    })
+
+
+def apply_turn(state: GameStateAbalone, turn: Dict) -> Optional[GameStateAbalone]:
+    """
+    Apply the move of a message to a local copy of the state.
+
+    Args:
+        state (GameStateAbalone): the local copy
+        turn (Dict): the decoded message
+
+    Returns:
+        Optional[GameStateAbalone]: the state reached, None if it does not match the key and step of the message
+    """
+    if turn["move"] is not None:
+        action = state.convert_light_action_to_action(turn["move"])
+        if action is None:
+            return None
+        state = action.get_next_game_state()
+    if state.get_zobrist_key() != turn["key"] or state.step != turn["step"]:
+        return None
+    return state
+
+
+class MoveRemotePlayerProxy(RemotePlayerProxy):
+    """
+    Master side of the move-only protocol: the remote player receives the
+    opponent's moves and answers with its own, each side applying them to its
+    own copy of the state. The full state is sent only when the copies differ.
+
+    Both sides must use the protocol, see MoveLocalPlayerProxy.
+    """
+
+    def __init__(self, mimics: type[Player], *args, **kwargs) -> None:
+        super().__init__(mimics, *args, **kwargs)
+        # State of the remote copy after its last move, None when it must be sent in full.
+        self._remote_state: Optional[GameStateAbalone] = None
+
+    async def play(self, current_state: GameStateAbalone) -> Action:
+        master = EventMaster.get_instance()
+        move = find_move(self._remote_state, current_state) if self._remote_state is not None else None
+        if move is None:
+            await master.sio.emit(STATE_EVENT, current_state.to_bytes(), to=self.sid)
+        else:
+            await master.sio.emit(MOVE_EVENT, encode_turn(move, current_state), to=self.sid)
+        while True:
+            answer = json.loads(await master.wait_for_event(self.sid, ANSWER_EVENT))
+            if not answer.get("resync"):
+                break
+            logger.warning(f"{self.name} is out of sync, sending the full state")
+            await master.sio.emit(STATE_EVENT, current_state.to_bytes(), to=self.sid)
+
+        if answer["move"] is None:
+            self._remote_state = None
+            return None
+        action = current_state.convert_light_action_to_action(answer["move"])
+        if action is None:
+            self._remote_state = None
+            return None
+        next_state = action.get_next_game_state()
+        if next_state.get_zobrist_key() != answer["key"]:
+            logger.warning(f"{self.name} reached another position than the master, the full state will be sent")
+            self._remote_state = None
+        else:
+            self._remote_state = next_state
+        return action
+
+
+class MoveLocalPlayerProxy(LocalPlayerProxy):
+    """
+    Remote side of the move-only protocol: keeps a copy of the state, applies
+    the opponent's moves to it and checks it against the key of the master,
+    asking for the full state when they differ.
+    """
+
+    def __init__(self, wrapped_player: Player, gs: type = GameStateAbalone) -> None:
+        super().__init__(wrapped_player, gs=gs)
+        self._state: Optional[GameStateAbalone] = None
+
+        @self.sio.on(STATE_EVENT)
+        async def handle_state(data):
+            logger.info(f"{self.wrapped_player.name} is playing")
+            await self.play_turn(gs.from_bytes(data, next_player=self))
+
+        @self.sio.on(MOVE_EVENT)
+        async def handle_move(data):
+            turn = json.loads(data)
+            state = apply_turn(self._state, turn) if self._state is not None else None
+            if state is None:
+                logger.warning(f"{self.wrapped_player.name} is out of sync, asking for the full state")
+                await self.sio.emit(ANSWER_EVENT, json.dumps({"resync": True}))
+                return
+            logger.info(f"{self.wrapped_player.name} is playing")
+            await self.play_turn(state)
+
+    async def play_turn(self, current_state: GameStateAbalone) -> Action:
+        """
+        Compute the action of the wrapped player and send its move.
+
+        Args:
+            current_state (GameStateAbalone): the current state, whose next player is this proxy
+
+        Returns:
+            Action: the action of the wrapped player
+        """
+        action = self.compute_action(current_state=current_state)
+        next_state = action.get_next_game_state()
+        move = find_move(current_state, next_state)
+        if move is None:
+            logger.warning(f"{self.wrapped_player.name} played an action which is not a move")
+        self._state = next_state if move is not None else None
+        await self.sio.emit(ANSWER_EVENT, encode_turn(move, next_state))
+        logger.info(f"{self.wrapped_player} played the following action : \n{action}")
+        return action
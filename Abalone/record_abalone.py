@@ -0,0 +1,419 @@
+import argparse
+import builtins
+import json
+import os
+import random
+import struct
+import time
+import zlib
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+from binary_abalone import pack_string, unpack_string
+from geometry_abalone import CELL_INDEX
+from layouts_abalone import LAYOUTS, build_initial_state
+from move_abalone import MoveAbalone
+from game_state_abalone import GameStateAbalone
+from player_abalone import PlayerAbalone
+from search_state_abalone import SearchStateAbalone
+from seahorse.game.io_stream import EventSlave
+
+# A record file is a header followed by zlib-compressed blocks, each holding
+# whole games. Blocks are only appended: a file cut by a crash loses its last block at most.
+MAGIC = b"ABRC"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sH")
+# compressed size, raw size
+BLOCK_HEADER = struct.Struct("<II")
+# Games are buffered until the block holds BLOCK_SIZE bytes.
+BLOCK_SIZE = 1 << 16
+DEFAULT_RECORD_PATH = "games.abr"
+
+# Records of a block: a game starts with its layout and its players (piece type
+# and name strings), then one record per move (code of MoveAbalone.encode, duration in (s)),
+# and ends with the reason of the end of the game.
+GAME_START = 1
+GAME_MOVE = 2
+GAME_END = 3
+START_RECORD = struct.Struct("<BB")
+MOVE_RECORD = struct.Struct("<BHf")
+END_RECORD = struct.Struct("<BB")
+LAYOUT_NAMES = list(LAYOUTS)
+# Reasons of the end of a game, None for a game played to its end.
+ERRORS = [None, "timeout", "illegal_action", "fault"]
+
+
+class RecordedGame(NamedTuple):
+    """
+    A game read from a record file.
+
+    Attributes:
+        config (str): starting layout
+        players (List[Tuple[str, str]]): piece type and name of each player, in the playing order
+        moves (List[MoveAbalone]): moves of the game
+        durations (List[float]): duration of each move in (s)
+        error (str, optional): "timeout", "illegal_action" or "fault" when a player lost by fault
+    """
+
+    config: str
+    players: List[Tuple[str, str]]
+    moves: List[MoveAbalone]
+    durations: List[float]
+    error: Optional[str]
+
+    def replay(self) -> Iterator[GameStateAbalone]:
+        """
+        Rebuild the states of the game, one at a time.
+
+        Yields:
+            GameStateAbalone: the initial state, then the state after each move
+        """
+        players = [PlayerAbalone(piece_type, name=name) for piece_type, name in self.players]
+        state = build_initial_state(players[0], players[1], self.config)
+        yield state
+        for move in self.moves:
+            state = state.apply_move(move)
+            yield state
+
+    def get_final_state(self) -> GameStateAbalone:
+        state = None
+        for state in self.replay():
+            pass
+        return state
+
+
+class GameRecordWriter:
+    """
+    Appends games to a record file.
+
+    Attributes:
+        path (str): Path of the record file.
+        n_games (int): Number of games written by this writer.
+        in_game (bool): True between begin_game and end_game.
+    """
+
+    def __init__(self, path: str = DEFAULT_RECORD_PATH, block_size: int = BLOCK_SIZE) -> None:
+        """
+        Args:
+            path (str, optional): path of the record file, created if it does not exist
+            block_size (int, optional): size of the uncompressed blocks in bytes
+
+        Raises:
+            ValueError: if the file exists and is not a record file of the current version
+        """
+        self.path = path
+        self.block_size = block_size
+        self.n_games = 0
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            # A block cut by a crash is dropped, so that the new blocks follow a complete one.
+            end = _find_end(path)
+            self._file = open(path, "r+b")
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file = open(path, "wb")
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+            self._file.flush()
+        self._buffer = bytearray()
+        self._game: Optional[bytearray] = None
+
+    def begin_game(self, config: str, players: List[Tuple[str, str]]) -> None:
+        """
+        Args:
+            config (str): starting layout
+            players (List[Tuple[str, str]]): piece type and name of each player, in the playing order
+        """
+        self._game = bytearray(START_RECORD.pack(GAME_START, LAYOUT_NAMES.index(config)))
+        for piece_type, name in players:
+            self._game += pack_string(piece_type) + pack_string(name)
+
+    @property
+    def in_game(self) -> bool:
+        return self._game is not None
+
+    def abort_game(self) -> None:
+        """
+        Drop the current game.
+        """
+        self._game = None
+
+    def add_move(self, move: MoveAbalone, duration: float) -> None:
+        self._game += MOVE_RECORD.pack(GAME_MOVE, move.encode(), duration)
+
+    def end_game(self, error: Optional[str] = None) -> None:
+        """
+        Close the current game; it is written to the file with its block.
+
+        Args:
+            error (str, optional): reason of the end of the game when a player lost by fault
+        """
+        self._game += END_RECORD.pack(GAME_END, ERRORS.index(error))
+        self._buffer += self._game
+        self._game = None
+        self.n_games += 1
+        if len(self._buffer) >= self.block_size:
+            self.flush()
+
+    def write_game(self, config: str, players: List[Tuple[str, str]], moves: List[MoveAbalone], durations: List[float], error: Optional[str] = None) -> None:
+        self.begin_game(config, players)
+        for move, duration in zip(moves, durations):
+            self.add_move(move, duration)
+        self.end_game(error)
+
+    def flush(self) -> None:
+        """
+        Write the finished games as one compressed block.
+        """
+        if not self._buffer:
+            return
+        data = zlib.compress(bytes(self._buffer), 9)
+        self._file.write(BLOCK_HEADER.pack(len(data), len(self._buffer)) + data)
+        self._file.flush()
+        self._buffer.clear()
+
+    def close(self) -> None:
+        """
+        Write the finished games and close the file. A game begun and not ended is dropped.
+        """
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+
+    def __enter__(self) -> "GameRecordWriter":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+def _read_file_header(f: BinaryIO, path: str) -> None:
+    header = f.read(FILE_HEADER.size)
+    if len(header) < FILE_HEADER.size:
+        raise ValueError(f"{path} is not a game record file")
+    magic, version = FILE_HEADER.unpack(header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a game record file of version {VERSION}")
+
+
+def _find_end(path: str) -> int:
+    # Offset of the end of the last complete block.
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        _read_file_header(f, path)
+        end = FILE_HEADER.size
+        while end + BLOCK_HEADER.size <= size:
+            f.seek(end)
+            block_size, _ = BLOCK_HEADER.unpack(f.read(BLOCK_HEADER.size))
+            if end + BLOCK_HEADER.size + block_size > size:
+                break
+            end += BLOCK_HEADER.size + block_size
+    if end < size:
+        logger.warning(f"{path}: truncated block dropped")
+    return end
+
+
+def iter_blocks(path: str) -> Iterator[bytes]:
+    """
+    Read the blocks of a record file one at a time.
+
+    Args:
+        path (str): path of the record file
+
+    Raises:
+        ValueError: if the file is not a record file of the current version
+
+    Yields:
+        bytes: the uncompressed content of each block
+    """
+    with open(path, "rb") as f:
+        _read_file_header(f, path)
+        while True:
+            header = f.read(BLOCK_HEADER.size)
+            if not header:
+                return
+            if len(header) < BLOCK_HEADER.size:
+                logger.warning(f"{path}: truncated block ignored")
+                return
+            size, raw_size = BLOCK_HEADER.unpack(header)
+            data = f.read(size)
+            if len(data) < size:
+                logger.warning(f"{path}: truncated block ignored")
+                return
+            data = zlib.decompress(data)
+            if len(data) != raw_size:
+                raise ValueError(f"{path}: corrupted block")
+            yield data
+
+
+def iter_games(path: str) -> Iterator[RecordedGame]:
+    """
+    Read the games of a record file one at a time, without loading the whole file.
+
+    Args:
+        path (str): path of the record file
+
+    Raises:
+        ValueError: if the file is not a record file of the current version
+
+    Yields:
+        RecordedGame: each game of the file, in the order they were written
+    """
+    for data in iter_blocks(path):
+        offset = 0
+        while offset < len(data):
+            _, layout = START_RECORD.unpack_from(data, offset)
+            offset += START_RECORD.size
+            players = []
+            for _ in range(2):
+                piece_type, offset = unpack_string(data, offset)
+                name, offset = unpack_string(data, offset)
+                players.append((piece_type, name))
+            moves, durations = [], []
+            while data[offset] == GAME_MOVE:
+                _, code, duration = MOVE_RECORD.unpack_from(data, offset)
+                offset += MOVE_RECORD.size
+                moves.append(MoveAbalone.decode(code))
+                durations.append(duration)
+            _, error = END_RECORD.unpack_from(data, offset)
+            offset += END_RECORD.size
+            yield RecordedGame(LAYOUT_NAMES[layout], players, moves, durations, ERRORS[error])
+
+
+def _cell_index(pos: str) -> int:
+    # Index of a position sent as str((i, j)).
+    i, j = (int(x) for x in pos.strip("()").split(","))
+    return CELL_INDEX[(i, j)]
+
+
+class GameRecorder(EventSlave):
+    """
+    An event slave that appends the games broadcast by the master to a record file,
+    in place of seahorse's StateRecorder.
+
+    The moves are recovered from the successive boards, full ("play") or as
+    changes ("play_delta"), their durations are the delays between the states received.
+    """
+
+    def __init__(self, path: str = DEFAULT_RECORD_PATH, config: str = "classic") -> None:
+        """
+        Args:
+            path (str, optional): path of the record file
+            config (str, optional): starting layout of the game
+        """
+        super().__init__()
+        self.identifier = "__REC__"+str(int(time.time()*1000000-random.randint(1,1000000)))
+        self.id = builtins.id(self)
+        self.wrapped_id = self.id
+        self.sid = None
+        self.config = config
+        self._writer = GameRecordWriter(path)
+        self._state: Optional[SearchStateAbalone] = None
+        self._masks: Dict[str, int] = {}
+        self._started = False
+        self._last_time = 0.0
+
+        self.activate(self.identifier)
+
+        @self.sio.on("play")
+        def record_play(data):
+            self.record_state(json.loads(data))
+
+        @self.sio.on("play_delta")
+        def record_play_delta(data):
+            self.record_delta(json.loads(data))
+
+        @self.sio.on("done")
+        def record_done(data):
+            self.end_game()
+
+        @self.sio.event()
+        def disconnect():
+            self.end_game()
+            self._writer.close()
+
+    def record_state(self, data: dict) -> None:
+        """
+        Record the move leading to a state broadcast by the master.
+
+        Args:
+            data (dict): the decoded state
+        """
+        now = time.perf_counter()
+        self._masks = {}
+        for pos, piece in data["rep"]["env"].items():
+            self._masks[piece["piece_type"]] = self._masks.get(piece["piece_type"], 0) | 1 << _cell_index(pos)
+        if not self._started:
+            self._started = True
+            players = []
+            for player in data["players"]:
+                if isinstance(player, dict):
+                    players.append((player["piece_type"], player["name"]))
+                else:
+                    # A remote player is only sent as its id.
+                    owner_types = {piece["owner_id"]: piece["piece_type"] for piece in data["rep"]["env"].values()}
+                    piece_type = owner_types[int(player)]
+                    players.append((piece_type, piece_type))
+            initial = build_initial_state(PlayerAbalone(players[0][0]), PlayerAbalone(players[1][0]), self.config)
+            self._state = SearchStateAbalone.from_game_state(initial)
+            self._writer.begin_game(self.config, players)
+            self._last_time = now
+            return
+        self._record_move(now)
+
+    def record_delta(self, data: dict) -> None:
+        """
+        Record the move leading to the changes of the board broadcast by the master.
+
+        Args:
+            data (dict): the decoded changes, see GameStateAbalone.to_delta_json
+        """
+        if self._state is None:
+            return
+        for pos, piece_type in data["changes"].items():
+            bit = 1 << _cell_index(pos)
+            for key in self._masks:
+                self._masks[key] &= ~bit
+            if piece_type is not None:
+                self._masks[piece_type] = self._masks.get(piece_type, 0) | bit
+        self._record_move(time.perf_counter())
+
+    def _record_move(self, now: float) -> None:
+        if self._state is None:
+            return
+        move = self._state.find_move([self._masks.get(piece_type, 0) for piece_type in self._state.piece_types])
+        if move is None:
+            logger.warning("Recorder: the state received does not follow the previous one, the game is not recorded")
+            self._state = None
+            self._writer.abort_game()
+            return
+        self._state.make_move(move)
+        self._writer.add_move(move, now - self._last_time)
+        self._last_time = now
+
+    def end_game(self) -> None:
+        if self._state is None or not self._writer.in_game:
+            return
+        self._writer.end_game(None if self._state.is_done() else "fault")
+        self._writer.flush()
+        self._state = None
+
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(prog="record_abalone.py", description="Prints a summary of each game of a record file as a json line.")
+    parser.add_argument("path", help="Path of the record file.")
+    parser.add_argument("-s","--scores",action="store_true",default=False, help="Replays each game to print its final scores.")
+    args=parser.parse_args()
+
+    for game in iter_games(args.path):
+        summary = {
+            "config": game.config,
+            "players": [name for _, name in game.players],
+            "steps": len(game.moves),
+            "duration": sum(game.durations),
+            "error": game.error,
+        }
+        if args.scores:
+            state = game.get_final_state()
+            summary["scores"] = {p.get_name(): state.get_scores()[p.get_id()] for p in state.get_players()}
+        print(json.dumps(summary))
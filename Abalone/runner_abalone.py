@@ -0,0 +1,197 @@
+import argparse
+import itertools
+import json
+import sys
+import time
+from os.path import basename, dirname, splitext
+from typing import Dict, List, NamedTuple, Optional
+
+from game_state_abalone import GameStateAbalone
+from layouts_abalone import LAYOUTS, build_initial_state
+from player_abalone import PlayerAbalone
+from record_abalone import GameRecordWriter
+from search_state_abalone import SearchStateAbalone
+from seahorse.utils.custom_exceptions import SeahorseTimeoutError
+
+
+class MoveRecord(NamedTuple):
+    """
+    Timing of one move of a game.
+
+    Attributes:
+        step (int): step of the state the move was played from
+        player (str): name of the player
+        duration (float): time spent in compute_action in (s)
+        remaining_time (float): time credit of the player after the move in (s)
+    """
+
+    step: int
+    player: str
+    duration: float
+    remaining_time: float
+
+
+# Ids of the players loaded by this process. The timers of seahorse are kept by player id, and
+# the default id, the address of the player, is reused once a player of a previous game is freed.
+_PLAYER_IDS = itertools.count(1)
+
+
+class GameResult(NamedTuple):
+    """
+    The outcome of a game played by run_game.
+
+    Attributes:
+        config (str): starting layout
+        players (List[str]): names of the players, in the playing order
+        scores (Dict[str, float]): final score of each player
+        winners (List[str]): names of the winners, both players for a draw
+        steps (int): number of moves played
+        duration (float): duration of the game in (s)
+        moves (List[MoveRecord]): timing of each move
+        error (str, optional): "timeout" or "illegal_action" when a player lost by fault
+        final_state (GameStateAbalone): last state of the game
+    """
+
+    config: str
+    players: List[str]
+    scores: Dict[str, float]
+    winners: List[str]
+    steps: int
+    duration: float
+    moves: List[MoveRecord]
+    error: Optional[str]
+    final_state: GameStateAbalone
+
+    def get_move_times(self, player: str) -> List[float]:
+        """
+        Args:
+            player (str): name of a player
+
+        Returns:
+            List[float]: duration of each move of the player in (s)
+        """
+        return [m.duration for m in self.moves if m.player == player]
+
+    def to_json(self) -> dict:
+        return {
+            "config": self.config,
+            "players": self.players,
+            "scores": self.scores,
+            "winners": self.winners,
+            "steps": self.steps,
+            "duration": self.duration,
+            "moves": [m._asdict() for m in self.moves],
+            "error": self.error,
+        }
+
+
+def load_player(path: str, piece_type: str, name: Optional[str] = None, time_limit: float = 60*15) -> PlayerAbalone:
+    """
+    Instantiate the MyPlayer class of a player module, as main_abalone.py does,
+    with an id unique in the process and a new time credit.
+
+    Args:
+        path (str): path to the module of the player
+        piece_type (str): piece type of the player
+        name (str, optional): name of the player, the name of the module by default
+        time_limit (float, optional): the time limit in (s)
+
+    Returns:
+        PlayerAbalone: the player
+    """
+    folder = dirname(path)
+    if folder not in sys.path:
+        sys.path.append(folder)
+    player_class = __import__(splitext(basename(path))[0], fromlist=[None])
+    name = name if name is not None else splitext(basename(path))[0]
+    player = player_class.MyPlayer(piece_type, name=name, time_limit=time_limit)
+    player.id = next(_PLAYER_IDS)
+    player.init_timer(time_limit)
+    return player
+
+
+def run_game(player1: PlayerAbalone, player2: PlayerAbalone, config: str = "classic", check_actions: bool = True, writer: Optional[GameRecordWriter] = None) -> GameResult:
+    """
+    Play a game in the current process, without the master, its sockets or its event loop.
+
+    The rules are the ones of MasterAbalone: the game ends with GameStateAbalone.is_done,
+    the winners are given by GameStateAbalone.compute_winners, and a player whose time
+    credit expires or who plays an illegal action loses.
+
+    Args:
+        player1 (PlayerAbalone): first player
+        player2 (PlayerAbalone): second player
+        config (str, optional): starting layout, "classic" or "alien"
+        check_actions (bool, optional): check that every action is in the possible actions, as the master does
+        writer (GameRecordWriter, optional): if given, the game is appended to its record file
+
+    Returns:
+        GameResult: the outcome of the game
+    """
+    state = build_initial_state(player1, player2, config)
+    moves = []
+    played = []
+    error = None
+    start = time.perf_counter()
+    while not state.is_done():
+        player = state.get_next_player()
+        if check_actions:
+            possible_actions = state.get_possible_actions()
+        move_start = time.perf_counter()
+        player.start_timer()
+        try:
+            action = player.play(state)
+        except SeahorseTimeoutError:
+            action = None
+        remaining = player.stop_timer()
+        duration = time.perf_counter() - move_start
+        moves.append(MoveRecord(state.get_step(), player.get_name(), duration, remaining))
+        if action is None or remaining <= 0:
+            error = "timeout"
+        elif check_actions and action not in possible_actions:
+            error = "illegal_action"
+        if error is not None:
+            scores = dict(state.get_scores())
+            scores.pop(player.get_id())
+            winners = state.compute_winners(scores)
+            break
+        action.past_gs = None
+        if writer is not None:
+            played.append(SearchStateAbalone.from_game_state(state).find_move(action.get_next_game_state().get_rep().to_bitboard(state.players).masks))
+        state = action.get_next_game_state()
+    else:
+        winners = state.compute_winners()
+
+    names = {p.get_id(): p.get_name() for p in state.get_players()}
+    if writer is not None:
+        players = [(p.get_piece_type(), p.get_name()) for p in (player1, player2)]
+        writer.write_game(config, players, played, [m.duration for m in moves[: len(played)]], error)
+    return GameResult(
+        config=config,
+        players=[player1.get_name(), player2.get_name()],
+        scores={names[k]: v for k, v in state.get_scores().items()},
+        winners=[p.get_name() for p in winners],
+        steps=state.get_step(),
+        duration=time.perf_counter() - start,
+        moves=moves,
+        error=error,
+        final_state=state,
+    )
+
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(prog="runner_abalone.py", description="Plays a game headless and prints its result as json.")
+    parser.add_argument("-c","--config",required=False,choices=list(LAYOUTS), default="classic",help="Sets the starting board configuration.")
+    parser.add_argument("-t","--time-limit",required=False,type=float, default=15*60, help="Time credit of each player in (s).")
+    parser.add_argument("-r","--record",required=False,default=None, help="Appends the game to this record file.")
+    parser.add_argument("players_list",nargs=2, help='The players')
+    args=parser.parse_args()
+
+    player1 = load_player(args.players_list[0], "W", splitext(basename(args.players_list[0]))[0]+"_1", args.time_limit)
+    player2 = load_player(args.players_list[1], "B", splitext(basename(args.players_list[1]))[0]+"_2", args.time_limit)
+    if args.record is not None:
+        with GameRecordWriter(args.record) as writer:
+            result = run_game(player1, player2, args.config, writer=writer)
+    else:
+        result = run_game(player1, player2, args.config)
+    print(json.dumps(result.to_json(), indent=2))
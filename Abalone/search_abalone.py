@@ -0,0 +1,222 @@
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+from evaluation_abalone import WIN_SCORE, evaluate, final_score
+from move_abalone import MoveAbalone
+from move_ordering_abalone import MoveOrderer
+from search_state_abalone import SearchStateAbalone
+from transposition_table_abalone import BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, TranspositionTable
+
+INFINITY = 2 * WIN_SCORE
+ASPIRATION_WINDOW = 300
+# The clock is read once every CHECK_EVERY + 1 nodes.
+CHECK_EVERY = 1023
+# A new depth is not started once this share of the budget is spent:
+# it would most likely not finish.
+DEEPENING_SHARE = 0.4
+
+
+class SearchTimeoutError(Exception):
+    """
+    Raised inside the search when its deadline is reached.
+    """
+
+
+class SearchResult(NamedTuple):
+    """
+    The outcome of a search.
+
+    Attributes:
+        move (MoveAbalone): best move of the last completed depth
+        score (int): score of the move for the player to move
+        depth (int): last completed depth
+        nodes (int): number of nodes visited
+        elapsed (float): duration of the search in (s)
+    """
+
+    move: MoveAbalone
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+
+    def get_nps(self) -> float:
+        """
+        Returns:
+            float: number of nodes visited per second
+        """
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class AlphaBetaSearch:
+    """
+    Iterative-deepening negamax with alpha-beta pruning, aspiration windows, a transposition table
+    and killer/history move ordering.
+
+    The transposition table and the history tables are kept from one search to
+    the next, so the subtrees searched at the previous turn are not searched again.
+
+    Attributes:
+        tt (TranspositionTable): The transposition table. An entry searched down to max_step has the plies left as depth.
+        orderer (MoveOrderer): The move orderer.
+        nodes (int): Number of nodes visited by the current search.
+        deadline (float): Time at which the current search stops.
+        time_used (float): Total duration of the searches, in (s).
+        history (list[SearchResult]): Results of the previous searches.
+        stop_event (optional): Event stopping the search when set, as the deadline does.
+    """
+
+    def __init__(self, tt_size_mb: float = 64, tt: Optional[TranspositionTable] = None) -> None:
+        self.tt = tt if tt is not None else TranspositionTable(tt_size_mb)
+        self.orderer = MoveOrderer()
+        self.nodes = 0
+        self.deadline = float("inf")
+        self.time_used = 0.0
+        self.history: List[SearchResult] = []
+        self.stop_event = None
+
+    def search(self, state: SearchStateAbalone, time_budget: float, max_depth: Optional[int] = None, start_depth: int = 1) -> SearchResult:
+        """
+        Search the best move until the time budget is spent or the end of the game is reached.
+
+        Args:
+            state (SearchStateAbalone): position to search, left untouched
+            time_budget (float): time allowed in (s)
+            max_depth (int, optional): depth at which to stop. Defaults to the end of the game.
+            start_depth (int, optional): first depth of the iterative deepening. Defaults to 1.
+
+        Returns:
+            SearchResult: the result of the last completed depth
+        """
+        start = time.perf_counter()
+        self.deadline = start + time_budget
+        self.nodes = 0
+        self.tt.new_search()
+        self.orderer.new_search()
+        root = state.copy()
+        moves = root.generate_moves(self.orderer)
+        horizon = root.max_step - root.step
+        max_depth = horizon if max_depth is None else min(max_depth, horizon)
+        best = SearchResult(moves[0], 0, 0, 0, 0.0)
+        for depth in range(max(1, min(start_depth, max_depth)), max_depth + 1):
+            try:
+                score, move = self.search_depth(root, moves, depth, best.score)
+            except SearchTimeoutError:
+                break
+            best = SearchResult(move, score, depth, self.nodes, time.perf_counter() - start)
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= WIN_SCORE or best.elapsed > DEEPENING_SHARE * time_budget:
+                break
+        elapsed = time.perf_counter() - start
+        self.time_used += elapsed
+        best = best._replace(nodes=self.nodes, elapsed=elapsed)
+        self.history.append(best)
+        return best
+
+    def search_depth(self, root: SearchStateAbalone, moves: List[MoveAbalone], depth: int, guess: int) -> Tuple[int, MoveAbalone]:
+        """
+        Search the root moves to a fixed depth, in a window around the previous score.
+
+        Args:
+            root (SearchStateAbalone): position to search
+            moves (List[MoveAbalone]): moves of the position, best expected first
+            depth (int): depth of the search
+            guess (int): score expected, usually the one of the previous depth
+
+        Returns:
+            Tuple[int, MoveAbalone]: the score and the best move
+        """
+        if depth > 1:
+            alpha, beta = guess - ASPIRATION_WINDOW, guess + ASPIRATION_WINDOW
+            score, move = self.search_root(root, moves, depth, alpha, beta)
+            if alpha < score < beta:
+                return score, move
+        return self.search_root(root, moves, depth, -INFINITY, INFINITY)
+
+    def search_root(self, root: SearchStateAbalone, moves: List[MoveAbalone], depth: int, alpha: int, beta: int) -> Tuple[int, MoveAbalone]:
+        best_score = -INFINITY
+        best_move = moves[0]
+        for move in moves:
+            root.make_move(move)
+            score = -self.negamax(root, depth - 1, -beta, -alpha, 1)
+            root.unmake_move(move)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best_score, best_move
+
+    def is_stopped(self) -> bool:
+        """
+        Returns:
+            bool: True when the deadline is reached or the stop event is set
+        """
+        return time.perf_counter() > self.deadline or (self.stop_event is not None and self.stop_event.is_set())
+
+    def negamax(self, state: SearchStateAbalone, depth: int, alpha: int, beta: int, ply: int = 0) -> int:
+        """
+        Score a position with a fail-soft alpha-beta search.
+
+        Args:
+            state (SearchStateAbalone): position to search, restored on return
+            depth (int): remaining depth
+            alpha (int): lower bound of the window
+            beta (int): upper bound of the window
+            ply (int, optional): distance to the root
+
+        Returns:
+            int: the score of the position for the player to move
+        """
+        self.nodes += 1
+        if not self.nodes & CHECK_EVERY and self.is_stopped():
+            raise SearchTimeoutError()
+        if state.is_done():
+            return final_score(state)
+        if depth <= 0:
+            return evaluate(state)
+
+        key = state.key
+        # The key does not hold the step: an entry searched down to max_step only holds
+        # with as many plies left, and a depth-limited one where the game does not end sooner.
+        left = state.max_step - state.step
+        tt_move = -1
+        entry = self.tt.probe(key)
+        if entry is not None:
+            tt_depth, bound, score, tt_move, tt_end = entry
+            if (tt_depth == left if tt_end else depth <= tt_depth < left):
+                if bound == BOUND_EXACT:
+                    return score
+                if bound == BOUND_LOWER and score >= beta:
+                    return score
+                if bound == BOUND_UPPER and score <= alpha:
+                    return score
+
+        moves = state.generate_moves(self.orderer, ply, tt_move)
+        alpha_orig = alpha
+        best_score = -INFINITY
+        best_move = None
+        for index, move in enumerate(moves):
+            state.make_move(move)
+            score = -self.negamax(state, depth - 1, -beta, -alpha, ply + 1)
+            state.unmake_move(move)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.orderer.record_cutoff(move, state.side, ply, depth, index)
+                        break
+
+        if best_score <= alpha_orig:
+            bound = BOUND_UPPER
+        elif best_score >= beta:
+            bound = BOUND_LOWER
+        else:
+            bound = BOUND_EXACT
+        self.tt.store(key, min(depth, left), bound, best_score, best_move.encode(), depth >= left)
+        return best_score
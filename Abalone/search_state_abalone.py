@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from bitboard_abalone import BitBoardAbalone, iter_bits
+from game_state_abalone import GameStateAbalone
+from geometry_abalone import CENTRE_DISTANCE, EDGE_MASK, IS_EDGE, NEIGHBOUR_MASK, RAYS
+from move_abalone import MoveAbalone
+from move_ordering_abalone import MoveOrderer
+from seahorse.player.player import Player
+from zobrist_abalone import get_keys, mask_key
+
+
+class SearchStateAbalone:
+    """
+    A mutable Abalone state on which moves are made and unmade in place.
+
+    The board is kept as two occupancy masks, so a depth-first search can walk
+    the tree without copying anything.
+
+    Attributes:
+        masks (list[int]): Occupancy masks, one per player.
+        scores (list[int]): Scores, one per player.
+        side (int): Index of the player to move.
+        step (int): Current step of the game.
+        players (list[Player]): Players, in the order of the masks.
+        owner_ids (tuple[int]): Ids of the players, in the order of the masks.
+        piece_types (tuple[str]): Piece types of the players, in the order of the masks.
+        max_step (int): Number of steps after which the game ends.
+        max_score (int): Score at which the game ends.
+        key (int): Zobrist key of the state, updated incrementally.
+        counts (list[int]): Number of marbles, one per player.
+        centre (list[int]): Summed distance of the marbles to the centre, one per player.
+        edges (list[int]): Number of marbles on the edge ring, one per player.
+        pairs (list[int]): Number of pairs of neighbour marbles, one per player.
+
+    The key and the last four accumulators are updated by make_move and unmake_move
+    in proportion to the marbles moved, so the evaluation does not walk the board.
+    """
+
+    __slots__ = ("masks", "scores", "side", "step", "players", "owner_ids", "piece_types", "dimensions", "max_step", "max_score", "key", "zobrist", "counts", "centre", "edges", "pairs")
+
+    def __init__(self, bitboard: BitBoardAbalone, scores: List[int], side: int, step: int, players: List[Player], max_step: int = 50, max_score: int = -6) -> None:
+        self.masks = list(bitboard.masks)
+        self.owner_ids = bitboard.owner_ids
+        self.piece_types = bitboard.piece_types
+        self.dimensions = bitboard.dimensions
+        self.scores = list(scores)
+        self.side = side
+        self.step = step
+        self.players = players
+        self.max_step = max_step
+        self.max_score = max_score
+        self.zobrist = tuple(get_keys(piece_type) for piece_type in self.piece_types)
+        self.key = self.compute_key()
+        self.compute_accumulators()
+
+    @classmethod
+    def from_game_state(cls, state: GameStateAbalone) -> SearchStateAbalone:
+        """
+        Build the search state of a game state.
+
+        Args:
+            state (GameStateAbalone): the state to convert
+
+        Returns:
+            SearchStateAbalone: the equivalent search state
+        """
+        bitboard = state.get_rep().to_bitboard(state.players)
+        scores = [state.scores[pid] for pid in bitboard.owner_ids]
+        side = bitboard.owner_ids.index(state.next_player.get_id())
+        players = list(state.players)
+        players[side] = state.next_player
+        return cls(bitboard, scores, side, state.step, players, state.max_step, state.max_score)
+
+    def to_game_state(self) -> GameStateAbalone:
+        """
+        Build the GameStateAbalone of the current position.
+
+        Returns:
+            GameStateAbalone: the equivalent game state
+        """
+        return GameStateAbalone(
+            {self.owner_ids[p]: self.scores[p] for p in range(2)},
+            self.players[self.side],
+            self.players,
+            self.get_bitboard().to_board(),
+            step=self.step,
+        )
+
+    def get_bitboard(self) -> BitBoardAbalone:
+        """
+        Returns:
+            BitBoardAbalone: a copy of the current board
+        """
+        return BitBoardAbalone(self.masks, self.owner_ids, self.piece_types, self.dimensions)
+
+    def compute_key(self) -> int:
+        """
+        Compute from scratch the Zobrist key of the state, as GameStateAbalone.get_zobrist_key.
+
+        Returns:
+            int: the Zobrist key of the state
+        """
+        key = self.zobrist[self.side].to_move
+        for p in range(2):
+            key ^= mask_key(self.masks[p], self.zobrist[p].cells) ^ self.zobrist[p].score_key(self.scores[p])
+        return key
+
+    def compute_accumulators(self) -> None:
+        """
+        Compute from scratch the counts, centre distances, edge counts and pair counts of the players.
+        """
+        self.counts = [mask.bit_count() for mask in self.masks]
+        self.centre = [sum(CENTRE_DISTANCE[k] for k in iter_bits(mask)) for mask in self.masks]
+        self.edges = [(mask & EDGE_MASK).bit_count() for mask in self.masks]
+        self.pairs = [sum((mask & NEIGHBOUR_MASK[k]).bit_count() for k in iter_bits(mask)) // 2 for mask in self.masks]
+
+    def copy(self) -> SearchStateAbalone:
+        return SearchStateAbalone(self.get_bitboard(), self.scores, self.side, self.step, self.players, self.max_step, self.max_score)
+
+    def __reduce__(self):
+        # The players stay in their process: a search sent to another process does not need them.
+        return (SearchStateAbalone, (self.get_bitboard(), self.scores, self.side, self.step, [None, None], self.max_step, self.max_score))
+
+    def is_done(self) -> bool:
+        """
+        Check if the game is finished, with the rules of GameStateAbalone.is_done.
+
+        Returns:
+            bool: True if the game is finished, False otherwise.
+        """
+        return self.step == self.max_step or self.max_score in self.scores
+
+    def generate_moves(self, orderer: Optional[MoveOrderer] = None, ply: int = 0, tt_move: int = -1) -> List[MoveAbalone]:
+        """
+        Generate the possible moves of the player to move.
+
+        Args:
+            orderer (MoveOrderer, optional): if given, the moves are sorted by it, best expected first
+            ply (int, optional): distance to the root of the search, for the killer moves
+            tt_move (int, optional): code of the move to try first, -1 if none
+
+        Returns:
+            List[MoveAbalone]: the possible moves, the same as GameStateAbalone.generate_moves
+        """
+        own = self.masks[self.side]
+        opp = self.masks[1 - self.side]
+        moves = []
+        for origin in iter_bits(own):
+            for direction, ray in enumerate(RAYS[origin]):
+                my_count = 1
+                other_count = 0
+                ejection = True
+                for c in ray:
+                    bit = 1 << c
+                    if own & bit:
+                        if other_count or my_count == 3:
+                            my_count = 0
+                            break
+                        my_count += 1
+                    elif opp & bit:
+                        other_count += 1
+                        if other_count >= my_count:
+                            my_count = 0
+                            break
+                    else:
+                        ejection = False
+                        break
+                if my_count:
+                    moves.append(MoveAbalone(origin, direction, my_count, other_count, ejection))
+        if orderer is not None:
+            orderer.order(moves, self.side, ply, tt_move)
+        return moves
+
+    def make_move(self, move: MoveAbalone) -> MoveAbalone:
+        """
+        Play a move in place.
+
+        Args:
+            move (MoveAbalone): a move generated on the current position
+
+        Returns:
+            MoveAbalone: the token to give to unmake_move
+        """
+        self._toggle(move)
+        if move.ejection:
+            self._add_score(1 - self.side if move.n_pushed else self.side, -1)
+        self.key ^= self.zobrist[0].to_move ^ self.zobrist[1].to_move
+        self.side = 1 - self.side
+        self.step += 1
+        return move
+
+    def unmake_move(self, move: MoveAbalone) -> None:
+        """
+        Take back the last move played by make_move.
+
+        Args:
+            move (MoveAbalone): the token returned by make_move
+        """
+        self.step -= 1
+        self.side = 1 - self.side
+        self.key ^= self.zobrist[0].to_move ^ self.zobrist[1].to_move
+        if move.ejection:
+            self._add_score(1 - self.side if move.n_pushed else self.side, 1)
+        self._toggle(move)
+
+    def find_move(self, masks: List[int]) -> Optional[MoveAbalone]:
+        """
+        Find the move of the player to move leading to a board.
+
+        Args:
+            masks (list[int]): occupancy masks of the board reached, in the order of the masks of the state
+
+        Returns:
+            Optional[MoveAbalone]: the move, None if no move leads to this board
+        """
+        target = list(masks)
+        for move in self.generate_moves():
+            self.make_move(move)
+            found = self.masks == target
+            self.unmake_move(move)
+            if found:
+                return move
+        return None
+
+    def _add_score(self, p: int, delta: int) -> None:
+        keys = self.zobrist[p]
+        self.key ^= keys.score_key(self.scores[p]) ^ keys.score_key(self.scores[p] + delta)
+        self.scores[p] += delta
+
+    def _toggle(self, move: MoveAbalone) -> None:
+        # Shifting a line by one cell only changes its two ends, so moving and
+        # taking back a move are the same xor on the masks.
+        ray = RAYS[move.origin][move.direction]
+        n_moved = move.n_moved
+        head = ray[n_moved - 1] if n_moved <= len(ray) else -1
+        side = self.side
+        self._flip(side, move.origin)
+        if head >= 0:
+            self._flip(side, head)
+        if move.n_pushed:
+            self._flip(1 - side, head)
+            if not move.ejection:
+                self._flip(1 - side, ray[n_moved + move.n_pushed - 1])
+
+    def _flip(self, p: int, cell: int) -> None:
+        # Put a marble of player p on cell, or take it off, with the key and the accumulators.
+        bit = 1 << cell
+        mask = self.masks[p]
+        sign = -1 if mask & bit else 1
+        self.counts[p] += sign
+        self.centre[p] += sign * CENTRE_DISTANCE[cell]
+        if IS_EDGE[cell]:
+            self.edges[p] += sign
+        self.pairs[p] += sign * (mask & NEIGHBOUR_MASK[cell]).bit_count()
+        self.masks[p] = mask ^ bit
+        self.key ^= self.zobrist[p].cells[cell]
+
+    def __str__(self) -> str:
+        return self.get_bitboard().__str__()
+
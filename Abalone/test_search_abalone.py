@@ -0,0 +1,35 @@
+import random
+
+from perft_abalone import build_position
+from search_abalone import AlphaBetaSearch
+from search_state_abalone import SearchStateAbalone
+
+
+def random_positions(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    for _ in range(n):
+        state = SearchStateAbalone.from_game_state(build_position("classic-midgame"))
+        for _ in range(rng.randrange(1, 8)):
+            state.make_move(rng.choice(state.generate_moves()))
+        yield state
+
+
+def at_step(state: SearchStateAbalone, step: int) -> SearchStateAbalone:
+    # The Zobrist key does not hold the step: both copies share their table entries.
+    state = state.copy()
+    state.step = step
+    return state
+
+
+def test_table_entries_do_not_cross_game_end_horizons():
+    for state in random_positions(6):
+        late = at_step(state, state.max_step - 3)
+        early = at_step(state, 13)
+
+        search = AlphaBetaSearch(8)
+        late_score = search.search(late, 1e9).score
+        assert search.search(early, 1e9, 3).score == AlphaBetaSearch(8).search(early, 1e9, 3).score
+
+        search = AlphaBetaSearch(8)
+        search.search(early, 1e9, 3)
+        assert search.search(late, 1e9).score == late_score
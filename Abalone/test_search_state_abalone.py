@@ -0,0 +1,33 @@
+import random
+
+from perft_abalone import build_position
+from search_state_abalone import SearchStateAbalone
+
+
+def accumulators(state: SearchStateAbalone):
+    return state.counts, state.centre, state.edges, state.pairs
+
+
+def test_accumulators_match_a_recompute_after_make_and_unmake():
+    rng = random.Random(0)
+    for name in ("classic", "alien", "classic-ejection"):
+        root = SearchStateAbalone.from_game_state(build_position(name))
+        start = tuple(list(acc) for acc in accumulators(root))
+        for _ in range(20):
+            state = root
+            played = []
+            while len(played) < 30 and not state.is_done():
+                moves = state.generate_moves()
+                # Prefer pushes and ejections, the moves that flip marbles of both players.
+                pushes = [move for move in moves if move.n_pushed]
+                move = rng.choice(pushes if pushes and rng.random() < 0.5 else moves)
+                state.make_move(move)
+                played.append(move)
+                assert accumulators(state) == accumulators(state.copy())
+                assert state.counts == [mask.bit_count() for mask in state.masks]
+                if rng.random() < 0.2:
+                    state.unmake_move(played.pop())
+                    assert accumulators(state) == accumulators(state.copy())
+            for move in reversed(played):
+                state.unmake_move(move)
+            assert accumulators(root) == start
@@ -0,0 +1,237 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os.path import basename, splitext
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+from layouts_abalone import LAYOUTS
+from runner_abalone import load_player, run_game
+
+# Quantile of the normal distribution for the 95% confidence intervals.
+Z_95 = 1.96
+# Elo differences are capped for a perfect or null score.
+MAX_ELO = 1000
+
+
+class Match(NamedTuple):
+    """
+    A game to play.
+
+    Attributes:
+        index (int): index of the game in the schedule
+        white (str): path to the module of the first player
+        black (str): path to the module of the second player
+        white_name (str): name of the first player
+        black_name (str): name of the second player
+        config (str): starting layout
+        time_limit (float): time credit of each player in (s)
+    """
+
+    index: int
+    white: str
+    black: str
+    white_name: str
+    black_name: str
+    config: str
+    time_limit: float
+
+
+def elo_from_score(score: float) -> float:
+    """
+    Args:
+        score (float): expected score, in [0, 1]
+
+    Returns:
+        float: the Elo difference giving this expected score
+    """
+    if score <= 0:
+        return -MAX_ELO
+    if score >= 1:
+        return MAX_ELO
+    return max(-MAX_ELO, min(MAX_ELO, 400 * math.log10(score / (1 - score))))
+
+
+def elo_estimate(wins: int, draws: int, losses: int) -> Tuple[float, float, float]:
+    """
+    Estimate an Elo difference with a 95% confidence interval. The interval is a Wilson score
+    interval on the mean score, with the variance measured on the games so that draws narrow it,
+    and it stays meaningful for a perfect or null score.
+
+    Args:
+        wins (int): number of games won
+        draws (int): number of draws
+        losses (int): number of games lost
+
+    Returns:
+        Tuple[float, float, float]: the Elo difference and the bounds of its interval
+    """
+    n = wins + draws + losses
+    if n == 0:
+        return 0.0, -MAX_ELO, MAX_ELO
+    score = (wins + 0.5 * draws) / n
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / n
+    z2 = Z_95 ** 2
+    centre = (score + z2 / (2 * n)) / (1 + z2 / n)
+    margin = Z_95 * math.sqrt(variance / n + z2 / (4 * n * n)) / (1 + z2 / n)
+    return elo_from_score(score), elo_from_score(centre - margin), elo_from_score(centre + margin)
+
+
+def schedule(players: List[str], configs: List[str], n_games: int, time_limit: float) -> List[Match]:
+    """
+    Schedule n_games games per pair of players and per layout, the colours being swapped every game.
+
+    Args:
+        players (List[str]): paths to the modules of the players
+        configs (List[str]): starting layouts
+        n_games (int): number of games per pair of players and per layout
+        time_limit (float): time credit of each player in (s)
+
+    Returns:
+        List[Match]: the games to play
+    """
+    names = [splitext(basename(p))[0] for p in players]
+    names = [f"{name}_{k}" if names.count(name) > 1 else name for k, name in enumerate(names)]
+    matches = []
+    for (a, b), config in itertools.product(itertools.combinations(range(len(players)), 2), configs):
+        for g in range(n_games):
+            w, bl = (a, b) if g % 2 == 0 else (b, a)
+            matches.append(Match(len(matches), players[w], players[bl], names[w], names[bl], config, time_limit))
+    return matches
+
+
+def init_worker() -> None:
+    logger.remove()
+    logger.add(sys.stderr, level="WARNING")
+
+
+def play_match(match: Match) -> dict:
+    """
+    Play a game in a worker process.
+
+    Args:
+        match (Match): the game to play
+
+    Returns:
+        dict: the json result of the game, with the index of the match
+    """
+    player1 = load_player(match.white, "W", match.white_name, match.time_limit)
+    player2 = load_player(match.black, "B", match.black_name, match.time_limit)
+    result = run_game(player1, player2, match.config).to_json()
+    times = {name: [m["duration"] for m in result["moves"] if m["player"] == name] for name in result["players"]}
+    del result["moves"]
+    result["index"] = match.index
+    result["mean_move_time"] = {name: sum(t) / len(t) if t else 0.0 for name, t in times.items()}
+    result["max_move_time"] = {name: max(t, default=0.0) for name, t in times.items()}
+    return result
+
+
+class Standings:
+    """
+    Win/draw/loss counts of the players of a tournament, overall and per opponent.
+
+    Attributes:
+        records (Dict[str, List[int]]): wins, draws and losses of each player
+        pairs (Dict[Tuple[str, str], List[int]]): wins, draws and losses of each player against each opponent
+    """
+
+    def __init__(self, names: List[str]) -> None:
+        self.records = {name: [0, 0, 0] for name in names}
+        self.pairs: Dict[Tuple[str, str], List[int]] = {}
+
+    def add(self, result: dict) -> None:
+        """
+        Args:
+            result (dict): json result of a game
+        """
+        players = result["players"]
+        for name in players:
+            opponent = players[1] if name == players[0] else players[0]
+            if len(result["winners"]) != 1:
+                outcome = 1
+            else:
+                outcome = 0 if result["winners"][0] == name else 2
+            self.records[name][outcome] += 1
+            self.pairs.setdefault((name, opponent), [0, 0, 0])[outcome] += 1
+
+    def to_json(self) -> dict:
+        def summary(record: List[int]) -> dict:
+            elo, low, high = elo_estimate(*record)
+            return {"wins": record[0], "draws": record[1], "losses": record[2], "elo": elo, "elo_low": low, "elo_high": high}
+
+        return {
+            "players": {name: summary(record) for name, record in self.records.items()},
+            "pairs": {f"{a} vs {b}": summary(record) for (a, b), record in self.pairs.items()},
+        }
+
+    def __str__(self) -> str:
+        lines = [f"{'player':<30} {'W':>4} {'D':>4} {'L':>4} {'elo':>7}  95% interval"]
+        for name, record in sorted(self.records.items(), key=lambda x: -elo_estimate(*x[1])[0]):
+            elo, low, high = elo_estimate(*record)
+            lines.append(f"{name:<30} {record[0]:>4} {record[1]:>4} {record[2]:>4} {elo:>7.0f}  [{low:.0f}, {high:.0f}]")
+        return "\n".join(lines)
+
+
+def run_tournament(matches: List[Match], n_workers: Optional[int] = None, output: Optional[str] = None) -> Standings:
+    """
+    Play the games on a process pool, writing each result as soon as its game ends.
+
+    Args:
+        matches (List[Match]): the games to play
+        n_workers (int, optional): number of processes, the number of cores by default
+        output (str, optional): path of a json lines file receiving the results
+
+    Returns:
+        Standings: the final standings
+    """
+    names = sorted({m.white_name for m in matches} | {m.black_name for m in matches})
+    standings = Standings(names)
+    out = open(output, "w") if output else None
+    try:
+        with ProcessPoolExecutor(max_workers=n_workers or os.cpu_count(), initializer=init_worker) as executor:
+            futures = {executor.submit(play_match, m): m for m in matches}
+            for done, future in enumerate(as_completed(futures), 1):
+                match = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.error(f"Game {match.index} ({match.white_name} vs {match.black_name}, {match.config}) failed: {e!r}")
+                    continue
+                standings.add(result)
+                if out is not None:
+                    out.write(json.dumps(result) + "\n")
+                    out.flush()
+                winners = ", ".join(result["winners"])
+                logger.info(
+                    f"[{done}/{len(matches)}] {match.white_name} vs {match.black_name} ({match.config}): "
+                    f"{result['scores']} - winner {winners}" + (f" ({result['error']})" if result["error"] else "")
+                )
+    finally:
+        if out is not None:
+            out.close()
+    return standings
+
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(prog="tournament_abalone.py", description="Plays a round-robin tournament between player modules on a process pool.")
+    parser.add_argument("-n","--games",required=False,type=int, default=2, help="Number of games per pair of players and per layout, colours being swapped every game.")
+    parser.add_argument("-c","--config",required=False,nargs="+",choices=list(LAYOUTS), default=list(LAYOUTS),help="Starting board configurations.")
+    parser.add_argument("-t","--time-limit",required=False,type=float, default=15*60, help="Time credit of each player in (s).")
+    parser.add_argument("-j","--workers",required=False,type=int, default=None, help="Number of processes, the number of cores by default.")
+    parser.add_argument("-o","--output",required=False, default=None, help="Json lines file receiving the result of each game as it ends.")
+    parser.add_argument("-s","--summary",required=False, default=None, help="Json file receiving the final standings.")
+    parser.add_argument("players_list",nargs="+", help='The players')
+    args=parser.parse_args()
+
+    if len(args.players_list) < 2:
+        parser.error("at least two players are needed")
+    matches = schedule(args.players_list, args.config, args.games, args.time_limit)
+    standings = run_tournament(matches, args.workers, args.output)
+    print(standings)
+    if args.summary:
+        with open(args.summary, "w") as f:
+            json.dump(standings.to_json(), f, indent=2)
@@ -0,0 +1,184 @@
+from typing import Dict, Optional, Tuple
+
+# Bound types of a stored score.
+BOUND_EXACT = 1
+BOUND_LOWER = 2
+BOUND_UPPER = 3
+
+# An entry is two 64 bits words: key ^ data and data. The data word packs
+# score (32 bits), depth (7 bits), game end flag (1 bit), bound (2 bits),
+# move code + 1 (15 bits) and generation (7 bits). Storing key ^ data lets a reader detect an entry torn by
+# a concurrent writer, without any lock.
+ENTRY_SIZE = 16
+SCORE_OFFSET = 1 << 31
+MAX_DEPTH = 127
+N_GENERATIONS = 128
+
+
+class TranspositionTable:
+    """
+    A bounded transposition table stored in a preallocated buffer.
+
+    Each bucket holds two entries: a depth-preferred one, replaced only by a
+    deeper search or an entry of an older search, and an always-replace one.
+
+    Attributes:
+        n_buckets (int): Number of buckets of the table.
+        generation (int): Generation of the current search.
+        hits (int): Number of probes that found their key.
+        misses (int): Number of probes that did not find their key.
+        collisions (int): Number of stores that overwrote another position.
+        stores (int): Number of stores.
+    """
+
+    def __init__(self, size_mb: float = 64, buffer=None) -> None:
+        """
+        Args:
+            size_mb (float, optional): memory cap of the table in MB. Defaults to 64.
+            buffer (optional): writable buffer to use instead of allocating one, e.g. a shared memory block.
+        """
+        self.n_buckets = max(1, int(size_mb * 2**20) // (2 * ENTRY_SIZE))
+        n_bytes = self.n_buckets * 2 * ENTRY_SIZE
+        self._buffer = bytearray(n_bytes) if buffer is None else buffer
+        self._view = memoryview(self._buffer)[:n_bytes]
+        self._keys = self._view[: n_bytes // 2].cast("Q")
+        self._data = self._view[n_bytes // 2 :].cast("Q")
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    @staticmethod
+    def buffer_size(size_mb: float) -> int:
+        """
+        Args:
+            size_mb (float): memory cap of a table in MB
+
+        Returns:
+            int: number of bytes of the buffer of such a table
+        """
+        return max(1, int(size_mb * 2**20) // (2 * ENTRY_SIZE)) * 2 * ENTRY_SIZE
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, int, int, bool]]:
+        """
+        Look a position up.
+
+        Args:
+            key (int): Zobrist key of the position
+
+        Returns:
+            Optional[Tuple[int, int, int, int, bool]]: (depth, bound, score, move code, game end) of the entry,
+                move code being -1 if no move is stored. None if the position is not stored.
+        """
+        i = (key % self.n_buckets) << 1
+        for slot in (i, i + 1):
+            data = self._data[slot]
+            if data and self._keys[slot] ^ data == key:
+                self.hits += 1
+                return (
+                    data >> 32 & 0x7F,
+                    data >> 40 & 0x3,
+                    (data & 0xFFFFFFFF) - SCORE_OFFSET,
+                    (data >> 42 & 0x7FFF) - 1,
+                    bool(data >> 39 & 1),
+                )
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score: int, move_code: int = -1, game_end: bool = False) -> None:
+        """
+        Store the result of a search.
+
+        Args:
+            key (int): Zobrist key of the position
+            depth (int): depth of the search
+            bound (int): BOUND_EXACT, BOUND_LOWER or BOUND_UPPER
+            score (int): score of the position
+            move_code (int, optional): code of the best move, -1 if unknown
+            game_end (bool, optional): True if the search went down to the end of the game on every line
+        """
+        i = (key % self.n_buckets) << 1
+        keys = self._keys
+        datas = self._data
+        old = datas[i]
+        old_key = keys[i] ^ old
+        if old and old_key != key and old >> 32 & 0x7F > depth and old >> 57 == self.generation:
+            i += 1
+            old = datas[i]
+            old_key = keys[i] ^ old
+        if old and old_key != key:
+            self.collisions += 1
+        elif move_code < 0 and old:
+            move_code = (old >> 42 & 0x7FFF) - 1
+        data = (
+            (int(score) + SCORE_OFFSET) & 0xFFFFFFFF
+            | min(max(depth, 0), MAX_DEPTH) << 32
+            | game_end << 39
+            | bound << 40
+            | (move_code + 1) << 42
+            | self.generation << 57
+        )
+        datas[i] = data
+        keys[i] = key ^ data
+        self.stores += 1
+
+    def new_search(self) -> None:
+        """
+        Start a new search: entries of the previous ones become replaceable.
+        """
+        self.generation = (self.generation + 1) % N_GENERATIONS
+
+    def clear(self) -> None:
+        """
+        Empty the table and reset its counters.
+        """
+        n = len(self._data)
+        self._keys[:] = memoryview(bytes(8 * n)).cast("Q")
+        self._data[:] = memoryview(bytes(8 * n)).cast("Q")
+        self.generation = 0
+        self.reset_stats()
+
+    def release(self) -> None:
+        """
+        Release the views on the buffer, so that a shared memory block holding it can be closed.
+        The table can no longer be used.
+        """
+        self._keys.release()
+        self._data.release()
+        self._view.release()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def hashfull(self, sample: int = 1000) -> float:
+        """
+        Estimate the filling of the table on its first entries.
+
+        Args:
+            sample (int, optional): number of entries looked at. Defaults to 1000.
+
+        Returns:
+            float: ratio of used entries
+        """
+        n = min(sample, len(self._data))
+        return sum(1 for k in range(n) if self._data[k]) / n
+
+    def get_stats(self) -> Dict[str, float]:
+        """
+        Returns:
+            Dict[str, float]: counters of the table
+        """
+        probes = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "collisions": self.collisions,
+            "stores": self.stores,
+            "hashfull": self.hashfull(),
+            "size_mb": len(self._data) * ENTRY_SIZE / 2**20,
+        }
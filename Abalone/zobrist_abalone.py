@@ -0,0 +1,96 @@
+import random
+from typing import Dict, List
+
+from geometry_abalone import CELL_INDEX, N_CELLS
+
+# Zobrist keys are drawn per piece type from a seeded generator, so that the key
+# of a position is the same in every process and every game.
+
+N_SCORE_KEYS = 8
+
+
+class ZobristKeys:
+    """
+    The random 64 bits keys of one piece type.
+
+    Attributes:
+        cells (list[int]): Key of a marble on each of the playable cells.
+        to_move (int): Key of the piece type having the move.
+        scores (list[int]): Key of each score, indexed by -score.
+    """
+
+    __slots__ = ("piece_type", "cells", "to_move", "scores")
+
+    def __init__(self, piece_type: str) -> None:
+        rng = random.Random(f"abalone-zobrist-{piece_type}")
+        self.piece_type = piece_type
+        self.cells = [rng.getrandbits(64) for _ in range(N_CELLS)]
+        self.to_move = rng.getrandbits(64)
+        self.scores = [rng.getrandbits(64) for _ in range(N_SCORE_KEYS)]
+
+    def score_key(self, score: float) -> int:
+        """
+        Args:
+            score (float): score of a player of this piece type
+
+        Returns:
+            int: key of the score
+        """
+        index = -int(score)
+        if 0 <= index < N_SCORE_KEYS:
+            return self.scores[index]
+        return random.Random(f"abalone-zobrist-{self.piece_type}-{score}").getrandbits(64)
+
+
+_KEYS: Dict[str, ZobristKeys] = {}
+
+
+def get_keys(piece_type: str) -> ZobristKeys:
+    """
+    Return the keys of a piece type, drawing them on first use.
+
+    Args:
+        piece_type (str): type of the pieces
+
+    Returns:
+        ZobristKeys: keys of the piece type
+    """
+    keys = _KEYS.get(piece_type)
+    if keys is None:
+        keys = _KEYS[piece_type] = ZobristKeys(piece_type)
+    return keys
+
+
+def board_key(env: dict) -> int:
+    """
+    Compute from scratch the key of the marbles of a board.
+
+    Args:
+        env (dict[Tuple[int], Piece]): environment of a BoardAbalone
+
+    Returns:
+        int: the xor of the keys of the marbles
+    """
+    key = 0
+    for pos, piece in env.items():
+        key ^= get_keys(piece.get_type()).cells[CELL_INDEX[pos]]
+    return key
+
+
+def mask_key(mask: int, cells: List[int]) -> int:
+    """
+    Compute from scratch the key of an occupancy mask.
+
+    Args:
+        mask (int): occupancy mask of one player
+        cells (list[int]): cell keys of the piece type of the player
+
+    Returns:
+        int: the xor of the keys of the marbles
+    """
+    key = 0
+    while mask:
+        low = mask & -mask
+        key ^= cells[low.bit_length() - 1]
+        mask ^= low
+    return key